@@ -0,0 +1,163 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.core.database import sqlite_file_name
+from app.utils.events import resource_versions
+from app.utils.file_cache import get_file_stamp
+
+# Headers of a cached response that are replayed; content-length is recomputed
+CACHED_HEADERS = ("content-type", "x-next-cursor")
+# Commits of other processes, e.g. the command line interface, change the database or its write-ahead log
+DATABASE_FILES = (sqlite_file_name, sqlite_file_name.with_name(f"{sqlite_file_name.name}-wal"))
+
+
+@dataclass
+class CachedResponse:
+    versions: tuple
+    etag: str
+    body: bytes
+    headers: dict[str, str]
+
+
+def cached_response(*resources: str, id_param: str | None = None) -> Callable:
+    """
+    Marks a GET endpoint of a ``CachedRoute`` router as cacheable.
+
+    Args:
+        resources: Resources the response is built from, e.g. ``("accounts", "account_types")``
+        id_param: Path parameter holding the id of a single row of the first resource. Only changes of that row
+            invalidate the response, instead of every change of the collection.
+    """
+
+    def mark(endpoint: Callable) -> Callable:
+        endpoint.cached_resources = (resources, id_param)
+        return endpoint
+
+    return mark
+
+
+def matches_etag(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of rendered GET responses, validated by resource version counters.
+
+    An entry is keyed on the path and query string and remembers the versions of the resources it was built
+    from. While they are unchanged the stored body is replayed without querying or serializing anything, and a
+    matching ``If-None-Match`` is answered with 304. The ETag is a hash of the body, so it stays valid across
+    restarts and when a write did not change the response. Writes of other processes are noticed through the
+    stamps of the database files, which invalidate every entry.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_versions(request: Request, resources: tuple[str, ...], id_param: str | None) -> tuple:
+        versions = [resource_versions.collection(resource) for resource in resources]
+        if id_param is not None:
+            try:
+                versions[0] = resource_versions.row(resources[0], int(request.path_params[id_param]))
+            except (KeyError, ValueError):
+                pass
+        return (*versions, *(get_file_stamp(path) for path in DATABASE_FILES))
+
+    async def serve(
+        self,
+        request: Request,
+        resources: tuple[str, ...],
+        id_param: str | None,
+        handler: Callable[[Request], Coroutine[Any, Any, Response]],
+    ) -> Response:
+        key = f"{request.url.path}?{request.url.query}"
+        if_none_match = request.headers.get("if-none-match")
+        # Read before rendering, so a write racing with the handler invalidates the entry on the next lookup
+        versions = self.get_versions(request, resources, id_param)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.versions == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                entry = None
+                self.misses += 1
+
+        if entry is None:
+            response = await handler(request)
+            body = getattr(response, "body", None)
+            if response.status_code != 200 or body is None:
+                return response
+            entry = CachedResponse(
+                versions=versions,
+                etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+                body=body,
+                headers={name: value for name, value in response.headers.items() if name in CACHED_HEADERS},
+            )
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+        if matches_etag(if_none_match, entry.etag):
+            with self._lock:
+                self.not_modified += 1
+            headers.pop("content-type", None)
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, headers=headers)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.not_modified = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": "responses",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+            }
+
+
+response_cache = ResponseCache(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+class CachedRoute(APIRoute):
+    """Route class that serves endpoints marked with ``cached_response`` through the response cache"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        cached = getattr(self.endpoint, "cached_resources", None)
+        if cached is None or self.methods != {"GET"}:
+            return handler
+        resources, id_param = cached
+
+        async def cached_handler(request: Request) -> Response:
+            return await response_cache.serve(request, resources, id_param, handler)
+
+        return cached_handler
@@ -0,0 +1,38 @@
+import re
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # Optional, Brotli is used when brotli-asgi is installed
+    BrotliMiddleware = None
+
+# Streamed responses (Server-Sent Events, NDJSON batches and scans) are sent as they are: compressors buffer
+# small chunks, which would hold back events and progress lines
+STREAMING_PATHS = re.compile(r"/(events|batch|scan)$")
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses larger than ``minimum_size`` with Brotli when the client accepts it and brotli-asgi is
+    installed, otherwise with GZip.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, gzip_level: int, brotli: bool):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=gzip_level)
+        self.brotli = None
+        if brotli and BrotliMiddleware is not None:
+            self.brotli = BrotliMiddleware(app, minimum_size=minimum_size, gzip_fallback=False)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or STREAMING_PATHS.search(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        if self.brotli is not None and "br" in accept_encoding:
+            await self.brotli(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
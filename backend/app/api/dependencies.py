@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Header
 from sqlmodel import Session
 
 from app.core.database import engine
@@ -13,3 +13,6 @@ def get_session():
 
 
 SessionDependency = Annotated[Session, Depends(get_session)]
+
+# Sent by clients starting background jobs, so a retried request returns the job it started the first time
+IdempotencyKeyHeader = Annotated[str | None, Header(max_length=255)]
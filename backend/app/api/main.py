@@ -1,11 +1,29 @@
 from fastapi import APIRouter
 
-from app.api.routers import account_types, accounts, projects, system, utils
+from app.api.routers import (
+    account_types,
+    accounts,
+    directories,
+    drift,
+    events,
+    jobs,
+    metrics,
+    projects,
+    search,
+    system,
+    utils,
+)
 
 api_router = APIRouter()
 # Routers
 api_router.include_router(account_types.router)
 api_router.include_router(accounts.router)
+api_router.include_router(directories.router)
+api_router.include_router(drift.router)
+api_router.include_router(events.router)
+api_router.include_router(jobs.router)
+api_router.include_router(metrics.router)
 api_router.include_router(projects.router)
+api_router.include_router(search.router)
 api_router.include_router(system.router)
 api_router.include_router(utils.router)
@@ -0,0 +1,71 @@
+import base64
+import json
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Integer, String, literal, tuple_, type_coerce
+from sqlmodel import Session, select
+
+from app.models import PageQuery
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort: str, values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort, *values]).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    try:
+        cursor_sort, *values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort:
+            raise ValueError("Cursor was created for a different sort order")
+        if sort.lstrip("-") == "updated_at" and not isinstance(values[0], str):
+            raise ValueError("Expected a timestamp")
+        return values
+    except (ValueError, TypeError, IndexError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def prefix_filter(column, prefix: str):
+    """
+    Prefix match written as a range, so SQLite can use the column's index (``LIKE 'x%'`` cannot, because it is
+    case-insensitive while the index is not).
+    """
+    return (column >= prefix) & (column < prefix + "\U0010ffff")
+
+
+def paginate(session: Session, statement, model, query: PageQuery, response: Response) -> list:
+    """
+    Runs a list query with keyset pagination.
+
+    Rows are ordered by the sort key with ``id`` as tie-breaker. With a cursor, the query seeks directly past
+    the last row of the previous page instead of scanning skipped rows like ``offset`` does. When more rows
+    follow, the cursor of the next page is returned in the ``X-Next-Cursor`` response header.
+    """
+    sort, offset, limit = query.sort, query.offset, query.limit
+    descending = sort.startswith("-")
+    column = getattr(model, sort.lstrip("-"))
+    keys = [model.id] if column is model.id else [column, model.id]
+
+    if query.cursor:
+        values = decode_cursor(query.cursor, sort)
+        if len(values) != len(keys):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        position = tuple_(*keys)
+        # Bound as strings, the DateTime type would re-format timestamps with microseconds
+        bound = tuple_(*[literal(value, String if isinstance(value, str) else Integer) for value in values])
+        statement = statement.where(position < bound if descending else position > bound)
+        offset = 0
+
+    order = [key.desc() if descending else key.asc() for key in keys]
+    rows = list(session.exec(statement.order_by(*order).offset(offset).limit(limit + 1)).all())
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        values = [getattr(last, key.key) for key in keys]
+        if column is not model.id:
+            # Keyset comparisons run on the stored text: CURRENT_TIMESTAMP has no fractional seconds, SQLAlchemy
+            # always writes six digits, so the text cannot be rebuilt from the parsed timestamp
+            values[0] = session.exec(select(type_coerce(column, String)).where(model.id == last.id)).one()
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, values)
+    return rows
@@ -1,12 +1,16 @@
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
 from sqlmodel import select
 
+from app.api.caching import CachedRoute, cached_response
 from app.api.dependencies import SessionDependency
-from app.models import AccountType, AccountTypeCreate, AccountTypePublic, AccountTypeUpdate
+from app.api.pagination import paginate, prefix_filter
+from app.api.responses import select_fields
+from app.core.loading import ACCOUNT_TYPE_WITH_ACCOUNTS
+from app.models import AccountType, AccountTypeCreate, AccountTypePublic, AccountTypeQuery, AccountTypeUpdate
 
-router = APIRouter(prefix="/account-types", tags=["Account Types"])
+router = APIRouter(prefix="/account-types", tags=["Account Types"], route_class=CachedRoute)
 
 
 @router.post(
@@ -39,14 +43,19 @@ async def create_account_type(account_type: AccountTypeCreate, session: SessionD
     "",
     response_model=list[AccountTypePublic],
     summary="List all account types",
-    description="Retrieves a list of all account types.",
+    description="Retrieves a list of account types, optionally filtered by name prefix, with keyset pagination.",
 )
+@cached_response("account_types")
 async def read_account_types(
     session: SessionDependency,
-    offset: int = 0,
-    limit: Annotated[int, Query(le=100)] = 100,
+    query: Annotated[AccountTypeQuery, Query()],
+    response: Response,
 ):
-    return session.exec(select(AccountType).offset(offset).limit(limit)).all()
+    statement = select(AccountType)
+    if query.name_prefix:
+        statement = statement.where(prefix_filter(AccountType.name, query.name_prefix))
+    rows = paginate(session, statement, AccountType, query, response)
+    return select_fields(rows, AccountTypePublic, query.fields, response)
 
 
 @router.get(
@@ -55,6 +64,7 @@ async def read_account_types(
     summary="Get a specific account type",
     description="Retrieves information about a specific account type.",
 )
+@cached_response("account_types", id_param="account_type_id")
 async def read_account_type(account_type_id: int, session: SessionDependency):
     account_type = session.get(AccountType, account_type_id)
     if not account_type:
@@ -87,7 +97,7 @@ async def update_account_type(account_type_id: int, account_type: AccountTypeUpd
     description="Deletes an account type if it's not associated with any accounts.",
 )
 async def delete_account_type(account_type_id: int, session: SessionDependency):
-    account_type = session.get(AccountType, account_type_id)
+    account_type = session.get(AccountType, account_type_id, options=ACCOUNT_TYPE_WITH_ACCOUNTS)
     if not account_type:
         raise HTTPException(status_code=404, detail="Account type not found")
 
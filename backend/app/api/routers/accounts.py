@@ -1,21 +1,37 @@
+import logging
+from collections.abc import Iterator
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query, status
-from sqlmodel import or_, select
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, or_, select
 
-from app.api.dependencies import SessionDependency
+from app.api.caching import CachedRoute, cached_response
+from app.api.dependencies import IdempotencyKeyHeader, SessionDependency
+from app.api.pagination import paginate, prefix_filter
+from app.api.responses import select_fields
+from app.core.database import engine
+from app.core.loading import ACCOUNT_PUBLIC, ACCOUNT_WITH_PROJECTS
 from app.models import (
     Account,
+    AccountBatchCreate,
+    AccountBatchResult,
     AccountCreate,
     AccountPublic,
     AccountPublicWithProjects,
+    AccountQuery,
     AccountType,
     AccountUpdate,
+    JobPublic,
 )
-from app.utils.services import create_git_account, list_accounts_ssh_config
+from app.utils.git_config import GitConfigError
+from app.utils.jobs import JobContext, job_manager
+from app.utils.services import create_and_store_accounts, create_git_account, sync_identity_config, sync_ssh_config
 from app.utils.ssh_manager import delete_ssh_key
 
-router = APIRouter(prefix="/accounts", tags=["Accounts"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/accounts", tags=["Accounts"], route_class=CachedRoute)
 
 
 @router.post(
@@ -62,18 +78,207 @@ async def create_account(account: AccountCreate, session: SessionDependency):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@job_manager.handler("account_create")
+def run_account_create(context: JobContext) -> dict:
+    account = AccountCreate.model_validate(context.payload)
+    with Session(engine) as session:
+        if session.exec(
+            select(Account).where(or_(Account.name == account.name, Account.user_email == account.user_email))
+        ).first():
+            raise ValueError("Account already exists")
+        account_db = Account.model_validate(account)
+        account_db.account_type = session.get(AccountType, account.account_type_id)
+        if account_db.account_type is None:
+            raise ValueError("Account type not found")
+        account_db.ssh_key_path, account_db.public_key = create_git_account(account_db)
+        session.add(account_db)
+        session.commit()
+        session.refresh(account_db)
+        context.item(0, "succeeded", name=account_db.name, ssh_key_path=account_db.ssh_key_path)
+        return AccountPublic.model_validate(account_db).model_dump(mode="json")
+
+
+@router.post(
+    "/jobs",
+    response_model=JobPublic,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Create a new Git account in the background",
+    description="""
+    Same as POST /accounts, but generates the SSH key and updates the SSH config in a background job.
+    The job is returned right away; the created account becomes the job result.
+    Send an `Idempotency-Key` header to get the same job back when the request is repeated.
+    """,
+)
+async def create_account_job(
+    account: AccountCreate, session: SessionDependency, idempotency_key: IdempotencyKeyHeader = None
+):
+    payload = account.model_dump(mode="json")
+    try:
+        # A repeated request gets its job back, even once that job created the account
+        job = job_manager.find(idempotency_key, "account_create", payload) if idempotency_key else None
+        if job is not None:
+            return job
+        existing = session.exec(
+            select(Account).where(or_(Account.name == account.name, Account.user_email == account.user_email))
+        ).first()
+        if existing:
+            raise HTTPException(status_code=400, detail="Account already exists")
+        if not session.get(AccountType, account.account_type_id):
+            raise HTTPException(status_code=400, detail="Account type not found")
+        return job_manager.submit("account_create", payload, total=1, idempotency_key=idempotency_key)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+def prepare_account_batch(batch: AccountBatchCreate, session: Session) -> list[tuple[Account, str]]:
+    """Validates a batch and pairs every account with the name of its account type"""
+    for field in ("name", "user_email"):
+        values = [getattr(account, field) for account in batch.accounts]
+        duplicates = sorted({value for value in values if values.count(value) > 1})
+        if duplicates:
+            raise HTTPException(status_code=400, detail=f"Duplicate account {field}s: {', '.join(duplicates)}")
+
+    names = [account.name for account in batch.accounts]
+    emails = [account.user_email for account in batch.accounts]
+    existing = session.exec(
+        select(Account.name).where(or_(Account.name.in_(names), Account.user_email.in_(emails)))
+    ).all()
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Accounts already exist: {', '.join(sorted(existing))}")
+
+    account_type_ids = {account.account_type_id for account in batch.accounts}
+    account_types = {
+        account_type.id: account_type
+        for account_type in session.exec(select(AccountType).where(AccountType.id.in_(account_type_ids))).all()
+    }
+    missing = account_type_ids - account_types.keys()
+    if missing:
+        missing_ids = ", ".join(str(account_type_id) for account_type_id in sorted(missing))
+        raise HTTPException(status_code=400, detail=f"Account type not found: {missing_ids}")
+
+    # Only the name is passed on, so the accounts can be stored in another session than this one
+    return [
+        (Account.model_validate(account), account_types[account.account_type_id].name) for account in batch.accounts
+    ]
+
+
+@router.post(
+    "/batch",
+    summary="Create many Git accounts",
+    description="""
+    Creates many Git accounts in one request, e.g. the identities of a whole team:
+    1. Validates that names and emails are unique and that all account types exist
+    2. Generates the SSH keys in parallel, streaming one JSON line per account as soon as its key exists
+    3. Adds all Host blocks to the SSH config in a single atomic write
+    4. Stores all accounts in a single transaction and streams a final summary line
+
+    If the SSH config or the database cannot be updated, the generated keys are deleted again.
+    """,
+    response_class=StreamingResponse,
+)
+async def create_accounts_batch(batch: AccountBatchCreate, session: SessionDependency):
+    accounts = prepare_account_batch(batch, session)
+
+    def stream() -> Iterator[str]:
+        for line in create_and_store_accounts(accounts, batch.max_workers):
+            yield line.model_dump_json() + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@job_manager.handler("account_batch")
+def run_account_batch(context: JobContext) -> dict:
+    batch = AccountBatchCreate.model_validate(context.payload)
+    with Session(engine) as session:
+        accounts = prepare_account_batch(batch, session)
+    for line in create_and_store_accounts(accounts, batch.max_workers):
+        if isinstance(line, AccountBatchResult):
+            context.item(
+                line.index,
+                "succeeded" if line.status == "generated" else "failed",
+                **line.model_dump(mode="json", exclude={"event", "index", "status"}),
+            )
+        elif line.status == "failed":
+            raise RuntimeError(line.error)
+        else:
+            return line.model_dump(mode="json", exclude={"event"})
+
+
+@router.post(
+    "/batch/jobs",
+    response_model=JobPublic,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Create many Git accounts in the background",
+    description="""
+    Same as /accounts/batch, but queues a background job and returns it right away.
+    Per-account results are pushed as `job.item` events on /api/events, the summary becomes the job result.
+    Send an `Idempotency-Key` header to get the same job back when the request is repeated.
+    """,
+)
+async def create_accounts_batch_job(
+    batch: AccountBatchCreate, session: SessionDependency, idempotency_key: IdempotencyKeyHeader = None
+):
+    payload = batch.model_dump(mode="json")
+    try:
+        # A repeated request gets its job back, even once that job created the accounts
+        job = job_manager.find(idempotency_key, "account_batch", payload) if idempotency_key else None
+        if job is not None:
+            return job
+        prepare_account_batch(batch, session)
+        return job_manager.submit("account_batch", payload, total=len(batch.accounts), idempotency_key=idempotency_key)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+def filter_accounts(statement, query: AccountQuery):
+    if query.account_type is not None:
+        statement = statement.where(
+            Account.account_type_id.in_(select(AccountType.id).where(AccountType.name == query.account_type))
+        )
+    if query.account_type_id is not None:
+        statement = statement.where(Account.account_type_id == query.account_type_id)
+    if query.name_prefix:
+        statement = statement.where(prefix_filter(Account.name, query.name_prefix))
+    if query.user_email is not None:
+        statement = statement.where(Account.user_email == query.user_email)
+    return statement
+
+
 @router.get(
     "",
     response_model=list[AccountPublic],
     summary="List all Git accounts",
-    description="Retrieves a list of all Git accounts with pagination support.",
+    description=(
+        "Retrieves a list of Git accounts, filtered by account type, name prefix or email. "
+        "Supports keyset pagination through the cursor returned in the X-Next-Cursor header."
+    ),
 )
+@cached_response("accounts", "account_types")
 async def read_accounts(
     session: SessionDependency,
-    offset: int = 0,
-    limit: Annotated[int, Query(le=100)] = 100,
+    query: Annotated[AccountQuery, Query()],
+    response: Response,
+):
+    statement = filter_accounts(select(Account), query).options(*ACCOUNT_PUBLIC)
+    rows = paginate(session, statement, Account, query, response)
+    return select_fields(rows, AccountPublic, query.fields, response)
+
+
+@router.get(
+    "/with-projects",
+    response_model=list[AccountPublicWithProjects],
+    summary="List all Git accounts with their projects",
+    description="Retrieves a list of Git accounts with their account type and projects embedded, in two queries.",
+)
+@cached_response("accounts", "account_types", "projects")
+async def read_accounts_with_projects(
+    session: SessionDependency,
+    query: Annotated[AccountQuery, Query()],
+    response: Response,
 ):
-    return session.exec(select(Account).offset(offset).limit(limit)).all()
+    statement = filter_accounts(select(Account), query).options(*ACCOUNT_WITH_PROJECTS)
+    rows = paginate(session, statement, Account, query, response)
+    return select_fields(rows, AccountPublicWithProjects, query.fields, response)
 
 
 @router.get(
@@ -82,13 +287,23 @@ async def read_accounts(
     summary="Get a specific Git account",
     description="Retrieves detailed information about a specific Git account including associated projects.",
 )
+@cached_response("accounts", "account_types", "projects", id_param="account_id")
 async def read_account(account_id: int, session: SessionDependency):
-    account = session.get(Account, account_id)
+    account = session.get(Account, account_id, options=ACCOUNT_WITH_PROJECTS)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return account
 
 
+def update_identity_config(session: Session) -> None:
+    """Rewrites the git config fragments after a change of an account with routed directories"""
+    try:
+        sync_identity_config(session)
+    except (GitConfigError, OSError) as e:
+        # The account is stored already; POST /directories/sync writes the config again
+        logger.warning("Could not update the identity git config: %s", e)
+
+
 @router.patch(
     "/{account_id}",
     response_model=AccountPublic,
@@ -104,8 +319,11 @@ async def update_account(account_id: int, account: AccountUpdate, session: Sessi
         raise HTTPException(status_code=404, detail="Account not found")
     account_data = account.model_dump(exclude_unset=True)
     account_db.sqlmodel_update(account_data)
+    routed = bool(account_db.directories)
     session.add(account_db)
     session.commit()
+    if routed:
+        update_identity_config(session)
     session.refresh(account_db)
     return account_db
 
@@ -128,8 +346,18 @@ async def delete_account(account_id: int, session: SessionDependency):
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error deleting SSH keys: {e}")
 
+    # Detach projects first, foreign keys are enforced so they cannot keep pointing at the deleted account
+    for project in account.projects:
+        project.account_id = None
+        project.configured = False
+        session.add(project)
+
+    # Its routed directories are deleted with it
+    routed = bool(account.directories)
     session.delete(account)
     session.commit()
+    if routed:
+        update_identity_config(session)
     return {"message": "Account deleted successfully"}
 
 
@@ -138,14 +366,20 @@ async def delete_account(account_id: int, session: SessionDependency):
     summary="Synchronize SSH configuration",
     description="""
     Synchronizes the SSH configuration with the database by:
-    1. Reading the current SSH config file
-    2. Updating account information in the database
-    3. Ensuring SSH configurations are up to date
+    1. Reading every Host block of the current SSH config file
+    2. Comparing them with all accounts in the database at once
+    3. Creating new accounts and updating changed SSH keys in a single transaction
+    4. Returning the list of SSH config accounts and a diff report (inserted, updated, unchanged, orphaned, skipped)
     """,
 )
-async def sync_ssh_config(session: SessionDependency):
+async def sync_accounts_ssh_config(session: SessionDependency):
     try:
-        accounts = list_accounts_ssh_config(session)
-        return {"message": "SSH config synchronized with database", "accounts": accounts}
+        result = sync_ssh_config(session)
+        return {
+            "message": "SSH config synchronized with database",
+            "changed": result.changed,
+            "accounts": result.accounts,
+            "diff": result.diff,
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,130 @@
+from pathlib import Path
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from sqlmodel import Session, select
+
+from app.api.caching import CachedRoute, cached_response
+from app.api.dependencies import SessionDependency
+from app.api.pagination import paginate
+from app.api.responses import select_fields
+from app.models import (
+    Account,
+    AccountDirectory,
+    AccountDirectoryCreate,
+    AccountDirectoryPublic,
+    AccountDirectoryQuery,
+    AccountDirectoryResolution,
+    AccountPublic,
+    IdentityConfigSyncResult,
+)
+from app.utils.git_config import GitConfigError
+from app.utils.services import resolve_account_directory, sync_identity_config
+
+router = APIRouter(prefix="/directories", tags=["Directories"], route_class=CachedRoute)
+
+
+def write_identity_config(session: Session) -> IdentityConfigSyncResult:
+    try:
+        return sync_identity_config(session)
+    except (GitConfigError, OSError) as e:
+        raise HTTPException(status_code=500, detail=f"Could not update the git config: {e}")
+
+
+@router.post(
+    "",
+    response_model=AccountDirectoryPublic,
+    status_code=status.HTTP_201_CREATED,
+    summary="Route a directory to an account",
+    description="""
+    Makes every Git repository below a directory, existing or cloned later, use an account:
+    1. Writes a config fragment for the account with its user.name, user.email and a core.sshCommand that
+       connects with the account's SSH key
+    2. Adds an `includeIf "gitdir:<directory>/"` section for it to the global git config
+    Nothing is written to the repositories themselves. A nested directory routed to another account wins.
+    """,
+)
+async def create_directory(directory: AccountDirectoryCreate, session: SessionDependency):
+    path = Path(directory.path).expanduser().resolve()
+    if not path.is_dir():
+        raise HTTPException(status_code=400, detail=f"Directory not found: {path}")
+    if not session.get(Account, directory.account_id):
+        raise HTTPException(status_code=404, detail="Account not found")
+    if session.exec(select(AccountDirectory).where(AccountDirectory.path == str(path))).first():
+        raise HTTPException(status_code=400, detail="Directory is already routed to an account")
+
+    directory_db = AccountDirectory(path=str(path), account_id=directory.account_id)
+    session.add(directory_db)
+    session.commit()
+    write_identity_config(session)
+    session.refresh(directory_db)
+    return directory_db
+
+
+@router.get(
+    "",
+    response_model=list[AccountDirectoryPublic],
+    summary="List routed directories",
+    description=(
+        "Retrieves the directories routed to accounts, optionally filtered by account. "
+        "Supports keyset pagination through the cursor returned in the X-Next-Cursor header."
+    ),
+)
+@cached_response("directories")
+async def read_directories(
+    session: SessionDependency,
+    query: Annotated[AccountDirectoryQuery, Query()],
+    response: Response,
+):
+    statement = select(AccountDirectory)
+    if query.account_id is not None:
+        statement = statement.where(AccountDirectory.account_id == query.account_id)
+    rows = paginate(session, statement, AccountDirectory, query, response)
+    return select_fields(rows, AccountDirectoryPublic, query.fields, response)
+
+
+@router.get(
+    "/resolve",
+    response_model=AccountDirectoryResolution,
+    summary="Find the account used for a path",
+    description="Returns the innermost routed directory containing a path and its account, as git resolves it.",
+)
+async def resolve_directory(path: str, session: SessionDependency):
+    resolved = Path(path).expanduser().resolve()
+    directory = resolve_account_directory(session, resolved)
+    if directory is None:
+        return AccountDirectoryResolution(path=str(resolved))
+    return AccountDirectoryResolution(
+        path=str(resolved),
+        directory=AccountDirectoryPublic.model_validate(directory),
+        account=AccountPublic.model_validate(directory.account),
+    )
+
+
+@router.post(
+    "/sync",
+    response_model=IdentityConfigSyncResult,
+    summary="Rewrite the identity git config",
+    description="""
+    Rewrites the account config fragments and the managed includeIf sections of the global git config from the
+    routed directories, e.g. after the git config was edited by hand. Other sections are kept as they are.
+    """,
+)
+async def sync_directories(session: SessionDependency):
+    return write_identity_config(session)
+
+
+@router.delete(
+    "/{directory_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Stop routing a directory",
+    description="Removes the directory and its includeIf section from the global git config.",
+)
+async def delete_directory(directory_id: int, session: SessionDependency):
+    directory = session.get(AccountDirectory, directory_id)
+    if not directory:
+        raise HTTPException(status_code=404, detail="Directory not found")
+    session.delete(directory)
+    session.commit()
+    write_identity_config(session)
+    return {"message": "Directory deleted successfully"}
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException
+
+from app.models import DriftReport, DriftStatus
+from app.utils.drift import drift_monitor
+
+router = APIRouter(prefix="/drift", tags=["Drift"])
+
+
+@router.get(
+    "",
+    response_model=DriftReport,
+    summary="Get configuration drift",
+    description="""
+    Returns the drift status of every configured project, as kept up to date by the background watcher.
+
+    A project has drifted when its remote URL, user.name or user.email no longer match the account it was
+    configured with, or when its SSH host is missing from ~/.ssh/config or uses a different key.
+    """,
+)
+async def read_drift(drifted_only: bool = False):
+    return drift_monitor.report(drifted_only=drifted_only)
+
+
+@router.post(
+    "/refresh",
+    response_model=DriftReport,
+    summary="Recheck all projects",
+    description="Reloads configured projects from the database and rechecks every project immediately.",
+)
+async def refresh_drift():
+    await drift_monitor.refresh()
+    return drift_monitor.report()
+
+
+@router.get(
+    "/{project_id}",
+    response_model=DriftStatus,
+    summary="Get the drift of a project",
+    description="Returns the drift status of a configured project.",
+)
+async def read_project_drift(project_id: int):
+    status = drift_monitor.statuses.get(project_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Project not found or not configured")
+    return status
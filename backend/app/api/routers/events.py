@@ -0,0 +1,52 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+
+from app.models import Event
+from app.utils.events import event_bus
+
+# Seconds between keep-alive comments on idle event streams, so proxies do not close them
+KEEP_ALIVE_INTERVAL = 15.0
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+def format_event(event: Event) -> str:
+    return f"id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n"
+
+
+@router.get(
+    "",
+    summary="Stream application events",
+    description="""
+    Server-Sent Events stream of everything that changes on the server:
+    - `invalidate`: an account, account type or project was created, updated or deleted
+    - `job` and `job.item`: state and per-item progress of background jobs
+    - `drift`: the drift status of a configured project changed
+
+    Reconnecting clients send `Last-Event-ID` (browsers do this automatically) to receive the events they missed.
+    """,
+    response_class=StreamingResponse,
+)
+async def stream_events(request: Request, last_event_id: Annotated[int | None, Header()] = None):
+    queue, missed = event_bus.subscribe(last_event_id)
+
+    async def stream() -> AsyncIterator[str]:
+        try:
+            for event in missed:
+                yield format_event(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEP_ALIVE_INTERVAL)
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            event_bus.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,69 @@
+from typing import Annotated, Any
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlmodel import select
+
+from app.api.dependencies import SessionDependency
+from app.api.pagination import paginate
+from app.api.responses import select_fields
+from app.models import Job, JobPublic, JobQuery
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+def filter_jobs(statement, query: JobQuery):
+    if query.kind is not None:
+        statement = statement.where(Job.kind == query.kind)
+    if query.status is not None:
+        statement = statement.where(Job.status == query.status)
+    return statement
+
+
+@router.get(
+    "",
+    response_model=list[JobPublic],
+    summary="List background jobs",
+    description=(
+        "Lists queued, running and recently finished background jobs, newest first, filtered by kind or status. "
+        "Supports keyset pagination through the cursor returned in the X-Next-Cursor header."
+    ),
+)
+async def read_jobs(session: SessionDependency, query: Annotated[JobQuery, Query()], response: Response):
+    rows = paginate(session, filter_jobs(select(Job), query), Job, query, response)
+    return select_fields(rows, JobPublic, query.fields, response)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobPublic,
+    summary="Get a background job",
+    description="""
+    Returns the state of a job: its status, progress counters, attempts and, while it waits to be retried,
+    when it runs again. Once it finished, the result is available from /jobs/{job_id}/result.
+    """,
+)
+async def read_job(job_id: int, session: SessionDependency):
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get(
+    "/{job_id}/result",
+    response_model=Any,
+    summary="Get the result of a background job",
+    description="""
+    Returns what a succeeded job produced, e.g. the created account or the summary of a project batch.
+    Responds with 409 while the job is pending or running, and with the error if it failed.
+    """,
+)
+async def read_job_result(job_id: int, session: SessionDependency):
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return job.result
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Response
+
+from app.utils.metrics import CONTENT_TYPE, render_metrics
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get(
+    "",
+    response_class=Response,
+    summary="Get timing metrics",
+    description="""
+    Returns histograms in the Prometheus text format, for scraping or a quick look with curl:
+    - `git_manager_subprocess_seconds`: git, ssh and ssh-keygen processes by program, git subcommand and exit code
+    - `git_manager_sql_seconds`: SQL statements by operation
+    - `git_manager_db_commit_seconds`: session commits, including their flush
+    - `git_manager_config_io_seconds`: SSH and git config reads and writes
+    - `git_manager_http_request_seconds`: API requests by method, route and status
+
+    Every API response also carries a `Server-Timing` header with the time it spent in each of these.
+    """,
+)
+async def read_metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
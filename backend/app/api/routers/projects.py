@@ -1,20 +1,45 @@
+from collections.abc import Iterator
+from pathlib import Path
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query, status
-from sqlmodel import select
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, func, select
 
-from app.api.dependencies import SessionDependency
+from app.api.caching import CachedRoute, cached_response
+from app.api.dependencies import IdempotencyKeyHeader, SessionDependency
+from app.api.pagination import paginate, prefix_filter
+from app.api.responses import select_fields
+from app.core.database import engine
+from app.core.loading import PROJECT_WITH_ACCOUNT
 from app.models import (
     Account,
+    JobPublic,
     Project,
+    ProjectBatchCreate,
+    ProjectBatchResult,
+    ProjectBatchSummary,
     ProjectCreate,
     ProjectPublic,
     ProjectPublicWithAccount,
+    ProjectQuery,
+    ProjectReconfigure,
     ProjectUpdate,
+    ProjectValidationResult,
+    RepositoryScanRequest,
+    RepositoryScanSummary,
+)
+from app.utils.jobs import JobContext, RetryJob, job_manager
+from app.utils.repo_scanner import RepositoryScanner
+from app.utils.services import (
+    configure_and_store_projects,
+    configure_project_async,
+    validate_project_configuration_async,
+    validate_projects_async,
 )
-from app.utils.services import configure_project, validate_project_configuration
 
-router = APIRouter(prefix="/projects", tags=["Projects"])
+router = APIRouter(prefix="/projects", tags=["Projects"], route_class=CachedRoute)
 
 
 @router.post(
@@ -39,7 +64,7 @@ async def create_project(project: ProjectCreate, session: SessionDependency):
 
         # Create and configure project
         project_db = Project.model_validate(project)
-        project_db = configure_project(project_db, account)
+        project_db = await configure_project_async(project_db, account)
         session.add(project_db)
         session.commit()
         session.refresh(project_db)
@@ -48,19 +73,291 @@ async def create_project(project: ProjectCreate, session: SessionDependency):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def prepare_project_batch(batch: ProjectBatchCreate, session: Session) -> list[tuple[Project, Account]]:
+    """Validates a batch and pairs every project with its account"""
+    paths = [str(Path(project.path).expanduser()) for project in batch.projects]
+    duplicates = sorted({path for path in paths if paths.count(path) > 1})
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate project paths: {', '.join(duplicates)}")
+
+    # Load every referenced account (and its type) up front so worker threads never touch the session
+    account_ids = {project.account_id for project in batch.projects}
+    accounts = {
+        account.id: account
+        for account in session.exec(
+            select(Account).where(Account.id.in_(account_ids)).options(selectinload(Account.account_type))
+        ).all()
+    }
+    missing = account_ids - accounts.keys()
+    if missing:
+        missing_ids = ", ".join(str(account_id) for account_id in sorted(missing, key=str))
+        raise HTTPException(status_code=404, detail=f"Account not found: {missing_ids}")
+
+    return [(Project.model_validate(project), accounts[project.account_id]) for project in batch.projects]
+
+
+@router.post(
+    "/batch",
+    summary="Create many Git projects",
+    description="""
+    Configures and creates many Git projects in one request:
+    1. Validates that all associated accounts exist and that paths are unique
+    2. Configures the projects in parallel on a bounded worker pool
+    3. Streams one JSON line per project as soon as it finishes
+    4. Stores all configured projects in a single transaction and streams a final summary line
+    """,
+    response_class=StreamingResponse,
+)
+async def create_projects_batch(batch: ProjectBatchCreate, session: SessionDependency):
+    projects = prepare_project_batch(batch, session)
+
+    def stream() -> Iterator[str]:
+        for line in configure_and_store_projects(projects, batch.max_workers):
+            yield line.model_dump_json() + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@job_manager.handler("project_batch")
+def run_project_batch(context: JobContext) -> dict:
+    batch = ProjectBatchCreate.model_validate(context.payload)
+    with Session(engine) as session:
+        projects = prepare_project_batch(batch, session)
+    return store_configured_projects(context, configure_and_store_projects(projects, batch.max_workers))
+
+
+def store_configured_projects(context: JobContext, lines: Iterator[ProjectBatchResult | ProjectBatchSummary]) -> dict:
+    """Reports the per-project results of ``configure_and_store_projects`` as job items and returns the summary"""
+    for line in lines:
+        if isinstance(line, ProjectBatchResult):
+            context.item(
+                line.index,
+                "succeeded" if line.status == "configured" else "failed",
+                **line.model_dump(mode="json", exclude={"event", "index", "status"}),
+            )
+        elif line.status == "failed":
+            raise RuntimeError(line.error)
+        else:
+            return line.model_dump(mode="json", exclude={"event"})
+
+
+@router.post(
+    "/batch/jobs",
+    response_model=JobPublic,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Create many Git projects in the background",
+    description="""
+    Same as /projects/batch, but queues a background job and returns it right away.
+    Per-project results are pushed as `job.item` events on /api/events, the summary becomes the job result.
+    Send an `Idempotency-Key` header to get the same job back when the request is repeated.
+    """,
+)
+async def create_projects_batch_job(
+    batch: ProjectBatchCreate, session: SessionDependency, idempotency_key: IdempotencyKeyHeader = None
+):
+    # Fail fast on unknown accounts and duplicate paths, the job checks again when it runs
+    prepare_project_batch(batch, session)
+    try:
+        return job_manager.submit(
+            "project_batch", batch.model_dump(mode="json"), total=len(batch.projects), idempotency_key=idempotency_key
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@job_manager.handler("project_reconfigure")
+def run_project_reconfigure(context: JobContext) -> dict:
+    request = ProjectReconfigure.model_validate(context.payload)
+    with Session(engine) as session:
+        statement = select(Project).where(Project.account_id.is_not(None)).options(*PROJECT_WITH_ACCOUNT)
+        if request.project_ids is not None:
+            statement = statement.where(Project.id.in_(request.project_ids))
+        projects = [(project, project.account) for project in session.exec(statement.order_by(Project.id)).all()]
+    if len(projects) != context.job.total:
+        context.set_total(len(projects))
+    return store_configured_projects(context, configure_and_store_projects(projects, request.max_workers))
+
+
+@router.post(
+    "/reconfigure/jobs",
+    response_model=JobPublic,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Reconfigure Git projects in the background",
+    description="""
+    Queues a background job that writes the remote URL and user config of existing projects again:
+    1. Loads the selected projects (all projects with an account by default) and their accounts
+    2. Configures them in parallel on a bounded worker pool, reporting each as a `job.item` event
+    3. Stores the updated projects in a single transaction, the summary becomes the job result
+    Send an `Idempotency-Key` header to get the same job back when the request is repeated.
+    """,
+)
+async def reconfigure_projects_job(
+    request: ProjectReconfigure, session: SessionDependency, idempotency_key: IdempotencyKeyHeader = None
+):
+    statement = select(func.count(Project.id)).where(Project.account_id.is_not(None))
+    if request.project_ids is not None:
+        statement = statement.where(Project.id.in_(request.project_ids))
+    try:
+        return job_manager.submit(
+            "project_reconfigure",
+            request.model_dump(mode="json"),
+            total=session.exec(statement).one(),
+            idempotency_key=idempotency_key,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post(
+    "/scan",
+    summary="Discover Git repositories",
+    description="""
+    Searches one or more directory trees for Git repositories without running git:
+    1. Lists directories in parallel, up to the depth limit and skipping ignored names
+    2. Detects repositories, worktrees and submodules by their .git directory or file
+    3. Streams one JSON line per repository with its remotes and whether it is already registered
+    4. Ends with a summary line
+
+    Found repositories can be registered in bulk by adding an account_id and posting them to /projects/batch.
+    """,
+    response_class=StreamingResponse,
+)
+async def scan_repositories(scan: RepositoryScanRequest, session: SessionDependency):
+    missing = [root for root in scan.roots if not Path(root).expanduser().is_dir()]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Not a directory: {', '.join(missing)}")
+
+    # Stored paths and scanned paths may differ in ~, symlinks or trailing separators
+    registered = {str(Path(path).expanduser().resolve()) for path in session.exec(select(Project.path)).all()}
+    scanner = RepositoryScanner(max_depth=scan.max_depth, ignore=scan.ignore, include_nested=scan.include_nested)
+
+    def stream() -> Iterator[str]:
+        found = 0
+        for repository in scanner.scan(scan.roots):
+            found += 1
+            repository.registered = str(Path(repository.path).resolve()) in registered
+            yield repository.model_dump_json() + "\n"
+        summary = RepositoryScanSummary(
+            repositories=found, directories=scanner.directories, errors=scanner.errors, elapsed=scanner.elapsed
+        )
+        yield summary.model_dump_json() + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@job_manager.handler("project_validation")
+async def run_project_validation(context: JobContext) -> list[dict]:
+    with Session(engine) as session:
+        projects = list(session.exec(select(Project).order_by(Project.id)).all())
+    if len(projects) != context.job.total:
+        context.set_total(len(projects))
+    indexes = {project.id: index for index, project in enumerate(projects)}
+
+    def on_result(result: ProjectValidationResult) -> None:
+        status = "succeeded" if result.valid else "failed"
+        context.item(indexes[result.project_id], status, **result.model_dump(mode="json"))
+
+    # Retries only handshake again with hosts that could not be reached, the others come from the host cache
+    refresh = context.payload.get("refresh", False) and context.attempt == 1
+    results = await validate_projects_async(projects, refresh=refresh, on_result=on_result)
+    unreachable = {result.host for result in results if result.retryable}
+    if unreachable and context.can_retry:
+        raise RetryJob(f"SSH hosts could not be reached: {', '.join(sorted(unreachable))}")
+    return [result.model_dump(mode="json") for result in results]
+
+
+@router.post(
+    "/validate/jobs",
+    response_model=JobPublic,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Validate all project configurations in the background",
+    description="""
+    Same as GET /projects/validate, but queues a background job and returns it right away.
+    Every project result is pushed as a `job.item` event on /api/events as soon as its host is checked.
+    When SSH hosts cannot be reached (timeouts, refused connections, DNS failures), the job is retried with
+    exponential backoff before reporting them as failed.
+    Send an `Idempotency-Key` header to get the same job back when the request is repeated.
+    """,
+)
+async def validate_projects_job(
+    session: SessionDependency, refresh: bool = False, idempotency_key: IdempotencyKeyHeader = None
+):
+    try:
+        return job_manager.submit(
+            "project_validation",
+            {"refresh": refresh},
+            total=session.exec(select(func.count(Project.id))).one(),
+            idempotency_key=idempotency_key,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get(
+    "/validate",
+    response_model=list[ProjectValidationResult],
+    summary="Validate all project configurations",
+    description="""
+    Validates every Git project in one request:
+    1. Groups projects by the SSH host in their remote URL
+    2. Tests each distinct host once, concurrently, reusing recent results from a per-host cache
+    3. Reports the host result for every project that uses it
+    Pass `refresh=true` to ignore cached host results.
+    """,
+)
+async def validate_projects(session: SessionDependency, refresh: bool = False):
+    projects = session.exec(select(Project)).all()
+    return await validate_projects_async(list(projects), refresh=refresh)
+
+
+def filter_projects(statement, query: ProjectQuery):
+    if query.account_id is not None:
+        statement = statement.where(Project.account_id == query.account_id)
+    if query.configured is not None:
+        statement = statement.where(Project.configured == query.configured)
+    if query.remote_name is not None:
+        statement = statement.where(Project.remote_name == query.remote_name)
+    if query.name_prefix:
+        statement = statement.where(prefix_filter(Project.name, query.name_prefix))
+    if query.path_prefix:
+        statement = statement.where(prefix_filter(Project.path, query.path_prefix))
+    return statement
+
+
 @router.get(
     "",
     response_model=list[ProjectPublic],
     summary="List all Git projects",
-    description="Retrieves a list of all Git projects with pagination support.",
+    description=(
+        "Retrieves a list of Git projects, filtered by account, configuration state, remote, name or path prefix. "
+        "Supports keyset pagination through the cursor returned in the X-Next-Cursor header."
+    ),
 )
+@cached_response("projects")
 async def read_projects(
     session: SessionDependency,
-    offset: int = 0,
-    limit: Annotated[int, Query(le=100)] = 100,
+    query: Annotated[ProjectQuery, Query()],
+    response: Response,
 ):
-    projects = session.exec(select(Project).offset(offset).limit(limit)).all()
-    return projects
+    rows = paginate(session, filter_projects(select(Project), query), Project, query, response)
+    return select_fields(rows, ProjectPublic, query.fields, response)
+
+
+@router.get(
+    "/with-account",
+    response_model=list[ProjectPublicWithAccount],
+    summary="List all Git projects with their accounts",
+    description="Retrieves a list of Git projects with their account and its type embedded, in a single query.",
+)
+@cached_response("projects", "accounts", "account_types")
+async def read_projects_with_account(
+    session: SessionDependency,
+    query: Annotated[ProjectQuery, Query()],
+    response: Response,
+):
+    statement = filter_projects(select(Project), query).options(*PROJECT_WITH_ACCOUNT)
+    rows = paginate(session, statement, Project, query, response)
+    return select_fields(rows, ProjectPublicWithAccount, query.fields, response)
 
 
 @router.get(
@@ -69,8 +366,9 @@ async def read_projects(
     summary="Get a specific Git project",
     description="Retrieves detailed information about a specific Git project including its associated account.",
 )
+@cached_response("projects", "accounts", "account_types", id_param="project_id")
 async def read_project(project_id: int, session: SessionDependency):
-    project = session.get(Project, project_id)
+    project = session.get(Project, project_id, options=PROJECT_WITH_ACCOUNT)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
@@ -105,7 +403,7 @@ async def update_project(project_id: int, project: ProjectUpdate, session: Sessi
             raise HTTPException(status_code=404, detail="New account not found")
         try:
             # Reconfigure project with new account
-            project_db = configure_project(project_db, new_account)
+            project_db = await configure_project_async(project_db, new_account)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to reconfigure project: {e!s}")
 
@@ -149,7 +447,7 @@ async def validate_project(project_id: int, session: SessionDependency):
         raise HTTPException(status_code=400, detail="Project is not configured")
     # Validate the project configuration
     try:
-        validate_project_configuration(project)
+        await validate_project_configuration_async(project)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     return {"message": "Project is configured correctly"}
@@ -0,0 +1,22 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from app.api.dependencies import SessionDependency
+from app.core.search import search
+from app.models import SearchQuery, SearchResult
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get(
+    "",
+    response_model=list[SearchResult],
+    summary="Search projects and accounts",
+    description=(
+        "Full-text search over project names, paths and remote URLs and account names, user names and emails. "
+        "Results are ranked by relevance and paginated with offset and limit."
+    ),
+)
+async def search_items(session: SessionDependency, query: Annotated[SearchQuery, Query()]):
+    return search(session, query)
@@ -1,21 +1,14 @@
+import asyncio
 import os
 import platform
 import shutil
-import subprocess
-from tkinter import Tk, filedialog
+from functools import cache
 
 from fastapi import APIRouter, HTTPException
 
-from app.models import FolderResponse
-
-# Configure DPI Awareness for Windows
-if platform.system() == "Windows":
-    try:
-        from ctypes import windll
-
-        windll.shcore.SetProcessDpiAwareness(1)
-    except Exception as e:
-        print(f"Could not set DPI awareness: {e}")
+from app.models import FolderResponse, SSHMasterStatus, SSHMultiplexingStatus, SSHMultiplexingUpdate
+from app.utils.async_git_manager import AsyncGitManager
+from app.utils.ssh_manager import get_ssh_multiplexing, list_managed_hosts, set_ssh_multiplexing
 
 router = APIRouter(
     prefix="/system",
@@ -24,10 +17,26 @@ router = APIRouter(
 )
 
 
+@cache
+def configure_dpi_awareness() -> None:
+    """Configure DPI Awareness for Windows, once before the first dialog"""
+    if platform.system() == "Windows":
+        try:
+            from ctypes import windll
+
+            windll.shcore.SetProcessDpiAwareness(1)
+        except Exception as e:
+            print(f"Could not set DPI awareness: {e}")
+
+
 @router.post("/folder-select", response_model=FolderResponse)
 async def trigger_folder_dialog():
     """Opens a native folder selection dialog on the server."""
     try:
+        # Imported on first use: Tk is only needed here and slows down every start of the server
+        from tkinter import Tk, filedialog
+
+        configure_dpi_awareness()
         root = Tk()
         root.withdraw()
         root.call("wm", "attributes", ".", "-topmost", True)
@@ -62,7 +71,7 @@ async def check_prerequisites():
     git_version = None
     if git_installed:
         try:
-            result = subprocess.run(["git", "--version"], capture_output=True, text=True, check=False)
+            result = await AsyncGitManager.run(["git", "--version"])
             git_version = result.stdout.strip() if result.returncode == 0 else None
         except Exception:
             git_installed = False
@@ -71,7 +80,7 @@ async def check_prerequisites():
     ssh_version = None
     if ssh_installed:
         try:
-            result = subprocess.run(["ssh", "-V"], capture_output=True, text=True, check=False)
+            result = await AsyncGitManager.run(["ssh", "-V"])
             # SSH version is typically printed to stderr
             ssh_version = result.stderr.strip() if result.stderr else result.stdout.strip()
         except Exception:
@@ -87,3 +96,51 @@ async def check_prerequisites():
             "python_version": platform.python_version(),
         },
     }
+
+
+@router.get("/ssh-multiplexing", response_model=SSHMultiplexingStatus)
+async def read_ssh_multiplexing():
+    """Whether SSH connection multiplexing is in effect for managed hosts, including hosts created from now on."""
+    return SSHMultiplexingStatus(enabled=get_ssh_multiplexing(), hosts=list_managed_hosts())
+
+
+@router.put("/ssh-multiplexing", response_model=SSHMultiplexingStatus)
+async def update_ssh_multiplexing(update: SSHMultiplexingUpdate):
+    """
+    Enable or disable SSH connection multiplexing for all managed hosts.
+
+    Rewrites the ControlMaster/ControlPath/ControlPersist options of every `Host github-*` block so that
+    repeated validations and git operations reuse a warm master connection instead of a new handshake.
+    The mode is stored and replaces GIT_MANAGER_SSH_MULTIPLEXING for the Host blocks of new accounts.
+    """
+    if update.enabled and platform.system() == "Windows":
+        raise HTTPException(status_code=400, detail="SSH connection multiplexing is not supported on Windows")
+    try:
+        hosts = set_ssh_multiplexing(update.enabled)
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return SSHMultiplexingStatus(enabled=update.enabled, hosts=hosts)
+
+
+@router.get("/ssh-masters", response_model=list[SSHMasterStatus])
+async def read_ssh_masters():
+    """List the managed SSH hosts and whether a persistent master connection is running for each."""
+    hosts = list_managed_hosts()
+    statuses = await asyncio.gather(*(AsyncGitManager.check_control_master(host) for host in hosts))
+    return [
+        SSHMasterStatus(host=host, running=running, detail=detail)
+        for host, (running, detail) in zip(hosts, statuses, strict=True)
+    ]
+
+
+@router.delete("/ssh-masters", response_model=list[SSHMasterStatus])
+async def delete_ssh_masters(host: str | None = None):
+    """Tear down the persistent SSH master connection of one host, or of every managed host."""
+    managed_hosts = list_managed_hosts()
+    if host and host not in managed_hosts:
+        raise HTTPException(status_code=404, detail=f"Managed SSH host not found: {host}")
+    hosts = [host] if host else managed_hosts
+    statuses = await asyncio.gather(*(AsyncGitManager.check_control_master(host) for host in hosts))
+    running_hosts = [host for host, (running, _) in zip(hosts, statuses, strict=True) if running]
+    await asyncio.gather(*(AsyncGitManager.exit_control_master(host) for host in running_hosts))
+    return [SSHMasterStatus(host=host, running=False, detail="Master stopped") for host in running_hosts]
@@ -1,8 +1,18 @@
 from fastapi import APIRouter
 
+from app.api.caching import response_cache
+from app.utils.file_cache import public_key_cache, ssh_config_cache
+from app.utils.repo_inspector import git_config_cache
+
 router = APIRouter(prefix="/utils", tags=["Utils"])
 
 
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get("/cache-stats/")
+async def cache_stats() -> list[dict]:
+    """Hit/miss counters and sizes of the in-memory file and response caches."""
+    return [ssh_config_cache.stats(), public_key_cache.stats(), git_config_cache.stats(), response_cache.stats()]
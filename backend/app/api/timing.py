@@ -0,0 +1,51 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import RequestTimings, http_request_seconds, request_timings
+
+
+class ServerTimingMiddleware:
+    """
+    Times every API request: the duration goes to the HTTP histogram, labelled with the route template, and the
+    time spent in subprocesses, SQL, commits and config I/O while handling it is sent in a ``Server-Timing``
+    header. Time spent after the headers were sent, e.g. in streamed responses, only counts towards the histogram.
+    """
+
+    def __init__(self, app: ASGIApp, prefix: str, server_timing: bool):
+        self.app = app
+        self.prefix = prefix
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            # The route template keeps the number of series bounded, unlike the path with its ids
+            route = getattr(scope.get("route"), "path", None)
+            if route is None:
+                route = "unmatched"
+            elif not route.startswith(self.prefix):
+                # Routes of included routers may be relative to the API prefix
+                route = self.prefix + route
+            http_request_seconds.observe(
+                time.perf_counter() - timings.started, method=scope["method"], route=route, status=str(status)
+            )
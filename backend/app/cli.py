@@ -0,0 +1,321 @@
+"""
+Command line interface of the Git Account Manager.
+
+Subcommands call the service layer and the database directly, without starting the web server, and write
+their results to stdout as JSON lines. Log messages of the service layer go to stderr. Without a subcommand
+the web server is started.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TextIO
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, or_, select
+
+from app.core.database import create_db_and_tables, engine
+from app.core.loading import ACCOUNT_PUBLIC
+from app.models import (
+    Account,
+    AccountBatchSummary,
+    AccountCreate,
+    AccountPublic,
+    AccountType,
+    AccountTypePublic,
+    Project,
+    ProjectBatchSummary,
+    ProjectCreate,
+    ProjectPublic,
+)
+from app.utils.services import (
+    configure_and_store_projects,
+    create_and_store_accounts,
+    get_or_create_account_type,
+    sync_ssh_config,
+    validate_projects_async,
+)
+
+
+class CommandError(Exception):
+    """Raised for invalid input; reported on stderr with exit status 2"""
+
+
+class JSONLines:
+    """Writes models and dicts to a stream as one JSON object per line"""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def write(self, item: BaseModel | dict) -> None:
+        line = item.model_dump_json() if isinstance(item, BaseModel) else json.dumps(item)
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def write_all(self, items: Iterable[BaseModel | dict]) -> None:
+        for item in items:
+            self.write(item)
+
+
+def read_records(path: str) -> list[dict]:
+    """Reads one JSON object per line from a file, or from stdin if ``path`` is '-'"""
+    try:
+        lines = sys.stdin.readlines() if path == "-" else Path(path).read_text(encoding="utf-8").splitlines()
+    except OSError as e:
+        raise CommandError(str(e))
+    records = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise CommandError(f"Invalid JSON on line {number} of {path}: {e}")
+        if not isinstance(record, dict):
+            raise CommandError(f"Line {number} of {path} is not a JSON object")
+        records.append(record)
+    return records
+
+
+def list_resources(args: argparse.Namespace, output: JSONLines) -> int:
+    with Session(engine) as session:
+        if args.resource == "accounts":
+            accounts = session.exec(select(Account).options(*ACCOUNT_PUBLIC).order_by(Account.id)).all()
+            output.write_all(AccountPublic.model_validate(account) for account in accounts)
+        elif args.resource == "projects":
+            statement = select(Project).order_by(Project.id)
+            if args.configured is not None:
+                statement = statement.where(Project.configured == args.configured)
+            output.write_all(ProjectPublic.model_validate(project) for project in session.exec(statement).all())
+        else:
+            account_types = session.exec(select(AccountType).order_by(AccountType.id)).all()
+            output.write_all(AccountTypePublic.model_validate(account_type) for account_type in account_types)
+    return 0
+
+
+def prepare_accounts(session: Session, records: list[dict]) -> list[tuple[Account, str]]:
+    """Validates new accounts and pairs every account with the name of its account type, created if missing"""
+    type_names = [record.get("account_type_name") or "personal" for record in records]
+    account_types = {name: get_or_create_account_type(session, name) for name in set(type_names)}
+    try:
+        accounts = [
+            AccountCreate.model_validate(
+                {"user_name": record.get("name"), **record, "account_type_id": account_types[type_name].id}
+            )
+            for record, type_name in zip(records, type_names, strict=True)
+        ]
+    except ValidationError as e:
+        raise CommandError(str(e))
+    for field in ("name", "user_email"):
+        values = [getattr(account, field) for account in accounts]
+        duplicates = sorted({value for value in values if values.count(value) > 1})
+        if duplicates:
+            raise CommandError(f"Duplicate account {field}s: {', '.join(duplicates)}")
+
+    names = [account.name for account in accounts]
+    emails = [account.user_email for account in accounts]
+    existing = session.exec(
+        select(Account.name).where(or_(Account.name.in_(names), Account.user_email.in_(emails)))
+    ).all()
+    if existing:
+        raise CommandError(f"Accounts already exist: {', '.join(sorted(existing))}")
+
+    # Only the name is passed on, so the accounts can be stored in another session than this one
+    return [
+        (Account.model_validate(account), type_name) for account, type_name in zip(accounts, type_names, strict=True)
+    ]
+
+
+def add_accounts(args: argparse.Namespace, output: JSONLines) -> int:
+    if args.file:
+        records = read_records(args.file)
+    elif args.name and args.email:
+        records = [{"name": args.name, "user_email": args.email, "account_type_name": args.type}]
+        if args.user_name:
+            records[0]["user_name"] = args.user_name
+    else:
+        raise CommandError("Pass a name and an email, or --file")
+    if not records:
+        raise CommandError("No accounts to create")
+
+    with Session(engine) as session:
+        accounts = prepare_accounts(session, records)
+    failed = False
+    for line in create_and_store_accounts(accounts, args.jobs):
+        output.write(line)
+        failed |= line.status == "failed" or (isinstance(line, AccountBatchSummary) and line.failed > 0)
+    return 1 if failed else 0
+
+
+def prepare_projects(session: Session, records: list[dict]) -> list[tuple[Project, Account]]:
+    """Validates projects to configure and pairs every project with its account, referenced by name"""
+    account_names = {record.get("account") for record in records}
+    accounts = {
+        account.name: account
+        for account in session.exec(
+            select(Account).where(Account.name.in_(account_names)).options(selectinload(Account.account_type))
+        ).all()
+    }
+    missing = account_names - accounts.keys()
+    if missing:
+        raise CommandError(f"Account not found: {', '.join(sorted(str(name) for name in missing))}")
+
+    paths = [str(Path(record.get("path") or "").expanduser().resolve()) for record in records]
+    duplicates = sorted({path for path in paths if paths.count(path) > 1})
+    if duplicates:
+        raise CommandError(f"Duplicate project paths: {', '.join(duplicates)}")
+
+    projects = []
+    for record, path in zip(records, paths, strict=True):
+        try:
+            project = ProjectCreate(
+                path=path,
+                name=record.get("name") or Path(path).name,
+                account_id=accounts[record["account"]].id,
+            )
+        except ValidationError as e:
+            raise CommandError(str(e))
+        projects.append((Project.model_validate(project), accounts[record["account"]]))
+    return projects
+
+
+def configure_projects(args: argparse.Namespace, output: JSONLines) -> int:
+    if args.file:
+        records = read_records(args.file)
+    elif args.path and args.account:
+        records = [{"path": args.path, "account": args.account, "name": args.name}]
+    else:
+        raise CommandError("Pass a path and --account, or --file")
+    if not records:
+        raise CommandError("No projects to configure")
+
+    with Session(engine) as session:
+        projects = prepare_projects(session, records)
+    failed = False
+    for line in configure_and_store_projects(projects, args.jobs):
+        output.write(line)
+        failed |= line.status == "failed" or (isinstance(line, ProjectBatchSummary) and line.failed > 0)
+    return 1 if failed else 0
+
+
+def validate_projects(args: argparse.Namespace, output: JSONLines) -> int:
+    statement = select(Project).order_by(Project.id)
+    if args.project_ids:
+        statement = statement.where(Project.id.in_(args.project_ids))
+    else:
+        statement = statement.where(Project.configured)
+    with Session(engine) as session:
+        projects = session.exec(statement).all()
+    missing = set(args.project_ids) - {project.id for project in projects}
+    if missing:
+        raise CommandError(f"Project not found: {', '.join(str(project_id) for project_id in sorted(missing))}")
+    results = asyncio.run(validate_projects_async(projects, on_result=output.write, max_concurrency=args.jobs))
+    return 0 if all(result.valid for result in results) else 1
+
+
+def sync_ssh(args: argparse.Namespace, output: JSONLines) -> int:
+    with Session(engine) as session:
+        output.write(sync_ssh_config(session))
+    return 0
+
+
+def serve(args: argparse.Namespace, output: JSONLines) -> int:
+    from app.main import main as run_server
+
+    run_server(host=args.host, port=args.port)
+    return 0
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="git-manager", description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    jobs = argparse.ArgumentParser(add_help=False)
+    jobs.add_argument("--jobs", "-j", type=positive_int, default=None, help="Operations run in parallel")
+
+    serve_parser = subparsers.add_parser("serve", help="Start the web server (default)")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.set_defaults(handler=serve)
+
+    list_parser = subparsers.add_parser("list", help="List accounts, projects or account types")
+    list_parser.add_argument("resource", choices=["accounts", "projects", "account-types"])
+    configured = list_parser.add_mutually_exclusive_group()
+    configured.add_argument("--configured", action="store_true", default=None, help="Only configured projects")
+    configured.add_argument(
+        "--unconfigured", dest="configured", action="store_false", help="Only unconfigured projects"
+    )
+    list_parser.set_defaults(handler=list_resources)
+
+    account_parser = subparsers.add_parser(
+        "add-account",
+        parents=[jobs],
+        help="Create accounts with their SSH keys and SSH config hosts",
+        description="Creates one account, or many from a JSON lines file with name, user_email, user_name and "
+        "account_type_name. SSH keys are generated in parallel.",
+    )
+    account_parser.add_argument("name", nargs="?")
+    account_parser.add_argument("email", nargs="?")
+    account_parser.add_argument("--user-name", help="Git user name, defaults to the account name")
+    account_parser.add_argument("--type", default="personal", help="Account type, created if missing")
+    account_parser.add_argument("--file", "-f", help="JSON lines file of accounts, '-' for stdin")
+    account_parser.set_defaults(handler=add_accounts)
+
+    project_parser = subparsers.add_parser(
+        "configure-project",
+        parents=[jobs],
+        help="Configure repositories to use an account and store them as projects",
+        description="Configures one repository, or many from a JSON lines file with path, account (its name) and "
+        "optionally name. Repositories are configured in parallel.",
+    )
+    project_parser.add_argument("path", nargs="?")
+    project_parser.add_argument("--account", "-a", help="Name of the account")
+    project_parser.add_argument("--name", help="Project name, defaults to the directory name")
+    project_parser.add_argument("--file", "-f", help="JSON lines file of projects, '-' for stdin")
+    project_parser.set_defaults(handler=configure_projects)
+
+    validate_parser = subparsers.add_parser(
+        "validate",
+        parents=[jobs],
+        help="Check the SSH connection of projects, one handshake per host",
+        description="Validates the given projects, or all configured projects. Exits with 1 if any is invalid.",
+    )
+    validate_parser.add_argument("project_ids", nargs="*", type=int, metavar="PROJECT_ID")
+    validate_parser.set_defaults(handler=validate_projects)
+
+    sync_parser = subparsers.add_parser("sync-ssh", help="Import accounts from the Host blocks of the SSH config")
+    sync_parser.set_defaults(handler=sync_ssh)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(["serve"])
+
+    output = JSONLines(sys.stdout)
+    try:
+        if args.command != "serve":
+            create_db_and_tables()
+        # The service layer logs with print, which must not end up between the JSON lines
+        with contextlib.redirect_stdout(sys.stderr) if args.command != "serve" else contextlib.nullcontext():
+            return args.handler(args, output)
+    except CommandError as e:
+        print(f"git-manager: error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+from pathlib import Path
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Database, generated git config fragments and stored preferences live in the user's home directory
+USER_HOME = Path.home()
+APP_DATA_DIR = USER_HOME / ".git-account-manager"
+APP_DATA_DIR.mkdir(exist_ok=True)
+
+
+class Settings(BaseSettings):
+    """Application settings, overridable with ``GIT_MANAGER_*`` environment variables"""
+
+    model_config = SettingsConfigDict(env_prefix="GIT_MANAGER_", extra="ignore")
+
+    # Upper bound for worker threads used by batch project configuration
+    PROJECT_BATCH_MAX_WORKERS: int = 8
+    # Upper bound for ssh-keygen processes running at once during batch account creation
+    ACCOUNT_BATCH_MAX_WORKERS: int = 8
+
+    # Timeouts (in seconds) for git and ssh commands run by AsyncGitManager
+    GIT_COMMAND_TIMEOUT: float = 30.0
+    SSH_COMMAND_TIMEOUT: float = 15.0
+
+    # Seconds a per-host SSH validation result is reused, and how many handshakes may run at once
+    SSH_VALIDATION_CACHE_TTL: float = 300.0
+    SSH_VALIDATION_MAX_CONCURRENCY: int = 16
+
+    # Add ControlMaster/ControlPath/ControlPersist to generated Host blocks so SSH connections are reused.
+    # Only the default: a mode chosen with PUT /api/system/ssh-multiplexing is stored and takes precedence.
+    SSH_MULTIPLEXING: bool = False
+    SSH_CONTROL_PATH: str = "~/.ssh/git-manager-%C"
+    SSH_CONTROL_PERSIST: str = "10m"
+
+    # Seconds to wait for another process (the server or a CLI run) to finish changing ~/.ssh/config
+    SSH_CONFIG_LOCK_TIMEOUT: float = 10.0
+
+    # Maximum number of parsed files (SSH configs, public keys) kept per in-memory file cache
+    FILE_CACHE_MAX_ENTRIES: int = 1024
+
+    # Rendered GET responses of accounts, account types and projects kept for ETag revalidation
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+
+    # Responses smaller than this are sent uncompressed; Brotli is used when brotli-asgi is installed
+    RESPONSE_COMPRESSION_MINIMUM_SIZE: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_ENABLED: bool = True
+
+    # Add a Server-Timing header with the time spent in subprocesses, SQL and config I/O to every API response
+    SERVER_TIMING_ENABLED: bool = True
+    # git/ssh processes running at least this many seconds are logged as warnings with their command line and directory
+    SLOW_COMMAND_THRESHOLD: float = 1.0
+
+    # SQLite storage profile, applied as PRAGMAs on every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    # Negative values are KiB, positive values are pages
+    SQLITE_CACHE_SIZE: int = -64 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_FOREIGN_KEYS: bool = True
+
+    # Connection pool sized for concurrent readers (WAL lets readers run alongside one writer)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+
+    # Repository discovery: worker threads listing directories, default depth and directory names never entered
+    REPO_SCAN_MAX_WORKERS: int = 16
+    REPO_SCAN_MAX_DEPTH: int = 6
+    REPO_SCAN_IGNORE: list[str] = [
+        "node_modules",
+        ".venv",
+        "venv",
+        "__pycache__",
+        ".tox",
+        ".cache",
+        ".mypy_cache",
+        ".pytest_cache",
+        "site-packages",
+    ]
+
+    # Drift watcher: compares configured repositories and the SSH config against the database in the background.
+    # Uses filesystem notifications (watchfiles) when installed, otherwise polls file stamps every interval.
+    DRIFT_WATCH_ENABLED: bool = True
+    DRIFT_USE_NOTIFICATIONS: bool = True
+    DRIFT_POLL_INTERVAL: float = 2.0
+
+    # Server-Sent Events: events kept for clients resuming with Last-Event-ID, and per-client queue size
+    EVENT_HISTORY_SIZE: int = 1000
+    EVENT_QUEUE_SIZE: int = 1000
+
+    # Background jobs: jobs running at once, and finished jobs kept in the database
+    JOB_MAX_WORKERS: int = 4
+    JOB_HISTORY_SIZE: int = 200
+    # Jobs that hit transient SSH failures are retried after JOB_RETRY_BACKOFF seconds, doubling per attempt
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 5.0
+    JOB_RETRY_BACKOFF_MAX: float = 300.0
+
+
+settings = Settings()
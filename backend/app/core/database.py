@@ -1,14 +1,17 @@
-from pathlib import Path
+import time
+import zlib
 
+from sqlalchemy import event, text
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlmodel import Session, SQLModel, create_engine, select
 
+from app.core.config import APP_DATA_DIR, settings
+from app.core.search import TOKENIZER, TRIGGERS, create_search_index
 from app.models import AccountType
+from app.utils.metrics import commit_seconds, sql_seconds
 
 # Create database URL in user's home directory (.git-account-manager)
-USER_HOME = Path.home()
-APP_DATA_DIR = USER_HOME / ".git-account-manager"
-APP_DATA_DIR.mkdir(exist_ok=True)
-
 sqlite_file_name = APP_DATA_DIR / "git_accounts.db"
 sqlite_url = f"sqlite:///{sqlite_file_name}"
 
@@ -16,12 +19,112 @@ engine = create_engine(
     sqlite_url,
     echo=False,  # Set to True to see SQL queries in console
     connect_args={"check_same_thread": False},  # Needed for SQLite
+    poolclass=QueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
 )
 
 
+def get_sqlite_pragmas() -> dict[str, str | int]:
+    """PRAGMAs of the configured storage profile"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "foreign_keys": "ON" if settings.SQLITE_FOREIGN_KEYS else "OFF",
+    }
+
+
+@event.listens_for(engine, "connect")
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the storage profile to every new pooled connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in get_sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+# Statement kinds kept as the operation label of the SQL histogram, everything else is counted as OTHER
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA"}
+
+
+def get_statement_operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return operation if operation in SQL_OPERATIONS else "OTHER"
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def start_statement_timer(connection, cursor, statement, parameters, context, executemany):
+    connection.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def record_statement(connection, cursor, statement, parameters, context, executemany):
+    started = connection.info["statement_started"].pop()
+    sql_seconds.observe(time.perf_counter() - started, operation=get_statement_operation(statement))
+
+
+@event.listens_for(engine, "handle_error")
+def discard_statement_timer(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get("statement_started"):
+        context.connection.info["statement_started"].pop()
+
+
+@event.listens_for(Session, "before_commit")
+def start_commit_timer(session):
+    session.info["commit_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def record_commit(session):
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        commit_seconds.observe(time.perf_counter() - started)
+
+
+def get_schema_version() -> int:
+    """Fingerprint of the tables, indexes and search index the models define"""
+    tables = SQLModel.metadata.sorted_tables
+    ddl = [str(CreateTable(table).compile(engine)) for table in tables]
+    # Table.indexes is a set, sorted so the fingerprint is the same in every process
+    indexes = sorted((index for table in tables for index in table.indexes), key=lambda index: index.name)
+    ddl += [str(CreateIndex(index).compile(engine)) for index in indexes]
+    ddl += [TOKENIZER, *TRIGGERS]
+    # Stored as SQLite's user_version, a signed 32-bit integer
+    return zlib.crc32("\n".join(ddl).encode()) & 0x7FFFFFFF
+
+
 def create_db_and_tables():
+    """
+    Creates missing tables, indexes, the search index and the default account types.
+
+    The schema version is recorded in the database once this succeeded, so later starts with unchanged models
+    skip the checks with a single PRAGMA query.
+    """
+    schema_version = get_schema_version()
+    with engine.connect() as connection:
+        if connection.execute(text("PRAGMA user_version")).scalar() == schema_version:
+            return
     SQLModel.metadata.create_all(engine)
+    create_missing_indexes()
+    with engine.begin() as connection:
+        create_search_index(connection)
     create_default_account_types()
+    with engine.begin() as connection:
+        connection.execute(text(f"PRAGMA user_version = {schema_version}"))
+
+
+def create_missing_indexes():
+    # create_all skips tables that already exist, so indexes added to existing models are created here
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 
 def create_default_account_types():
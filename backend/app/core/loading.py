@@ -0,0 +1,26 @@
+# Eager loading strategies for the Account, Project and AccountType relationships.
+# Each strategy lists the relationships a response model serializes, so an endpoint loads them in a constant
+# number of queries instead of one lazy SELECT per row. Many-to-one relationships use joinedload (one JOIN,
+# no row multiplication), one-to-many relationships use selectinload (one extra IN query).
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import Account, AccountDirectory, AccountType, Project
+
+# AccountPublic: the account type is embedded in every row
+ACCOUNT_PUBLIC = (joinedload(Account.account_type),)
+
+# AccountPublicWithProjects: account type plus the account's projects
+ACCOUNT_WITH_PROJECTS = (joinedload(Account.account_type), selectinload(Account.projects))
+
+# ProjectPublic has no relationships
+PROJECT_PUBLIC = ()
+
+# ProjectPublicWithAccount: the account and, through AccountPublic, its account type
+PROJECT_WITH_ACCOUNT = (joinedload(Project.account).joinedload(Account.account_type),)
+
+# Account types together with their accounts
+ACCOUNT_TYPE_WITH_ACCOUNTS = (selectinload(AccountType.accounts),)
+
+# Routed directories with their account and, for AccountPublic, its account type
+DIRECTORY_WITH_ACCOUNT = (joinedload(AccountDirectory.account).joinedload(Account.account_type),)
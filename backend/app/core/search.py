@@ -0,0 +1,111 @@
+# Full-text search over projects and accounts, backed by an SQLite FTS5 table.
+# Projects and accounts share one index: a project's rowid is 2 * id and an account's rowid is 2 * id + 1, so
+# triggers on both tables can update their rows by rowid without scanning the index.
+
+import sqlite3
+
+from sqlalchemy import Connection, text
+from sqlmodel import Session
+
+from app.models import SearchQuery, SearchResult
+
+SEARCH_TABLE = "search_index"
+# Trigram tokens match any substring of three or more characters, e.g. a path fragment or part of a repo slug
+TRIGRAM = sqlite3.sqlite_version_info >= (3, 34, 0)
+TOKENIZER = "trigram" if TRIGRAM else "unicode61 tokenchars '-_.@/'"
+MIN_TERM_LENGTH = 3 if TRIGRAM else 1
+
+# Column weights for bm25(): kind, item_id, name, path, remote_url, user_name, user_email
+COLUMN_WEIGHTS = "0, 0, 10.0, 5.0, 5.0, 3.0, 5.0"
+TEXT_COLUMNS = ("name", "path", "remote_url", "user_name", "user_email")
+
+PROJECT_ROW = "2 * {row}.id, 'project', {row}.id, {row}.name, {row}.path, {row}.remote_url, NULL, NULL"
+ACCOUNT_ROW = "2 * {row}.id + 1, 'account', {row}.id, {row}.name, NULL, NULL, {row}.user_name, {row}.user_email"
+INSERT = f"INSERT INTO {SEARCH_TABLE}(rowid, kind, item_id, {', '.join(TEXT_COLUMNS)})"
+
+TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS project_search_insert AFTER INSERT ON project BEGIN
+        {INSERT} VALUES ({PROJECT_ROW.format(row="new")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS project_search_update AFTER UPDATE OF name, path, remote_url ON project BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = 2 * old.id;
+        {INSERT} VALUES ({PROJECT_ROW.format(row="new")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS project_search_delete AFTER DELETE ON project BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = 2 * old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS account_search_insert AFTER INSERT ON account BEGIN
+        {INSERT} VALUES ({ACCOUNT_ROW.format(row="new")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS account_search_update AFTER UPDATE OF name, user_name, user_email ON account BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = 2 * old.id + 1;
+        {INSERT} VALUES ({ACCOUNT_ROW.format(row="new")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS account_search_delete AFTER DELETE ON account BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = 2 * old.id + 1;
+    END""",
+]
+
+
+def create_search_index(connection: Connection) -> None:
+    """Creates the search table and its sync triggers, indexing existing rows when the table is new"""
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SEARCH_TABLE}
+    ).first()
+    if exists is None:
+        connection.execute(
+            text(
+                f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+                f'kind UNINDEXED, item_id UNINDEXED, {", ".join(TEXT_COLUMNS)}, tokenize = "{TOKENIZER}")'
+            )
+        )
+        connection.execute(text(f"{INSERT} SELECT {PROJECT_ROW.format(row='project')} FROM project"))
+        connection.execute(text(f"{INSERT} SELECT {ACCOUNT_ROW.format(row='account')} FROM account"))
+    for trigger in TRIGGERS:
+        connection.execute(text(trigger))
+
+
+def quote_term(term: str) -> str:
+    """Quotes a user supplied term so FTS5 treats it as a literal string rather than query syntax"""
+    quoted = '"' + term.replace('"', '""') + '"'
+    return quoted if TRIGRAM else quoted + "*"
+
+
+def search(session: Session, query: SearchQuery) -> list[SearchResult]:
+    """
+    Ranked search over project names, paths and remote URLs and account names, user names and emails.
+
+    Every term has to match. Terms shorter than the trigram length cannot use the index and are matched with
+    LIKE on the rows the other terms select.
+    """
+    terms = query.q.split()
+    indexed = [term for term in terms if len(term) >= MIN_TERM_LENGTH]
+    short = [term for term in terms if len(term) < MIN_TERM_LENGTH]
+
+    conditions = []
+    parameters: dict[str, str | int] = {"limit": query.limit, "offset": query.offset}
+    if indexed:
+        conditions.append(f"{SEARCH_TABLE} MATCH :match")
+        parameters["match"] = " ".join(quote_term(term) for term in indexed)
+    for index, term in enumerate(short):
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        parameters[f"like_{index}"] = f"%{escaped}%"
+        conditions.append(
+            "(" + " OR ".join(f"{column} LIKE :like_{index} ESCAPE '\\'" for column in TEXT_COLUMNS) + ")"
+        )
+    if query.kind is not None:
+        conditions.append("kind = :kind")
+        parameters["kind"] = query.kind
+    if not conditions:
+        return []
+
+    rank = f"bm25({SEARCH_TABLE}, {COLUMN_WEIGHTS})" if indexed else "0.0"
+    snippet = f"snippet({SEARCH_TABLE}, -1, '[', ']', '…', 64)" if indexed else "coalesce(path, user_email, name)"
+    statement = text(
+        f"SELECT kind, item_id, name, {snippet} AS snippet, {rank} AS rank FROM {SEARCH_TABLE} "
+        f"WHERE {' AND '.join(conditions)} ORDER BY rank, rowid LIMIT :limit OFFSET :offset"
+    )
+    rows = session.connection().execute(statement, parameters).all()
+    return [
+        SearchResult(kind=row.kind, id=row.item_id, name=row.name, snippet=row.snippet, rank=row.rank) for row in rows
+    ]
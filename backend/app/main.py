@@ -1,15 +1,28 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from starlette.types import Receive, Scope, Send
 
+from app.api.compression import CompressionMiddleware
 from app.api.main import api_router
+from app.api.responses import ORJSONResponse
+from app.api.timing import ServerTimingMiddleware
+from app.core.config import settings
 from app.core.database import create_db_and_tables
+from app.utils.drift import drift_monitor
+from app.utils.events import event_bus
+from app.utils.jobs import job_manager
 
 from . import __version__
 
+logger = logging.getLogger(__name__)
+
 prefix = "/api"
 
 
@@ -17,7 +30,20 @@ prefix = "/api"
 async def lifespan(app: FastAPI):
     # Startup
     create_db_and_tables()
+    event_bus.bind(asyncio.get_running_loop())
+    job_manager.start()
+    drift_task = asyncio.create_task(drift_monitor.run()) if settings.DRIFT_WATCH_ENABLED else None
     yield
+    # Shutdown
+    if drift_task is not None:
+        drift_monitor.stop()
+        try:
+            await asyncio.wait_for(drift_task, timeout=5)
+        except TimeoutError:
+            logger.warning("Drift watcher did not stop in time")
+    # Jobs still running after the timeout are queued again and restart with the next launch
+    await job_manager.shutdown(timeout=5)
+    event_bus.bind(None)
 
 
 app = FastAPI(
@@ -33,6 +59,8 @@ app = FastAPI(
     - Synchronize SSH configurations
     """,
     version=__version__,
+    # Kept as a default, so response models are still serialized by pydantic straight to JSON bytes
+    default_response_class=Default(ORJSONResponse),
     contact={
         "name": "NourEldin",
         "email": "noureldin.osama.saad@gmail.com",
@@ -50,8 +78,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend read the pagination cursor, the ETag of cached read endpoints and the request timings
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.RESPONSE_COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.RESPONSE_GZIP_LEVEL,
+    brotli=settings.RESPONSE_BROTLI_ENABLED,
+)
+
+app.add_middleware(ServerTimingMiddleware, prefix=prefix, server_timing=settings.SERVER_TIMING_ENABLED)
+
 app.include_router(api_router, prefix=prefix)
 
 # Set the static directory to serve frontend files
@@ -61,28 +100,39 @@ STATIC_DIRS = [
     Path(__file__).resolve().parent / "static",
 ]
 
-STATIC_DIR = None
-for static_dir in STATIC_DIRS:
-    if static_dir.exists():
-        STATIC_DIR = static_dir
-        break
-else:
+
+def find_static_dir() -> Path:
+    for static_dir in STATIC_DIRS:
+        if static_dir.exists():
+            return static_dir
     raise FileNotFoundError("Static directory not found.")
 
 
-app.mount("/", StaticFiles(directory=STATIC_DIR, html=True), name="static")
+class FrontendFiles:
+    """Serves the frontend build, located on the first request instead of when the app is imported"""
+
+    def __init__(self):
+        self.app: StaticFiles | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.app is None:
+            self.app = StaticFiles(directory=find_static_dir(), html=True)
+        await self.app(scope, receive, send)
+
+
+app.mount("/", FrontendFiles(), name="static")
 
 
-def main() -> None:
+def main(host: str = "127.0.0.1", port: int = 8000) -> None:
     """Start the FastAPI application server.
 
     This function initializes and starts the FastAPI server with the following configuration:
-    - Host: 127.0.0.1 (localhost)
-    - Port: 8000
+    - Host: 127.0.0.1 (localhost) by default
+    - Port: 8000 by default
     """
     import uvicorn
 
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    uvicorn.run(app, host=host, port=port)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,24 @@
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Literal
 
 import sqlalchemy as sa
 from pydantic import EmailStr, computed_field
 from sqlmodel import Field, Relationship, SQLModel
 
 
+class PageQuery(SQLModel):
+    offset: int = Field(default=0, ge=0, description="Rows to skip, prefer cursor for deep pages")
+    limit: int = Field(default=100, ge=1, le=100)
+    cursor: str | None = Field(default=None, description="Opaque cursor from the X-Next-Cursor response header")
+    sort: Literal["id", "-id", "updated_at", "-updated_at"] = Field(
+        default="id", description="Sort key, prefix with '-' for descending order"
+    )
+    fields: str | None = Field(
+        default=None, description="Comma-separated fields to return, e.g. 'id,name', to leave out heavy columns"
+    )
+
+
 class TimestampMixin(SQLModel):
     created_at: datetime | None = Field(
         default=None,
@@ -18,6 +31,7 @@ class TimestampMixin(SQLModel):
         default=None,
         sa_type=sa.DateTime(timezone=True),
         sa_column_kwargs={"server_default": sa.func.now(), "onupdate": sa.func.now()},
+        index=True,
     )
 
 
@@ -53,6 +67,10 @@ class AccountTypePublic(AccountTypeBase):
     id: int
 
 
+class AccountTypeQuery(PageQuery):
+    name_prefix: str | None = None
+
+
 class AccountBase(SQLModel):
     name: str = Field(
         ...,
@@ -93,6 +111,7 @@ class AccountBase(SQLModel):
 class Account(TableMixin, AccountBase, table=True):
     projects: list["Project"] = Relationship(back_populates="account")
     account_type: AccountType | None = Relationship(back_populates="accounts")
+    directories: list["AccountDirectory"] = Relationship(back_populates="account", cascade_delete=True)
 
 
 class AccountCreate(AccountBase):
@@ -116,6 +135,40 @@ class AccountPublic(AccountBase):
         return Path(self.ssh_key_path).name
 
 
+class AccountBatchCreate(SQLModel):
+    accounts: list[AccountCreate] = Field(..., min_length=1, description="Accounts to create")
+    max_workers: int | None = Field(
+        default=None,
+        ge=1,
+        description="Number of SSH keys generated in parallel, capped by the server-side limit",
+    )
+
+
+class AccountBatchResult(SQLModel):
+    event: str = "result"
+    index: int
+    name: str
+    status: str = Field(..., description="Either 'generated' or 'failed'")
+    ssh_key_path: str | None = None
+    error: str | None = None
+
+
+class AccountBatchSummary(SQLModel):
+    event: str = "summary"
+    status: str = Field(..., description="Either 'completed' or 'failed'")
+    created: int
+    failed: int
+    error: str | None = None
+    accounts: list[AccountPublic] = []
+
+
+class AccountQuery(PageQuery):
+    account_type: str | None = Field(default=None, description="Account type name")
+    account_type_id: int | None = None
+    name_prefix: str | None = None
+    user_email: str | None = None
+
+
 class AccountUpdate(SQLModel):
     name: str | None = None
     account_type_id: int | None = None
@@ -125,6 +178,28 @@ class AccountUpdate(SQLModel):
     public_key: str | None = None
 
 
+class SSHConfigAccount(SQLModel):
+    host: str = Field(..., description="Account name derived from the Host alias")
+    identity_file: str
+    email: str | None = None
+    type: str = Field(..., description="Account type derived from the Host alias")
+    public_key: str | None = Field(default=None, exclude=True)
+
+
+class SSHConfigSyncDiff(SQLModel):
+    inserted: list[str] = Field(default=[], description="Accounts created from new Host blocks")
+    updated: list[str] = Field(default=[], description="Accounts whose SSH key changed in the SSH config")
+    unchanged: list[str] = Field(default=[], description="Accounts already matching the SSH config")
+    orphaned: list[str] = Field(default=[], description="Accounts without a Host block, left untouched")
+    skipped: list[str] = Field(default=[], description="Hosts without a readable public key, or duplicates")
+
+
+class SSHConfigSyncResult(SQLModel):
+    changed: bool
+    accounts: list[SSHConfigAccount] = []
+    diff: SSHConfigSyncDiff
+
+
 class ProjectBase(SQLModel):
     path: str = Field(
         index=True,
@@ -172,6 +247,95 @@ class ProjectPublic(ProjectBase):
     configured: bool
 
 
+class ProjectQuery(PageQuery):
+    account_id: int | None = None
+    configured: bool | None = None
+    remote_name: str | None = None
+    name_prefix: str | None = None
+    path_prefix: str | None = None
+
+
+class ProjectBatchCreate(SQLModel):
+    projects: list[ProjectCreate] = Field(..., min_length=1, description="Projects to configure and create")
+    max_workers: int | None = Field(
+        default=None,
+        ge=1,
+        description="Number of projects configured in parallel, capped by the server-side limit",
+    )
+
+
+class ProjectReconfigure(SQLModel):
+    project_ids: list[int] | None = Field(
+        default=None,
+        description="Projects to configure again with their account, all projects with an account if omitted",
+    )
+    max_workers: int | None = Field(
+        default=None,
+        ge=1,
+        description="Number of projects configured in parallel, capped by the server-side limit",
+    )
+
+
+class ProjectBatchResult(SQLModel):
+    event: str = "result"
+    index: int
+    path: str
+    status: str = Field(..., description="Either 'configured' or 'failed'")
+    remote_url: str | None = None
+    error: str | None = None
+
+
+class ProjectBatchSummary(SQLModel):
+    event: str = "summary"
+    status: str = Field(..., description="Either 'completed' or 'failed'")
+    configured: int
+    failed: int
+    error: str | None = None
+    projects: list[ProjectPublic] = []
+
+
+class RepositoryScanRequest(SQLModel):
+    roots: list[str] = Field(..., min_length=1, description="Directories to search for Git repositories")
+    max_depth: int | None = Field(default=None, ge=0, description="Directory levels below each root to search")
+    ignore: list[str] | None = Field(
+        default=None, description="Glob patterns of directory names or paths to skip, replaces the server default"
+    )
+    include_nested: bool = Field(default=False, description="Also search inside found repositories, e.g. submodules")
+
+
+class ScannedRepository(SQLModel):
+    event: str = "repository"
+    path: str
+    name: str
+    kind: str = Field(..., description="Either 'repository', 'worktree' or 'submodule'")
+    git_dir: str
+    remote_name: str | None = None
+    remote_url: str | None = None
+    remotes: dict[str, str] = {}
+    user_name: str | None = None
+    user_email: str | None = None
+    registered: bool = Field(default=False, description="Whether a project with this path already exists")
+    error: str | None = None
+
+
+class RepositoryScanSummary(SQLModel):
+    event: str = "summary"
+    repositories: int
+    directories: int
+    errors: int
+    elapsed: float
+
+
+class ProjectValidationResult(SQLModel):
+    project_id: int
+    name: str
+    host: str | None = None
+    valid: bool
+    cached: bool = Field(default=False, description="Whether the SSH result came from the per-host cache")
+    retryable: bool = Field(default=False, description="Whether the host could not be reached, so a retry may pass")
+    error: str | None = None
+
+
 class ProjectUpdate(SQLModel):
     path: str | None = None
     name: str | None = None
@@ -186,7 +350,141 @@ class AccountPublicWithProjects(AccountPublic):
     projects: list[ProjectPublic] = []
 
 
+class AccountDirectoryBase(SQLModel):
+    path: str = Field(
+        unique=True,
+        index=True,
+        description="Directory whose repositories, at any depth, use the account",
+        schema_extra={"examples": ["~/work", "/home/user/src/oss"]},
+    )
+    account_id: int = Field(foreign_key="account.id", ondelete="CASCADE", index=True)
+
+
+class AccountDirectory(TableMixin, AccountDirectoryBase, table=True):
+    account: Account | None = Relationship(back_populates="directories")
+
+
+class AccountDirectoryCreate(AccountDirectoryBase):
+    pass
+
+
+class AccountDirectoryPublic(AccountDirectoryBase):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class AccountDirectoryQuery(PageQuery):
+    account_id: int | None = None
+
+
+class AccountDirectoryResolution(SQLModel):
+    path: str
+    directory: AccountDirectoryPublic | None = None
+    account: AccountPublic | None = None
+
+
+class IdentityConfigSyncResult(SQLModel):
+    config_path: str
+    directories: int = Field(description="includeIf sections written to the global git config")
+    fragments: list[str] = Field(description="Per-account config fragments the sections include")
+    removed: list[str] = Field(default=[], description="Fragments of accounts without directories, deleted")
+
+
 class FolderResponse(SQLModel):
     status: str
     path: str | None = None
     message: str | None = None
+
+
+class SSHMasterStatus(SQLModel):
+    host: str
+    running: bool
+    detail: str | None = None
+
+
+class SSHMultiplexingUpdate(SQLModel):
+    enabled: bool = Field(..., description="Whether managed SSH hosts should reuse persistent master connections")
+
+
+class SSHMultiplexingStatus(SQLModel):
+    enabled: bool = Field(..., description="Whether new and existing managed SSH hosts use connection multiplexing")
+    hosts: list[str] = Field(default_factory=list, description="Managed SSH hosts")
+
+
+class SearchQuery(SQLModel):
+    q: str = Field(..., min_length=1, description="Words or fragments of names, paths, remote URLs or emails")
+    kind: Literal["project", "account"] | None = Field(default=None, description="Only return this kind of item")
+    offset: int = Field(default=0, ge=0)
+    limit: int = Field(default=20, ge=1, le=100)
+
+
+class SearchResult(SQLModel):
+    kind: Literal["project", "account"]
+    id: int
+    name: str
+    snippet: str = Field(description="Best matching field with the matched text in [brackets]")
+    rank: float = Field(description="BM25 relevance, lower is better")
+
+
+class DriftStatus(SQLModel):
+    project_id: int
+    name: str
+    path: str
+    drifted: bool
+    issues: list[str] = Field(default=[], description="Differences between the project's files and the database")
+    checked_at: datetime
+
+
+class DriftReport(SQLModel):
+    mode: str = Field(
+        ..., description="Either 'notifications' or 'polling', or 'stopped' if the watcher is not running"
+    )
+    files: int = Field(..., description="Number of config files being watched")
+    projects: list[DriftStatus]
+
+
+class Event(SQLModel):
+    id: int
+    type: str = Field(..., description="'invalidate', 'job', 'job.item' or 'drift'")
+    data: dict
+
+
+class JobBase(SQLModel):
+    kind: str = Field(..., index=True, description="What the job does, e.g. 'project_batch' or 'project_validation'")
+    status: str = Field(
+        default="pending", index=True, description="One of 'pending', 'running', 'succeeded' or 'failed'"
+    )
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    attempts: int = Field(default=0, description="Number of times the job was started")
+    max_attempts: int = 1
+    run_after: datetime | None = Field(
+        default=None,
+        sa_type=sa.DateTime(timezone=True),
+        description="Earliest start of a pending job, in the future while it waits to be retried",
+    )
+    started_at: datetime | None = Field(default=None, sa_type=sa.DateTime(timezone=True))
+    finished_at: datetime | None = Field(default=None, sa_type=sa.DateTime(timezone=True))
+    error: str | None = Field(default=None, description="Why the job failed, or why its last attempt is retried")
+    idempotency_key: str | None = Field(default=None, unique=True, max_length=255)
+
+
+class Job(TableMixin, JobBase, table=True):
+    payload: dict = Field(default_factory=dict, sa_type=sa.JSON)
+    result: Any = Field(default=None, sa_type=sa.JSON, nullable=True)
+
+
+class JobPublic(JobBase):
+    id: int
+    created_at: datetime
+    updated_at: datetime | None = None
+
+
+class JobQuery(PageQuery):
+    sort: Literal["id", "-id", "updated_at", "-updated_at"] = Field(
+        default="-id", description="Sort key, prefix with '-' for descending order"
+    )
+    kind: str | None = None
+    status: Literal["pending", "running", "succeeded", "failed"] | None = None
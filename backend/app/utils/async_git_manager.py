@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import subprocess
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.utils.git_config import GitConfigError, update_repository_config
+from app.utils.git_manager import GitManager
+from app.utils.metrics import record_command
+from app.utils.repo_inspector import inspect_repository, locate_repository, uses_git_environment
+
+logger = logging.getLogger(__name__)
+
+# ssh messages of network failures that may succeed when retried, unlike authentication failures
+TRANSIENT_SSH_ERRORS = (
+    "connection timed out",
+    "operation timed out",
+    "connection refused",
+    "connection reset",
+    "connection closed by",
+    "kex_exchange_identification",
+    "network is unreachable",
+    "no route to host",
+    "could not resolve hostname",
+    "temporary failure in name resolution",
+)
+
+
+class TransientSSHError(Exception):
+    """SSH could not reach the host (timeout, refused or reset connection, DNS failure); retrying may succeed"""
+
+
+class AsyncGitManager:
+    """
+    Asyncio counterpart of GitManager.
+
+    Commands are spawned with ``asyncio.create_subprocess_exec`` so a slow git or ssh process never blocks
+    the event loop. Every command has a timeout, and the child process is killed when the timeout expires
+    or the awaiting task is cancelled.
+    """
+
+    @staticmethod
+    async def run(
+        command: list[str], cwd: Path | None = None, timeout: float | None = None, check: bool = False
+    ) -> subprocess.CompletedProcess[str]:
+        """
+        Runs a command asynchronously and captures its output as text.
+
+        Args:
+            command: Command and its arguments
+            cwd: Working directory for the command
+            timeout: Seconds to wait before killing the command, defaults to ``settings.GIT_COMMAND_TIMEOUT``
+            check: Raise ``subprocess.CalledProcessError`` on a non-zero exit code
+
+        Raises:
+            subprocess.TimeoutExpired: If the command did not finish in time
+        """
+        timeout = timeout or settings.GIT_COMMAND_TIMEOUT
+        start = time.perf_counter()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=cwd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError:
+            record_command(command, cwd, "error", time.perf_counter() - start)
+            raise
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except (TimeoutError, asyncio.CancelledError) as error:
+            # Never leave orphaned git/ssh processes behind
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            exit_code = "timeout" if isinstance(error, TimeoutError) else "cancelled"
+            record_command(command, cwd, exit_code, time.perf_counter() - start)
+            if isinstance(error, TimeoutError):
+                raise subprocess.TimeoutExpired(command, timeout) from error
+            raise
+        record_command(command, cwd, process.returncode, time.perf_counter() - start)
+
+        result = subprocess.CompletedProcess(
+            command, process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+        )
+        if check:
+            result.check_returncode()
+        return result
+
+    @staticmethod
+    async def validate_git_repo(path: Path) -> bool:
+        """Checks for a work tree in-process (a few stat calls), running git only when needed"""
+        if not uses_git_environment():
+            try:
+                return locate_repository(path) is not None
+            except OSError:
+                pass
+        try:
+            command = ["git", "rev-parse", "--is-inside-work-tree"]  # Check if inside a git repository
+            await AsyncGitManager.run(command, cwd=path, check=True)
+            return True
+        except (subprocess.SubprocessError, OSError):
+            return False
+
+    @staticmethod
+    async def get_remote_url(path: Path) -> tuple[str, str] | None:
+        """Reads the preferred remote from the repository config, running ``git remote -v`` only when needed"""
+        try:
+            info = inspect_repository(path)
+            if info is None:
+                return None
+            return GitManager.select_remote_url(list(info.remotes.items()))
+        except (GitConfigError, OSError, UnicodeDecodeError):
+            pass
+        try:
+            command = ["git", "remote", "-v"]
+            result = await AsyncGitManager.run(command, cwd=path, check=True)
+            return GitManager.parse_remote_url(result.stdout)
+        except subprocess.SubprocessError:
+            return None
+
+    @staticmethod
+    async def add_remote(path: Path, remote_name: str, remote_url: str) -> bool:
+        """
+        Adds remote to git repository using provided URL directly.
+        """
+        try:
+            command = ["git", "remote", "add", remote_name, remote_url]
+            await AsyncGitManager.run(command, cwd=path, check=True)
+            return True
+        except Exception as error:
+            print("Error adding remote:", error)
+            return False
+
+    @staticmethod
+    async def remove_remote(path: Path, remote: str = "origin") -> bool:
+        """
+        Removes remote from git repository
+        """
+        try:
+            command = ["git", "remote", "remove", remote]
+            await AsyncGitManager.run(command, cwd=path, check=True)
+            return True
+        except subprocess.SubprocessError:
+            return False
+
+    @staticmethod
+    async def validate_ssh_connection(path: Path | None, host: str) -> bool:
+        """
+        Validates SSH connection to the host
+
+        Raises:
+            TransientSSHError: If the host could not be reached, so the result says nothing about the account
+        """
+        try:
+            command = ["ssh", "-T", host]
+            result = await AsyncGitManager.run(command, cwd=path, timeout=settings.SSH_COMMAND_TIMEOUT)
+        except subprocess.TimeoutExpired as error:
+            raise TransientSSHError(f"SSH connection to {host} timed out") from error
+        except (subprocess.SubprocessError, OSError) as error:
+            print("SSH connection failed", "Error:", error)
+            return False
+        # Check if the output contains "successfully authenticated"
+        if "successfully authenticated" in result.stderr:
+            return True
+        # ssh exits with 255 when it fails itself, as opposed to the remote command failing
+        stderr = result.stderr.lower()
+        if result.returncode == 255 and any(message in stderr for message in TRANSIENT_SSH_ERRORS):
+            raise TransientSSHError(result.stderr.strip().splitlines()[-1])
+        return False
+
+    @staticmethod
+    async def set_git_config(path: Path, key: str, value: str) -> bool:
+        """
+        Sets git config value for the repository
+        """
+        try:
+            command = ["git", "config", key, value]
+            await AsyncGitManager.run(command, cwd=path, check=True)
+            return True
+        except subprocess.SubprocessError:
+            return False
+
+    @staticmethod
+    async def set_user_config(path: Path, name: str, email: str) -> bool:
+        """
+        Sets git user.name and user.email for the repository
+        """
+        # Run sequentially: concurrent writers would race for the config.lock file
+        name_set = await AsyncGitManager.set_git_config(path, "user.name", name)
+        email_set = await AsyncGitManager.set_git_config(path, "user.email", email)
+        return name_set and email_set
+
+    @staticmethod
+    async def configure_repository(path: Path, remote_name: str, remote_url: str, name: str, email: str) -> bool:
+        """
+        Sets the remote URL, user.name and user.email of the repository in one go.
+
+        See ``GitManager.configure_repository``; only the CLI fallback is spawned asynchronously.
+        """
+        try:
+            update_repository_config(path, remote_name, remote_url, name, email)
+            return True
+        except (GitConfigError, OSError, UnicodeDecodeError) as error:
+            logger.info("Falling back to git CLI for config update: %s", error)
+
+        await AsyncGitManager.remove_remote(path, remote_name)
+        if not await AsyncGitManager.add_remote(path, remote_name, remote_url):
+            return False
+        return await AsyncGitManager.set_user_config(path, name, email)
+
+    @staticmethod
+    async def check_control_master(host: str) -> tuple[bool, str]:
+        """
+        Checks whether a persistent SSH master connection is running for the host
+
+        Returns:
+            Tuple of (running, ssh status message)
+        """
+        try:
+            result = await AsyncGitManager.run(["ssh", "-O", "check", "--", host], timeout=settings.SSH_COMMAND_TIMEOUT)
+        except (subprocess.SubprocessError, OSError) as error:
+            return False, str(error)
+        return result.returncode == 0, (result.stderr or result.stdout).strip()
+
+    @staticmethod
+    async def exit_control_master(host: str) -> bool:
+        """
+        Asks the persistent SSH master connection for the host to exit
+        """
+        try:
+            result = await AsyncGitManager.run(["ssh", "-O", "exit", "--", host], timeout=settings.SSH_COMMAND_TIMEOUT)
+        except (subprocess.SubprocessError, OSError):
+            return False
+        return result.returncode == 0
@@ -0,0 +1,341 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.loading import PROJECT_WITH_ACCOUNT
+from app.models import DriftReport, DriftStatus, Event, Project
+from app.utils.events import event_bus
+from app.utils.file_cache import FileStamp, get_file_stamp
+from app.utils.git_config import GitConfigError
+from app.utils.git_manager import GitManager
+from app.utils.repo_inspector import inspect_repository
+from app.utils.ssh_config import SSHConfig, normalize_identity_file
+from app.utils.ssh_manager import SSH_CONFIG_PATH, read_ssh_config
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchfiles import awatch
+except ImportError:
+    awatch = None
+
+
+@dataclass
+class DriftTarget:
+    """What the database says a configured project's files should contain"""
+
+    project_id: int
+    name: str
+    path: Path
+    remote_name: str
+    remote_url: str
+    user_name: str
+    user_email: str
+    ssh_key_path: str | None
+
+    @property
+    def host(self) -> str:
+        """SSH host alias of the remote, e.g. ``github-work-personal`` for ``git@github-work-personal:org/repo``"""
+        return self.remote_url.split(":")[0].split("@")[-1]
+
+
+def load_drift_targets(session: Session) -> dict[int, DriftTarget]:
+    projects = session.exec(select(Project).where(Project.configured).options(*PROJECT_WITH_ACCOUNT)).all()
+    return {
+        project.id: DriftTarget(
+            project_id=project.id,
+            name=project.name,
+            path=Path(project.path).expanduser(),
+            remote_name=project.remote_name or "origin",
+            remote_url=project.remote_url or "",
+            user_name=project.account.name,
+            user_email=project.account.user_email,
+            ssh_key_path=project.account.ssh_key_path,
+        )
+        for project in projects
+        if project.account is not None
+    }
+
+
+def check_repository(target: DriftTarget) -> tuple[list[str], list[Path]]:
+    """
+    Compares the remote and identity a repository uses with the ones it was configured with.
+
+    Returns:
+        Tuple of (issues, config files the result depends on)
+    """
+    try:
+        info = inspect_repository(target.path)
+    except (GitConfigError, OSError, UnicodeDecodeError):
+        info = False
+    if info is None:
+        return [f"Not a Git repository: {target.path}"], []
+    if info is False:
+        # The in-process reader cannot handle this repository, ask git and rely on polling of the main config
+        remote_url = GitManager.get_git_config(target.path, f"remote.{target.remote_name}.url")
+        user_name = GitManager.get_git_config(target.path, "user.name")
+        user_email = GitManager.get_git_config(target.path, "user.email")
+        files = [target.path / ".git" / "config"]
+    else:
+        remote_url = info.remotes.get(target.remote_name)
+        user_name, user_email = info.user_name, info.user_email
+        files = info.config_files
+
+    issues = []
+    if remote_url is None:
+        issues.append(f"Remote '{target.remote_name}' is missing")
+    elif remote_url != target.remote_url:
+        issues.append(f"Remote '{target.remote_name}' points to {remote_url} instead of {target.remote_url}")
+    if user_name != target.user_name:
+        issues.append(f"user.name is {user_name!r} instead of {target.user_name!r}")
+    if user_email != target.user_email:
+        issues.append(f"user.email is {user_email!r} instead of {target.user_email!r}")
+    return issues, files
+
+
+def check_ssh_host(target: DriftTarget, config: SSHConfig) -> list[str]:
+    """Checks that the SSH config still routes the project's remote host through the account's key"""
+    block = config.get(target.host)
+    if block is None:
+        return [f"SSH host {target.host} is not defined in {SSH_CONFIG_PATH}"]
+    identity_file = block.get("IdentityFile")
+    if target.ssh_key_path and (
+        identity_file is None or normalize_identity_file(identity_file) != normalize_identity_file(target.ssh_key_path)
+    ):
+        return [f"SSH host {target.host} uses IdentityFile {identity_file} instead of {target.ssh_key_path}"]
+    return []
+
+
+class DriftMonitor:
+    """
+    Watches the config files of configured projects and the SSH config, and reports where they no longer match
+    the database.
+
+    Every project remembers the config files its result was computed from, so a change only rechecks the
+    projects reading the changed file; a change to the SSH config rechecks the SSH hosts of all projects. Files
+    are watched with filesystem notifications (inotify, FSEvents, ReadDirectoryChangesW through watchfiles) when
+    available. File stamps are compared before every wait, which is also the polling fallback.
+    """
+
+    def __init__(self, use_notifications: bool, poll_interval: float):
+        self.use_notifications = use_notifications and awatch is not None
+        self.poll_interval = poll_interval
+        self.running = False
+        self.targets: dict[int, DriftTarget] = {}
+        self.repository_issues: dict[int, list[str]] = {}
+        self.ssh_issues: dict[int, list[str]] = {}
+        self.statuses: dict[int, DriftStatus] = {}
+        # Config file to the projects whose result depends on it, and the reverse
+        self.dependents: dict[str, set[int]] = {}
+        self.project_files: dict[int, list[str]] = {}
+        self.ssh_files: set[str] = set()
+        self.stamps: dict[str, FileStamp] = {}
+        self._wake: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Callers of refresh() waiting for the next reload of the run loop
+        self._reload_waiters: list[asyncio.Future] = []
+
+    @property
+    def mode(self) -> str:
+        if not self.running:
+            return "stopped"
+        return "notifications" if self.use_notifications else "polling"
+
+    def report(self, drifted_only: bool = False) -> DriftReport:
+        projects = [status for status in self.statuses.values() if status.drifted or not drifted_only]
+        return DriftReport(mode=self.mode, files=len(self.stamps), projects=projects)
+
+    def invalidate(self) -> None:
+        """Reloads the configured projects from the database, called after projects or accounts change"""
+        if self._wake is not None:
+            # Also called from worker threads, e.g. by streaming batch responses
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def refresh(self) -> None:
+        """Reloads and rechecks everything, through the run loop when it is running so it re-arms its watches"""
+        if not self.running:
+            self.publish(await asyncio.to_thread(self.reload))
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._reload_waiters.append(waiter)
+        self.invalidate()
+        await waiter
+
+    def publish(self, statuses: list[DriftStatus]) -> None:
+        """Sends changed statuses as ``drift`` events to the clients of /api/events"""
+        for status in statuses:
+            event_bus.publish("drift", status.model_dump(mode="json"))
+
+    def reload(self) -> list[DriftStatus]:
+        """Reloads the targets from the database and checks every project"""
+        with Session(engine) as session:
+            targets = load_drift_targets(session)
+        for project_id in self.targets.keys() - targets.keys():
+            self.repository_issues.pop(project_id, None)
+            self.ssh_issues.pop(project_id, None)
+            self.statuses.pop(project_id, None)
+        self.targets = targets
+        self.dependents = {}
+        self.project_files = {}
+        for target in targets.values():
+            self._check_repository(target)
+        self._check_ssh()
+        self._update_stamps()
+        return self._update_statuses(targets.keys())
+
+    def check(self, paths: set[str]) -> list[DriftStatus]:
+        """Rechecks only the projects depending on the changed files"""
+        project_ids = set().union(*(self.dependents.get(path, set()) for path in paths))
+        for project_id in project_ids:
+            if project_id in self.targets:
+                self._check_repository(self.targets[project_id])
+        if paths & self.ssh_files:
+            self._check_ssh()
+            project_ids = self.targets.keys()
+        self._update_stamps()
+        return self._update_statuses(project_ids)
+
+    def _check_repository(self, target: DriftTarget) -> None:
+        for path in self.project_files.pop(target.project_id, []):
+            self.dependents.get(path, set()).discard(target.project_id)
+        issues, files = check_repository(target)
+        self.repository_issues[target.project_id] = issues
+        self.project_files[target.project_id] = [os.path.abspath(path) for path in files]
+        for path in self.project_files[target.project_id]:
+            self.dependents.setdefault(path, set()).add(target.project_id)
+
+    def _check_ssh(self) -> None:
+        config = read_ssh_config()
+        self.ssh_files = {os.path.abspath(path) for path in [SSH_CONFIG_PATH, *config.include_paths]}
+        for target in self.targets.values():
+            self.ssh_issues[target.project_id] = check_ssh_host(target, config)
+
+    def _update_stamps(self) -> None:
+        """Starts tracking newly read files; stamps of known files are only advanced by :meth:`poll`"""
+        watched = self.ssh_files | {path for path, project_ids in self.dependents.items() if project_ids}
+        self.stamps = {
+            path: self.stamps[path] if path in self.stamps else get_file_stamp(Path(path)) for path in watched
+        }
+
+    def _update_statuses(self, project_ids) -> list[DriftStatus]:
+        """Recomputes the status of projects and returns the ones whose result changed"""
+        changed = []
+        now = datetime.now(UTC)
+        for project_id in list(project_ids):
+            target = self.targets.get(project_id)
+            if target is None:
+                continue
+            issues = self.repository_issues.get(project_id, []) + self.ssh_issues.get(project_id, [])
+            previous = self.statuses.get(project_id)
+            status = DriftStatus(
+                project_id=project_id,
+                name=target.name,
+                path=str(target.path),
+                drifted=bool(issues),
+                issues=issues,
+                checked_at=now,
+            )
+            self.statuses[project_id] = status
+            if previous is None or previous.issues != issues:
+                changed.append(status)
+        return changed
+
+    def poll(self) -> set[str]:
+        """Returns the watched files whose stamp changed since they were last checked"""
+        changed = set()
+        for path, stamp in self.stamps.items():
+            current = get_file_stamp(Path(path))
+            if current != stamp:
+                self.stamps[path] = current
+                changed.add(path)
+        return changed
+
+    async def wait_for_changes(self) -> set[str] | None:
+        """
+        Waits until watched files change.
+
+        Returns:
+            The changed files, or None when the monitor was invalidated and has to reload
+        """
+        while True:
+            if self._wake.is_set():
+                self._wake.clear()
+                return None
+            changed = await asyncio.to_thread(self.poll)
+            if changed:
+                return changed
+            if self.use_notifications:
+                try:
+                    await self._wait_for_notification()
+                    continue
+                except Exception as e:
+                    # e.g. the inotify watch limit was reached
+                    logger.warning("Drift watcher falls back to polling: %s", e)
+                    self.use_notifications = False
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except TimeoutError:
+                pass
+
+    async def _wait_for_notification(self) -> None:
+        """Returns when a watched file or directory reports a change, or when the monitor is invalidated"""
+        directories = {os.path.dirname(path) for path in self.stamps}
+        directories = sorted(directory for directory in directories if os.path.isdir(directory))
+        if not directories:
+            await self._wake.wait()
+            return
+        watched = set(self.stamps)
+        # watch_filter=None: the default filter drops everything inside .git directories
+        async for changes in awatch(*directories, watch_filter=None, stop_event=self._wake, recursive=False):
+            if any(os.path.abspath(path) in watched for _, path in changes):
+                return
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.running = True
+        try:
+            self.publish(await asyncio.to_thread(self.reload))
+            while self.running:
+                changed = await self.wait_for_changes()
+                if not self.running:
+                    break
+                if changed is None:
+                    waiters, self._reload_waiters = self._reload_waiters, []
+                    self.publish(await asyncio.to_thread(self.reload))
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+                else:
+                    self.publish(await asyncio.to_thread(self.check, changed))
+        finally:
+            self.running = False
+            self._wake = None
+            for waiter in self._reload_waiters:
+                waiter.cancel()
+            self._reload_waiters = []
+
+    def stop(self) -> None:
+        """Makes :meth:`run` return; stopping through the event lets the notification watcher shut down cleanly"""
+        self.running = False
+        self.invalidate()
+
+
+drift_monitor = DriftMonitor(
+    use_notifications=settings.DRIFT_USE_NOTIFICATIONS, poll_interval=settings.DRIFT_POLL_INTERVAL
+)
+
+
+def reload_on_change(published: Event) -> None:
+    if published.type == "invalidate" and published.data["resource"] in ("accounts", "projects"):
+        drift_monitor.invalidate()
+
+
+event_bus.add_listener(reload_on_change)
@@ -0,0 +1,151 @@
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Account, AccountDirectory, AccountType, Event, Project
+
+logger = logging.getLogger(__name__)
+
+# Tables whose changes are broadcast, by the resource name clients refetch
+RESOURCES = {
+    Account: "accounts",
+    AccountType: "account_types",
+    Project: "projects",
+    AccountDirectory: "directories",
+}
+
+
+class EventBus:
+    """
+    In-process publish/subscribe hub for Server-Sent Events.
+
+    Events get increasing ids and the most recent ones are kept, so a reconnecting client can resume after the
+    last id it saw. ``publish`` is safe to call from worker threads; queues are only touched on the event loop.
+    """
+
+    def __init__(self, history: int):
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.history: deque[Event] = deque(maxlen=history)
+        self.subscribers: set[asyncio.Queue[Event]] = set()
+        self.listeners: list[Callable[[Event], None]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop | None) -> None:
+        """Sets the event loop subscriber queues live on, called from the application lifespan"""
+        self._loop = loop
+
+    def add_listener(self, listener: Callable[[Event], None]) -> None:
+        """Registers an in-process callback, invoked on the event loop for every event"""
+        self.listeners.append(listener)
+
+    def publish(self, event_type: str, data: dict[str, Any]) -> Event:
+        with self._lock:
+            published = Event(id=next(self._ids), type=event_type, data=data)
+            self.history.append(published)
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                self._deliver(published)
+            else:
+                loop.call_soon_threadsafe(self._deliver, published)
+        return published
+
+    def _deliver(self, published: Event) -> None:
+        for queue in self.subscribers:
+            if queue.full():
+                # Slow consumers lose the oldest events rather than stalling publishers
+                queue.get_nowait()
+            queue.put_nowait(published)
+        for listener in self.listeners:
+            try:
+                listener(published)
+            except Exception:
+                logger.exception("Event listener failed")
+
+    def subscribe(self, last_event_id: int | None = None) -> tuple[asyncio.Queue[Event], list[Event]]:
+        """
+        Returns:
+            Tuple of (queue receiving new events, missed events after ``last_event_id`` still in the history)
+        """
+        queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=settings.EVENT_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        with self._lock:
+            missed = [item for item in self.history if last_event_id is not None and item.id > last_event_id]
+        return queue, missed
+
+    def unsubscribe(self, queue: asyncio.Queue[Event]) -> None:
+        self.subscribers.discard(queue)
+
+
+class ResourceVersions:
+    """
+    Counters bumped by every committed change, per resource and per row, used to validate cached responses.
+
+    Only writes made through sessions of this process are seen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.collections: dict[str, int] = {}
+        self.rows: dict[tuple[str, int], int] = {}
+
+    def bump(self, resource: str, row_id: int) -> None:
+        with self._lock:
+            version = self.collections[resource] = self.collections.get(resource, 0) + 1
+            # Rows take the collection's counter, so a row version never repeats, even after a delete
+            self.rows[(resource, row_id)] = version
+
+    def collection(self, resource: str) -> int:
+        return self.collections.get(resource, 0)
+
+    def row(self, resource: str, row_id: int) -> int:
+        return self.rows.get((resource, row_id), 0)
+
+
+event_bus = EventBus(history=settings.EVENT_HISTORY_SIZE)
+resource_versions = ResourceVersions()
+
+
+def collect_changes(session, flush_context) -> None:
+    """Remembers which resources a flush created, updated or deleted until the transaction commits"""
+    changes = session.info.setdefault("resource_changes", {})
+    for action, instances in (("created", session.new), ("updated", session.dirty), ("deleted", session.deleted)):
+        for instance in instances:
+            resource = RESOURCES.get(type(instance))
+            if resource is None or (action == "updated" and not session.is_modified(instance)):
+                continue
+            key = (resource, instance.id)
+            # Within one transaction a row created and then updated is reported as created
+            if action == "deleted" or key not in changes:
+                changes[key] = action
+
+
+def broadcast_changes(session) -> None:
+    changes = session.info.pop("resource_changes", None)
+    for (resource, row_id), action in (changes or {}).items():
+        # Bumped right away rather than from an event listener, so the next request sees it even off the loop
+        resource_versions.bump(resource, row_id)
+        event_bus.publish("invalidate", {"resource": resource, "id": row_id, "action": action})
+
+
+def discard_changes(session) -> None:
+    session.info.pop("resource_changes", None)
+
+
+# Every committed change to accounts, account types and projects is broadcast, wherever it was made
+event.listen(Session, "after_flush", collect_changes)
+event.listen(Session, "after_commit", broadcast_changes)
+event.listen(Session, "after_rollback", discard_changes)
@@ -0,0 +1,94 @@
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+FileStamp = tuple[int, int, int] | None
+
+
+def get_file_stamp(path: Path) -> FileStamp:
+    """Returns (mtime in ns, size, inode) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class FileCache:
+    """
+    Bounded LRU cache of values derived from files.
+
+    Entries are keyed on the file path and stay valid as long as the (mtime, size, inode) stamp of the file,
+    and of any extra files the value depends on, is unchanged. Safe to use from multiple threads.
+    """
+
+    def __init__(self, name: str, max_entries: int):
+        self.name = name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[tuple[tuple[str, FileStamp], ...], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        path: Path,
+        loader: Callable[[Path], T],
+        dependencies: Callable[[T], Iterable[Path]] | None = None,
+    ) -> T:
+        """
+        Returns the cached value for ``path``, calling ``loader`` when the file changed or is not cached.
+
+        Args:
+            path: File the value is read from
+            loader: Reads and parses the file
+            dependencies: Returns further files the loaded value depends on, e.g. included config files
+        """
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and all(get_file_stamp(Path(file)) == stamp for file, stamp in entry[0]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Stamp before loading, so a write racing with the load invalidates the entry on the next lookup
+        stamps = [(key, get_file_stamp(path))]
+        value = loader(path)
+        if dependencies is not None:
+            stamps.extend((str(file), get_file_stamp(file)) for file in dependencies(value))
+
+        with self._lock:
+            self._entries[key] = (tuple(stamps), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+ssh_config_cache = FileCache("ssh_config", max_entries=settings.FILE_CACHE_MAX_ENTRIES)
+public_key_cache = FileCache("public_keys", max_entries=settings.FILE_CACHE_MAX_ENTRIES)
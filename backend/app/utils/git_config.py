@@ -0,0 +1,372 @@
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.utils.metrics import config_io_seconds
+
+SECTION_PATTERN = re.compile(r'^\s*\[\s*([A-Za-z0-9.-]+)(?:\s+"((?:[^"\\\n]|\\.)*)")?\s*\]\s*(?:[#;].*)?$')
+ENTRY_PATTERN = re.compile(r"^\s*([A-Za-z][A-Za-z0-9-]*)\s*(?:=(.*))?$")
+COMMENT_PATTERN = re.compile(r"^\s*(?:[#;].*)?$")
+ESCAPES = {"n": "\n", "t": "\t", "b": "\b", '"': '"', "\\": "\\"}
+
+
+class GitConfigError(Exception):
+    """Raised when a config file uses syntax the in-process engine does not handle"""
+
+
+@dataclass
+class ConfigEntry:
+    section: str
+    subsection: str | None
+    key: str
+    value: str | None
+    start: int
+    end: int
+
+
+@dataclass
+class ConfigSection:
+    name: str
+    subsection: str | None
+    start: int
+    end: int
+
+
+def split_name(name: str) -> tuple[str, str | None, str]:
+    """
+    Splits a dotted config name into its section, subsection and key.
+
+    Examples:
+        >>> split_name("user.email")
+        ('user', None, 'email')
+        >>> split_name("remote.origin.url")
+        ('remote', 'origin', 'url')
+    """
+    section, _, rest = name.partition(".")
+    subsection, _, key = rest.rpartition(".")
+    if not section or not key:
+        raise GitConfigError(f"Invalid config name: {name}")
+    return section.lower(), subsection or None, key.lower()
+
+
+def parse_value(raw: str, continued: bool = False) -> tuple[str, bool]:
+    """
+    Parses the raw text after ``=`` on a config line, or a continuation line when ``continued`` is set.
+
+    Returns:
+        Tuple of (value, continues), where ``continues`` means the value goes on on the next line
+    """
+    value = []
+    quoted = False
+    # Length of the value without trailing unquoted whitespace
+    keep = 0
+    index = 0
+    while index < len(raw):
+        char = raw[index]
+        if char == "\\":
+            if index + 1 == len(raw):
+                return "".join(value), True
+            escaped = raw[index + 1]
+            if escaped not in ESCAPES:
+                raise GitConfigError(f"Invalid escape sequence: \\{escaped}")
+            value.append(ESCAPES[escaped])
+            keep = len(value)
+            index += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+            index += 1
+            continue
+        if not quoted and char in "#;":
+            break
+        if not quoted and char.isspace():
+            # Leading whitespace is dropped, inner whitespace is kept verbatim
+            if value or continued:
+                value.append(char)
+        else:
+            value.append(char)
+            keep = len(value)
+        index += 1
+    if quoted:
+        raise GitConfigError("Unterminated quoted value")
+    return "".join(value[:keep]), False
+
+
+def format_value(value: str) -> str:
+    """Escapes and, when needed, quotes a value so git reads it back unchanged."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t")
+    if escaped != escaped.strip() or "#" in escaped or ";" in escaped:
+        return f'"{escaped}"'
+    return escaped
+
+
+def format_section(name: str, subsection: str | None) -> str:
+    if subsection is None:
+        return f"[{name}]\n"
+    escaped = subsection.replace("\\", "\\\\").replace('"', '\\"')
+    return f'[{name} "{escaped}"]\n'
+
+
+class GitConfig:
+    """
+    In-process reader and writer for git config files.
+
+    The file is kept as its original lines so that comments, ordering and formatting survive a round trip;
+    only the lines of entries that are changed get rewritten. Syntax that is not understood raises
+    ``GitConfigError`` so callers can fall back to the git CLI.
+    """
+
+    def __init__(self, text: str = ""):
+        self.lines = text.splitlines(keepends=True)
+        self.sections: list[ConfigSection] = []
+        self.entries: list[ConfigEntry] = []
+        self._parse()
+
+    @classmethod
+    def load(cls, path: Path) -> "GitConfig":
+        """
+        Raises:
+            GitConfigError: If the file is not valid UTF-8 or uses syntax that is not understood
+        """
+        with config_io_seconds.time(config="git", operation="read"):
+            try:
+                text = path.read_text(encoding="utf-8")
+            except UnicodeDecodeError as error:
+                raise GitConfigError(f"Config file is not valid UTF-8: {path}") from error
+            return cls(text)
+
+    def _parse(self) -> None:
+        self.sections = []
+        self.entries = []
+        section: ConfigSection | None = None
+        index = 0
+        while index < len(self.lines):
+            line = self.lines[index].rstrip("\r\n")
+            start = index
+            index += 1
+            if COMMENT_PATTERN.match(line):
+                continue
+            header = SECTION_PATTERN.match(line)
+            if header:
+                name, subsection = header.group(1), header.group(2)
+                if subsection is not None:
+                    subsection = re.sub(r"\\(.)", r"\1", subsection)
+                elif "." in name:
+                    # Deprecated [section.subsection] syntax, subsection is case-insensitive
+                    name, subsection = name.split(".", 1)
+                    subsection = subsection.lower()
+                section = ConfigSection(name.lower(), subsection, start, index)
+                self.sections.append(section)
+                continue
+            entry = ENTRY_PATTERN.match(line)
+            if not entry or section is None:
+                raise GitConfigError(f"Unsupported config line {start + 1}: {line!r}")
+            raw = entry.group(2)
+            value = None
+            if raw is not None:
+                value, continues = parse_value(raw)
+                while continues:
+                    if index == len(self.lines):
+                        raise GitConfigError("Line continuation at end of file")
+                    more, continues = parse_value(self.lines[index].rstrip("\r\n"), continued=True)
+                    value += more
+                    index += 1
+            self.entries.append(
+                ConfigEntry(section.name, section.subsection, entry.group(1).lower(), value, start, index)
+            )
+            section.end = index
+
+    def _matches(self, entry: ConfigEntry, name: str) -> bool:
+        section, subsection, key = split_name(name)
+        return (entry.section, entry.subsection, entry.key) == (section, subsection, key)
+
+    def get_all(self, name: str) -> list[str | None]:
+        return [entry.value for entry in self.entries if self._matches(entry, name)]
+
+    def get(self, name: str) -> str | None:
+        """Returns the last value of a key, like ``git config --get``"""
+        values = self.get_all(name)
+        return values[-1] if values else None
+
+    def subsections(self, section: str) -> list[str]:
+        """Lists the subsections of a section, e.g. remote names for ``remote``"""
+        names = []
+        for config_section in self.sections:
+            if config_section.name == section.lower() and config_section.subsection is not None:
+                if config_section.subsection not in names:
+                    names.append(config_section.subsection)
+        return names
+
+    def set(self, name: str, value: str) -> None:
+        """
+        Sets a single-valued key, replacing its existing line or adding it to its section.
+
+        Raises:
+            GitConfigError: If the key has multiple values
+        """
+        section, subsection, key = split_name(name)
+        existing = [entry for entry in self.entries if self._matches(entry, name)]
+        if len(existing) > 1:
+            raise GitConfigError(f"Cannot overwrite multiple values of {name}")
+        line = f"\t{key} = {format_value(value)}\n"
+
+        if existing:
+            self.lines[existing[0].start : existing[0].end] = [line]
+            self._parse()
+        else:
+            self._insert(section, subsection, line)
+
+    def add(self, name: str, value: str) -> None:
+        """Adds another value for a key without touching existing ones, like ``git config --add``"""
+        section, subsection, key = split_name(name)
+        self._insert(section, subsection, f"\t{key} = {format_value(value)}\n")
+
+    def unset_all(self, name: str) -> int:
+        """Removes every value of a key, like ``git config --unset-all``, returning how many were removed"""
+        matching = [entry for entry in self.entries if self._matches(entry, name)]
+        for entry in reversed(matching):
+            del self.lines[entry.start : entry.end]
+        if matching:
+            self._parse()
+        return len(matching)
+
+    def _insert(self, section: str, subsection: str | None, line: str) -> None:
+        """Appends a line to the last matching section, creating the section at the end if needed"""
+        matching = [s for s in self.sections if (s.name, s.subsection) == (section, subsection)]
+        if matching:
+            self.lines.insert(matching[-1].end, line)
+        else:
+            if self.lines and not self.lines[-1].endswith("\n"):
+                self.lines[-1] += "\n"
+            self.lines.extend([format_section(section, subsection), line])
+        self._parse()
+
+    def remove_section(self, section: str, subsection: str | None) -> int:
+        """Removes every occurrence of a section with its entries, returning how many were removed"""
+        matching = [s for s in self.sections if (s.name, s.subsection) == (section.lower(), subsection)]
+        for config_section in reversed(matching):
+            del self.lines[config_section.start : config_section.end]
+        if matching:
+            self._parse()
+        return len(matching)
+
+    def to_string(self) -> str:
+        return "".join(self.lines)
+
+    def write(self, path: Path) -> None:
+        """
+        Atomically replaces ``path`` with this config.
+
+        Follows git's own locking protocol: the new content is written to ``<path>.lock``, created exclusively
+        so concurrent git processes back off, and then renamed over the original file.
+
+        Raises:
+            GitConfigError: If another process holds the lock
+        """
+        with config_io_seconds.time(config="git", operation="write"):
+            self._write(path)
+
+    def _write(self, path: Path) -> None:
+        lock_path = path.with_name(path.name + ".lock")
+        mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+        try:
+            fd = os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+        except FileExistsError:
+            raise GitConfigError(f"Config file is locked: {lock_path}")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+                file.write(self.to_string())
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(lock_path, path)
+        except BaseException:
+            lock_path.unlink(missing_ok=True)
+            raise
+
+
+def read_gitdir_file(path: Path) -> Path:
+    """
+    Follows a ``.git`` file (``gitdir: <path>``) as written for worktrees, submodules and ``--separate-git-dir``.
+
+    Raises:
+        GitConfigError: If the file is not valid UTF-8 or does not contain a gitdir line
+    """
+    try:
+        content = path.read_text(encoding="utf-8").strip()
+    except UnicodeDecodeError as error:
+        raise GitConfigError(f"Invalid gitdir file: {path}") from error
+    if not content.startswith("gitdir:"):
+        raise GitConfigError(f"Invalid gitdir file: {path}")
+    git_dir = Path(content.removeprefix("gitdir:").strip())
+    return git_dir if git_dir.is_absolute() else (path.parent / git_dir).resolve()
+
+
+def get_git_dir(path: Path) -> Path | None:
+    """Returns the git directory of the work tree at ``path``, or None if ``path`` has no ``.git`` entry"""
+    dot_git = path / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        try:
+            return read_gitdir_file(dot_git)
+        except (GitConfigError, OSError):
+            return None
+    return None
+
+
+def get_common_dir(git_dir: Path) -> Path:
+    """
+    Returns the directory holding the shared config, which differs from ``git_dir`` for linked worktrees.
+
+    Raises:
+        GitConfigError: If the ``commondir`` file is not valid UTF-8
+    """
+    commondir = git_dir / "commondir"
+    if not commondir.is_file():
+        return git_dir
+    try:
+        common_dir = Path(commondir.read_text(encoding="utf-8").strip())
+    except UnicodeDecodeError as error:
+        raise GitConfigError(f"Invalid commondir file: {commondir}") from error
+    return common_dir if common_dir.is_absolute() else (git_dir / common_dir).resolve()
+
+
+def get_repository_config_path(path: Path) -> Path:
+    """
+    Locates the config file of the repository whose work tree is at ``path``.
+
+    Follows ``.git`` files of worktrees and submodules; worktrees share the config of their main repository.
+
+    Raises:
+        GitConfigError: If ``path`` is not the top level of a work tree
+    """
+    git_dir = get_git_dir(path)
+    if git_dir is None:
+        raise GitConfigError(f"No .git directory found in {path}")
+    config_path = get_common_dir(git_dir) / "config"
+    if not config_path.is_file():
+        raise GitConfigError(f"No config found in {git_dir}")
+    return config_path
+
+
+def update_repository_config(path: Path, remote_name: str, remote_url: str, user_name: str, user_email: str) -> None:
+    """
+    Points a remote at ``remote_url`` and sets ``user.name``/``user.email`` in one atomic config write.
+
+    The remote is created with git's default fetch refspec if it does not exist yet. Existing remotes keep
+    their fetch refspecs and remote-tracking branches, as with ``git remote set-url``. Push URLs of the remote
+    are removed, so pushes go to ``remote_url`` like fetches do.
+
+    Raises:
+        GitConfigError: If the repository layout or config syntax needs the git CLI instead
+    """
+    config_path = get_repository_config_path(path)
+    config = GitConfig.load(config_path)
+    config.set(f"remote.{remote_name}.url", remote_url)
+    config.unset_all(f"remote.{remote_name}.pushurl")
+    if not config.get_all(f"remote.{remote_name}.fetch"):
+        config.add(f"remote.{remote_name}.fetch", f"+refs/heads/*:refs/remotes/{remote_name}/*")
+    config.set("user.name", user_name)
+    config.set("user.email", user_email)
+    config.write(config_path)
@@ -1,46 +1,97 @@
+import logging
 import subprocess
 from pathlib import Path
 
+from app.utils.git_config import GitConfigError, update_repository_config
+from app.utils.metrics import run_command
+from app.utils.repo_inspector import inspect_repository, locate_repository, uses_git_environment
+
+logger = logging.getLogger(__name__)
+
 
 class GitManager:
     @staticmethod
     def validate_git_repo(path: Path) -> bool:
+        """Checks that ``path`` is inside a work tree by looking for ``.git``, using git only when needed"""
+        if uses_git_environment():
+            return GitManager._validate_git_repo(path)
+        try:
+            return locate_repository(path) is not None
+        except OSError:
+            return GitManager._validate_git_repo(path)
+
+    @staticmethod
+    def _validate_git_repo(path: Path) -> bool:
         try:
             command = ["git", "rev-parse", "--is-inside-work-tree"]  # Check if inside a git repository
-            subprocess.run(command, cwd=path, capture_output=True, check=True)
+            run_command(command, cwd=path, capture_output=True, check=True)
             return True
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, OSError):
             return False
 
     @staticmethod
     def get_remote_url(path: Path) -> tuple[str, str] | None:
+        """Reads the preferred remote from the repository config, using ``git remote -v`` only when needed"""
+        try:
+            info = inspect_repository(path)
+        except (GitConfigError, OSError, UnicodeDecodeError):
+            return GitManager._get_remote_url(path)
+        if info is None:
+            return None
+        return GitManager.select_remote_url(list(info.remotes.items()))
+
+    @staticmethod
+    def _get_remote_url(path: Path) -> tuple[str, str] | None:
         try:
-            urls = dict()
             command = ["git", "remote", "-v"]
-            result = subprocess.run(command, cwd=path, capture_output=True, text=True, check=True)
-            for line in result.stdout.splitlines():
-                line = line.strip()
-                remote_name = line.split()[0]
-                url = line.split()[1]
-                urls[url.strip()] = remote_name
-            # If there are no URLs, return None
-            if not urls:
-                return None
-            # Filter for GitHub URLs or SSH URLs
-            github_urls = [
-                (url, remote)
-                for url, remote in urls.items()
-                if url.startswith("https://github.com/") or url.startswith("git@")
-            ]
-            if github_urls:
-                url, remote = github_urls[0]
-                return url, remote
-            # If there are no GitHub URLs or SSH URLs, return the first URL
-            url, remote = next(iter(urls.items()))
-            return url, remote
+            result = run_command(command, cwd=path, capture_output=True, text=True, check=True)
+            return GitManager.parse_remote_url(result.stdout)
         except subprocess.CalledProcessError:
             return None
 
+    @staticmethod
+    def parse_remote_url(output: str) -> tuple[str, str] | None:
+        """
+        Picks the preferred remote from the output of ``git remote -v``.
+
+        GitHub HTTPS and SSH URLs win over other URLs; otherwise the first listed remote is used.
+
+        Returns:
+            Tuple of (url, remote name) or None if there are no remotes
+        """
+        remotes = []
+        for line in output.splitlines():
+            line = line.strip()
+            remote_name = line.split()[0]
+            url = line.split()[1]
+            remotes.append((remote_name, url.strip()))
+        return GitManager.select_remote_url(remotes)
+
+    @staticmethod
+    def select_remote_url(remotes: list[tuple[str, str]]) -> tuple[str, str] | None:
+        """
+        Picks the preferred remote from ``(remote name, url)`` pairs.
+
+        Returns:
+            Tuple of (url, remote name) or None if there are no remotes
+        """
+        urls = {url: remote_name for remote_name, url in remotes}
+        # If there are no URLs, return None
+        if not urls:
+            return None
+        # Filter for GitHub URLs or SSH URLs
+        github_urls = [
+            (url, remote)
+            for url, remote in urls.items()
+            if url.startswith("https://github.com/") or url.startswith("git@")
+        ]
+        if github_urls:
+            url, remote = github_urls[0]
+            return url, remote
+        # If there are no GitHub URLs or SSH URLs, return the first URL
+        url, remote = next(iter(urls.items()))
+        return url, remote
+
     @staticmethod
     def get_repo_path(url: str) -> str | None:
         """
@@ -149,7 +200,7 @@ class GitManager:
         try:
             # Use a list of arguments instead of splitting a string to preserve spaces in the URL
             command = ["git", "remote", "add", remote_name, remote_url]
-            subprocess.run(command, cwd=path, check=True)
+            run_command(command, cwd=path, check=True)
             return True
         except Exception as error:
             print("Error adding remote:", error)
@@ -162,7 +213,7 @@ class GitManager:
         """
         try:
             command = ["git", "remote", "remove", remote]
-            subprocess.run(command, cwd=path, check=True)
+            run_command(command, cwd=path, check=True)
             return True
         except subprocess.CalledProcessError:
             return False
@@ -174,7 +225,7 @@ class GitManager:
         """
         try:
             command = ["ssh", "-T", host]
-            result = subprocess.run(command, cwd=path, check=False, text=True, capture_output=True)
+            result = run_command(command, cwd=path, check=False, text=True, capture_output=True)
             # Check if the output contains "successfully authenticated"
             if "successfully authenticated" in result.stderr:
                 return True
@@ -183,6 +234,18 @@ class GitManager:
             print("SSH connection failed", "Error:", error)
             return False
 
+    @staticmethod
+    def get_git_config(path: Path, key: str) -> str | None:
+        """
+        Gets the effective git config value for the repository, or None if it is not set
+        """
+        try:
+            command = ["git", "config", "--get", key]
+            result = run_command(command, cwd=path, capture_output=True, text=True, check=True)
+            return result.stdout.strip()
+        except (subprocess.CalledProcessError, OSError):
+            return None
+
     @staticmethod
     def set_git_config(path: Path, key: str, value: str) -> bool:
         """
@@ -190,7 +253,7 @@ class GitManager:
         """
         try:
             command = ["git", "config", key, value]
-            subprocess.run(command, cwd=path, check=True)
+            run_command(command, cwd=path, check=True)
             return True
         except subprocess.CalledProcessError:
             return False
@@ -206,3 +269,23 @@ class GitManager:
             return name_set and email_set
         except Exception:
             return False
+
+    @staticmethod
+    def configure_repository(path: Path, remote_name: str, remote_url: str, name: str, email: str) -> bool:
+        """
+        Sets the remote URL, user.name and user.email of the repository in one go.
+
+        The change is applied as a single atomic rewrite of .git/config without spawning git. Repositories the
+        in-process engine cannot handle (worktrees, unusual config syntax, a held lock) fall back to the
+        git CLI.
+        """
+        try:
+            update_repository_config(path, remote_name, remote_url, name, email)
+            return True
+        except (GitConfigError, OSError, UnicodeDecodeError) as error:
+            logger.info("Falling back to git CLI for config update: %s", error)
+
+        GitManager.remove_remote(path, remote_name)
+        if not GitManager.add_remote(path, remote_name, remote_url):
+            return False
+        return GitManager.set_user_config(path, name, email)
@@ -0,0 +1,107 @@
+# Routes git identities by directory instead of per repository: every account with directories gets a config
+# fragment setting user.name/user.email and the SSH key git connects with, and the global git config includes that
+# fragment with an `includeIf "gitdir:<directory>/"` section per directory. Repositories cloned anywhere below such
+# a directory pick up the account without any per-repository config.
+#
+# The key is set with core.sshCommand rather than by rewriting URLs to the account's SSH host alias: git applies
+# the last value of core.sshCommand, so a nested directory routed to another account wins, while for equally long
+# url.<base>.insteadOf rules the first one would. Remote URLs are never rewritten, so HTTPS remotes pushing with
+# tokens or credential helpers keep working; the key only applies to SSH remotes.
+
+import os
+import platform
+import threading
+from pathlib import Path
+
+from app.core.config import APP_DATA_DIR
+from app.models import Account
+from app.utils.git_config import GitConfig
+
+FRAGMENTS_DIR = APP_DATA_DIR / "gitconfig"
+
+# Serializes rewrites of the global config and the fragments within this process
+identity_config_lock = threading.Lock()
+
+
+def get_global_config_path() -> Path:
+    """The global git config file, ``$GIT_CONFIG_GLOBAL`` if set like git itself honours it"""
+    return Path(os.environ.get("GIT_CONFIG_GLOBAL") or Path.home() / ".gitconfig").expanduser()
+
+
+def get_fragment_path(account_id: int) -> Path:
+    # Named after the id, so renaming an account only rewrites its fragment, not the global config
+    return FRAGMENTS_DIR / f"account-{account_id}.gitconfig"
+
+
+def get_gitdir_condition(directory: str) -> str:
+    """
+    The ``includeIf`` condition matching every repository below ``directory``.
+
+    Examples:
+        >>> get_gitdir_condition("/home/user/work")
+        'gitdir:/home/user/work/'
+    """
+    pattern = Path(directory).as_posix().rstrip("/") + "/"
+    # Paths on Windows are case-insensitive
+    return f"gitdir/i:{pattern}" if platform.system() == "Windows" else f"gitdir:{pattern}"
+
+
+def build_fragment(account: Account) -> str:
+    fragment = GitConfig()
+    fragment.set("user.name", account.user_name)
+    fragment.set("user.email", account.user_email)
+    if account.ssh_key_path:
+        key_path = Path(account.ssh_key_path).expanduser().as_posix()
+        fragment.set("core.sshCommand", f'ssh -i "{key_path}" -o IdentitiesOnly=yes')
+    return fragment.to_string()
+
+
+def is_managed_include(config: GitConfig, subsection: str) -> bool:
+    """Whether an includeIf section was written by this module, i.e. it only includes one of our fragments"""
+    paths = config.get_all(f"includeIf.{subsection}.path")
+    return bool(paths) and all(path is not None and Path(path).parent == FRAGMENTS_DIR for path in paths)
+
+
+def write_identity_config(directories: list[tuple[str, Account]]) -> tuple[Path, list[Path], list[Path]]:
+    """
+    Writes the fragment of every account in ``directories`` and replaces the managed ``includeIf`` sections of
+    the global git config with one per directory, in a single atomic write.
+
+    Sections are ordered from the outermost to the innermost directory, so a nested directory routed to another
+    account wins, as git applies later includes last. Fragments of accounts without directories are deleted.
+
+    Args:
+        directories: Pairs of directory and its account
+
+    Returns:
+        Tuple of (global config path, fragments in use, fragments deleted)
+
+    Raises:
+        GitConfigError: If the global config uses unsupported syntax or is locked by git
+    """
+    config_path = get_global_config_path()
+    with identity_config_lock:
+        FRAGMENTS_DIR.mkdir(parents=True, exist_ok=True)
+        fragments: dict[int, Path] = {}
+        for _, account in directories:
+            if account.id in fragments:
+                continue
+            fragment_path = fragments[account.id] = get_fragment_path(account.id)
+            content = build_fragment(account)
+            if not fragment_path.is_file() or fragment_path.read_text(encoding="utf-8") != content:
+                GitConfig(content).write(fragment_path)
+
+        config = GitConfig.load(config_path) if config_path.is_file() else GitConfig()
+        original = config.to_string()
+        for subsection in config.subsections("includeif"):
+            if is_managed_include(config, subsection):
+                config.remove_section("includeif", subsection)
+        for directory, account in sorted(directories, key=lambda item: len(Path(item[0]).parts)):
+            config.add(f"includeIf.{get_gitdir_condition(directory)}.path", str(fragments[account.id]))
+        if config.to_string() != original:
+            config.write(config_path)
+
+        removed = [path for path in FRAGMENTS_DIR.glob("account-*.gitconfig") if path not in fragments.values()]
+        for path in removed:
+            path.unlink(missing_ok=True)
+    return config_path, list(fragments.values()), removed
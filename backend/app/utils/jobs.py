@@ -0,0 +1,339 @@
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Job, JobPublic
+from app.utils.events import event_bus
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress writes to the job table; every item is still published as an event right away
+PROGRESS_SAVE_INTERVAL = 1.0
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+def utc_now() -> datetime:
+    """Current UTC time without timezone, like the timestamps SQLite returns"""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class RetryJob(Exception):
+    """Raised by a job handler when the job failed for a transient reason and should run again later"""
+
+
+def save_job(job: Job, *fields: str) -> None:
+    with Session(engine) as session:
+        session.exec(update(Job).where(Job.id == job.id).values({name: getattr(job, name) for name in fields}))
+        session.commit()
+
+
+def publish_job(job: Job) -> None:
+    event_bus.publish("job", JobPublic.model_validate(job).model_dump(mode="json"))
+
+
+class JobContext:
+    """Handed to a running job: its payload, the attempt number and per-item progress reporting"""
+
+    def __init__(self, job: Job):
+        self.job = job
+        self.payload = job.payload
+        self._lock = threading.Lock()
+        self._saved_at = time.monotonic()
+
+    @property
+    def attempt(self) -> int:
+        return self.job.attempts
+
+    @property
+    def can_retry(self) -> bool:
+        return self.job.attempts < self.job.max_attempts
+
+    def set_total(self, total: int) -> None:
+        self.job.total = total
+        save_job(self.job, "total")
+        publish_job(self.job)
+
+    def item(self, index: int, status: str, **data: Any) -> None:
+        """Records that one item finished with ``status`` ('succeeded' or 'failed') and broadcasts it"""
+        with self._lock:
+            self.job.completed += 1
+            if status == "failed":
+                self.job.failed += 1
+            save = time.monotonic() - self._saved_at >= PROGRESS_SAVE_INTERVAL
+            if save:
+                self._saved_at = time.monotonic()
+        if save:
+            save_job(self.job, "completed", "failed")
+        event_bus.publish("job.item", {"job_id": self.job.id, "index": index, "status": status, **data})
+
+
+JobHandler = Callable[[JobContext], Any]
+
+
+class JobManager:
+    """
+    Runs operations in the background from a queue persisted in the job table.
+
+    Handlers are registered per job kind and receive the JSON payload stored with the job, so queued and
+    interrupted jobs survive a restart: jobs still marked running at startup are queued again. A dispatcher on
+    the event loop starts up to ``max_workers`` jobs at once; coroutine handlers run on the loop, plain ones on
+    a thread pool. Handlers raise ``RetryJob`` to run again after an exponential backoff.
+
+    State changes are broadcast as ``job`` events and per-item progress as ``job.item`` events on the event bus.
+    """
+
+    def __init__(
+        self, max_workers: int, history: int, max_attempts: int, retry_backoff: float, retry_backoff_max: float
+    ):
+        self.max_workers = max_workers
+        self.history = history
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.handlers: dict[str, JobHandler] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._dispatcher: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator registering the function that runs jobs of ``kind``"""
+
+        def register(function: JobHandler) -> JobHandler:
+            self.handlers[kind] = function
+            return function
+
+        return register
+
+    def submit(self, kind: str, payload: dict, total: int = 0, idempotency_key: str | None = None) -> Job:
+        """
+        Queues a job. Submitting again with the same idempotency key returns the job created the first time.
+
+        Raises:
+            ValueError: If the kind has no handler, or the idempotency key was used for a different job
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        with Session(engine) as session:
+            if idempotency_key is not None:
+                existing = self._find(session, idempotency_key, kind, payload)
+                if existing is not None:
+                    return existing
+            job = Job(
+                kind=kind,
+                payload=payload,
+                total=total,
+                max_attempts=self.max_attempts,
+                run_after=utc_now(),
+                idempotency_key=idempotency_key,
+            )
+            session.add(job)
+            try:
+                session.commit()
+            except IntegrityError:
+                # Submitted concurrently with the same key
+                session.rollback()
+                return self._find(session, idempotency_key, kind, payload)
+            session.refresh(job)
+        publish_job(job)
+        self.wake()
+        return job
+
+    def find(self, idempotency_key: str, kind: str, payload: dict) -> Job | None:
+        """
+        Returns the job submitted with an idempotency key, or None if the key is unknown.
+
+        Raises:
+            ValueError: If the key was used for a different job
+        """
+        with Session(engine) as session:
+            return self._find(session, idempotency_key, kind, payload)
+
+    @staticmethod
+    def _find(session: Session, idempotency_key: str, kind: str, payload: dict) -> Job | None:
+        job = session.exec(select(Job).where(Job.idempotency_key == idempotency_key)).first()
+        if job is not None and (job.kind != kind or job.payload != payload):
+            raise ValueError("Idempotency key was already used for a different request")
+        return job
+
+    def wake(self) -> None:
+        """Lets the dispatcher look for due jobs; safe to call from any thread"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def start(self) -> None:
+        """Queues jobs interrupted by the last shutdown and starts the dispatcher, called from the lifespan"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.recover()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def recover(self) -> None:
+        now = utc_now()
+        with Session(engine) as session:
+            unknown = session.exec(
+                update(Job)
+                .where(Job.status == "pending", Job.kind.not_in(self.handlers))
+                .values(status="failed", error="No handler for this kind of job", finished_at=now)
+            )
+            # Jobs still running were cut off by a crash; the attempt counts, so a job that crashes the server
+            # every time eventually fails
+            exhausted = session.exec(
+                update(Job)
+                .where(Job.status == "running", Job.attempts >= Job.max_attempts)
+                .values(status="failed", error="Interrupted by a server restart", finished_at=now)
+            )
+            interrupted = session.exec(
+                update(Job).where(Job.status == "running").values(status="pending", run_after=now)
+            )
+            session.commit()
+        if unknown.rowcount or exhausted.rowcount or interrupted.rowcount:
+            logger.warning(
+                "Jobs: %d interrupted jobs queued again, %d failed",
+                interrupted.rowcount,
+                exhausted.rowcount + unknown.rowcount,
+            )
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._wakeup.clear()
+            while len(self._tasks) < self.max_workers:
+                job = self._claim()
+                if job is None:
+                    break
+                task = asyncio.create_task(self._run(job))
+                self._tasks.add(task)
+                task.add_done_callback(self._finished)
+            # Sleep until a job is submitted or finishes, or the next retry is due
+            timeout = self._next_due() if len(self._tasks) < self.max_workers else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        self._wakeup.set()
+
+    def _claim(self) -> Job | None:
+        """Marks the oldest due job as running and returns it, or None if no job is due"""
+        now = utc_now()
+        with Session(engine) as session:
+            while True:
+                job_id = session.exec(
+                    select(Job.id)
+                    .where(Job.status == "pending", Job.run_after <= now, Job.kind.in_(self.handlers))
+                    .order_by(Job.run_after, Job.id)
+                    .limit(1)
+                ).first()
+                if job_id is None:
+                    return None
+                # Conditional update, so a job is never claimed twice (e.g. by a second process sharing the database)
+                claimed = session.exec(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == "pending")
+                    .values(status="running", attempts=Job.attempts + 1, started_at=now, completed=0, failed=0)
+                )
+                session.commit()
+                if claimed.rowcount:
+                    return session.get(Job, job_id)
+
+    def _next_due(self) -> float | None:
+        """Seconds until the next pending job may start, or None if nothing is waiting"""
+        with Session(engine) as session:
+            run_after = session.exec(
+                select(func.min(Job.run_after)).where(Job.status == "pending", Job.kind.in_(self.handlers))
+            ).one()
+        if run_after is None:
+            return None
+        return max((run_after - utc_now()).total_seconds(), 0)
+
+    async def _run(self, job: Job) -> None:
+        publish_job(job)
+        context = JobContext(job)
+        handler = self.handlers[job.kind]
+        try:
+            if inspect.iscoroutinefunction(handler):
+                job.result = await handler(context)
+            else:
+                job.result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), handler, context)
+            job.status, job.error = "succeeded", None
+        except asyncio.CancelledError:
+            # Interrupted by shutdown, run it again on the next start without counting this attempt
+            job.status, job.attempts, job.run_after = "pending", job.attempts - 1, utc_now()
+            save_job(job, "status", "attempts", "run_after", "completed", "failed")
+            raise
+        except RetryJob as e:
+            job.error = str(e)
+            if job.attempts < job.max_attempts:
+                delay = min(self.retry_backoff * 2 ** (job.attempts - 1), self.retry_backoff_max)
+                job.status, job.run_after = "pending", utc_now() + timedelta(seconds=delay)
+                logger.info("Job %s (%s) will be retried in %gs: %s", job.id, job.kind, delay, e)
+            else:
+                job.status = "failed"
+        except Exception as e:
+            job.status, job.error = "failed", str(e)
+
+        if job.status in FINISHED_STATUSES:
+            job.finished_at = utc_now()
+        fields = ["status", "error", "result", "completed", "failed", "run_after", "finished_at"]
+        try:
+            save_job(job, *fields)
+        except Exception as e:
+            # e.g. a result that is not JSON serializable
+            job.status, job.error, job.result = "failed", f"Could not store the job result: {e}", None
+            save_job(job, *fields)
+        publish_job(job)
+        if job.status in FINISHED_STATUSES:
+            self._prune()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        return self._executor
+
+    def _prune(self) -> None:
+        """Deletes finished jobs beyond the newest ``history`` ones"""
+        finished = Job.status.in_(FINISHED_STATUSES)
+        kept = select(Job.id).where(finished).order_by(Job.id.desc()).limit(self.history)
+        with Session(engine) as session:
+            session.exec(delete(Job).where(finished, Job.id.not_in(kept)))
+            session.commit()
+
+    async def shutdown(self, timeout: float) -> None:
+        """Stops dispatching and waits up to ``timeout`` seconds for running jobs before cancelling them"""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._loop = None
+
+
+job_manager = JobManager(
+    max_workers=settings.JOB_MAX_WORKERS,
+    history=settings.JOB_HISTORY_SIZE,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF,
+    retry_backoff_max=settings.JOB_RETRY_BACKOFF_MAX,
+)
@@ -0,0 +1,232 @@
+# Instrumentation of the hot paths: git/ssh subprocesses, SQL statements and commits, and SSH/git config file
+# reads and writes. Durations are kept as Prometheus histograms, rendered in the text exposition format by
+# GET /api/metrics, and summed per HTTP request for its Server-Timing header. prometheus_client is not a
+# dependency, the few histograms needed are kept here.
+
+import logging
+import os
+import shlex
+import subprocess
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds, from a quick `git config --get` to a slow ssh handshake or a large SQLite commit
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    """
+    Examples:
+        >>> format_labels({"program": "git", "exit_code": "0"})
+        '{program="git",exit_code="0"}'
+    """
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def format_number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class RequestTimings:
+    """Time spent per category (subprocess, sql, commit, config) while handling one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, category: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.entries.setdefault(category, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def server_timing(self) -> str:
+        """
+        The Server-Timing header value, with the total time of the request so far.
+
+        Examples:
+            >>> timings = RequestTimings()
+            >>> timings.add("sql", 0.002)
+            >>> timings.server_timing().split(", ")[0]
+            'sql;dur=2.0;desc="1 call"'
+        """
+        with self._lock:
+            metrics = [
+                f'{category};dur={seconds * 1000:.1f};desc="{count} call{"" if count == 1 else "s"}"'
+                for category, (count, seconds) in sorted(self.entries.items())
+            ]
+        metrics.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+# Timings of the request being handled; shared by reference with the threads and tasks it starts
+request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    """
+    Prometheus histogram with labels. Safe to use from multiple threads.
+
+    Observations are also added to the timings of the current request under ``category``, if there is one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...],
+        category: str | None = None,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.category = category
+        self.buckets = (*sorted(buckets), float("inf"))
+        # Label values -> (cumulative bucket counts, sum)
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * len(self.buckets), [0.0])
+            counts, total = series
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[index] += 1
+            total[0] += seconds
+        timings = request_timings.get()
+        if timings is not None and self.category is not None:
+            timings.add(self.category, seconds)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observes the duration of the ``with`` block, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(counts), total[0]) for key, (counts, total) in self._series.items())
+        for key, counts, total in series:
+            labels = dict(zip(self.label_names, key, strict=True))
+            for bound, count in zip(self.buckets, counts, strict=True):
+                lines.append(f"{self.name}_bucket{format_labels({**labels, 'le': format_number(bound)})} {count}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {format_number(total)}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {counts[-1]}")
+        return lines
+
+
+subprocess_seconds = Histogram(
+    "git_manager_subprocess_seconds",
+    "Duration of git, ssh and ssh-keygen processes",
+    ("program", "command", "exit_code"),
+    category="subprocess",
+)
+sql_seconds = Histogram("git_manager_sql_seconds", "Duration of SQL statements", ("operation",), category="sql")
+commit_seconds = Histogram(
+    "git_manager_db_commit_seconds",
+    "Duration of session commits, including the flush of pending changes",
+    (),
+    category="commit",
+)
+config_io_seconds = Histogram(
+    "git_manager_config_io_seconds",
+    "Duration of SSH and git config file reads and writes",
+    ("config", "operation"),
+    category="config",
+)
+http_request_seconds = Histogram(
+    "git_manager_http_request_seconds", "Duration of HTTP requests", ("method", "route", "status")
+)
+
+HISTOGRAMS = (subprocess_seconds, sql_seconds, commit_seconds, config_io_seconds, http_request_seconds)
+
+
+def render_metrics() -> str:
+    """All histograms in the Prometheus text exposition format"""
+    return "\n".join(line for histogram in HISTOGRAMS for line in histogram.render()) + "\n"
+
+
+def get_command_name(command: list[str]) -> str:
+    """
+    The git subcommand of a command line, the only part of it kept as a label to bound the number of series.
+
+    Examples:
+        >>> get_command_name(["git", "config", "--get", "user.name"])
+        'config'
+        >>> get_command_name(["ssh", "-T", "github-alice-work"])
+        ''
+    """
+    if Path(command[0]).name != "git":
+        return ""
+    return next((argument for argument in command[1:] if not argument.startswith("-")), "")
+
+
+def format_command(command: list[str]) -> str:
+    """
+    The command line quoted for the shell of this platform, so it can be copied into a terminal.
+
+    Examples:
+        On Linux and macOS:
+        >>> format_command(["ssh", "-i", "my key", "host"])
+        "ssh -i 'my key' host"
+    """
+    return subprocess.list2cmdline(command) if os.name == "nt" else shlex.join(command)
+
+
+def record_command(command: list[str], cwd: Path | str | None, exit_code: int | str, seconds: float) -> None:
+    """Observes a finished process, and logs a warning with the whole command line when it was slow"""
+    subprocess_seconds.observe(
+        seconds, program=Path(command[0]).name, command=get_command_name(command), exit_code=str(exit_code)
+    )
+    if seconds >= settings.SLOW_COMMAND_THRESHOLD:
+        location = f" in {cwd}" if cwd else ""
+        logger.warning(
+            "Slow command (%.2fs, exit code %s): %s%s", seconds, exit_code, format_command(command), location
+        )
+
+
+def run_command(command: list[str], cwd: Path | str | None = None, **kwargs) -> subprocess.CompletedProcess:
+    """``subprocess.run`` recording the duration and exit code of the process"""
+    start = time.perf_counter()
+    exit_code: int | str = "error"
+    try:
+        result = subprocess.run(command, cwd=cwd, **kwargs)
+        exit_code = result.returncode
+        return result
+    except subprocess.CalledProcessError as error:
+        exit_code = error.returncode
+        raise
+    except subprocess.TimeoutExpired:
+        exit_code = "timeout"
+        raise
+    finally:
+        record_command(command, cwd, exit_code, time.perf_counter() - start)
@@ -0,0 +1,247 @@
+import os
+import platform
+import re
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.core.config import settings
+from app.utils.file_cache import FileCache
+from app.utils.git_config import ConfigEntry, GitConfig, GitConfigError, get_common_dir, get_git_dir
+
+# Environment variables that change how git finds the repository or its config, handled by the git CLI only
+GIT_ENVIRONMENT_OVERRIDES = (
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_COMMON_DIR",
+    "GIT_CONFIG",
+    "GIT_CONFIG_PARAMETERS",
+    "GIT_CONFIG_COUNT",
+    "GIT_CEILING_DIRECTORIES",
+    "GIT_DISCOVERY_ACROSS_FILESYSTEM",
+)
+# git stops following include.path after this many levels
+MAX_INCLUDE_DEPTH = 10
+
+git_config_cache = FileCache("git_config", max_entries=settings.FILE_CACHE_MAX_ENTRIES)
+
+
+@dataclass
+class RepositoryInfo:
+    work_tree: Path
+    git_dir: Path
+    common_dir: Path
+    # Remote name to fetch URL, with url.<base>.insteadOf rewrites applied like ``git remote -v``
+    remotes: dict[str, str] = field(default_factory=dict)
+    user_name: str | None = None
+    user_email: str | None = None
+    # Every config file that was read, including those pulled in by include and includeIf
+    config_files: list[Path] = field(default_factory=list)
+
+
+def uses_git_environment() -> bool:
+    return any(name in os.environ for name in GIT_ENVIRONMENT_OVERRIDES)
+
+
+def locate_repository(path: Path) -> tuple[Path, Path] | None:
+    """
+    Finds the work tree containing ``path`` like git's discovery does, by looking for ``.git`` in ``path`` and
+    its parents.
+
+    Returns:
+        Tuple of (work tree, git directory), or None if ``path`` is not inside a work tree
+    """
+    path = path.absolute()
+    if not path.is_dir():
+        return None
+    for directory in (path, *path.parents):
+        if directory.name == ".git":
+            # Inside a git directory, which is not a work tree
+            return None
+        git_dir = get_git_dir(directory)
+        if git_dir is not None and (git_dir / "HEAD").is_file():
+            return directory, git_dir
+    return None
+
+
+def get_global_config_paths() -> list[Path]:
+    """System and global config files in the order git reads them"""
+    paths = []
+    if not os.environ.get("GIT_CONFIG_NOSYSTEM"):
+        if "GIT_CONFIG_SYSTEM" in os.environ:
+            paths.append(Path(os.environ["GIT_CONFIG_SYSTEM"]))
+        elif platform.system() == "Windows":
+            # Git for Windows keeps its system config next to the install, e.g. C:/Program Files/Git/etc/gitconfig
+            git = shutil.which("git")
+            if git:
+                paths.append(Path(git).resolve().parent.parent / "etc" / "gitconfig")
+        else:
+            paths.append(Path("/etc/gitconfig"))
+    if "GIT_CONFIG_GLOBAL" in os.environ:
+        paths.append(Path(os.environ["GIT_CONFIG_GLOBAL"]).expanduser())
+    else:
+        xdg_config_home = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+        paths.extend([Path(xdg_config_home) / "git" / "config", Path.home() / ".gitconfig"])
+    return paths
+
+
+def glob_to_regex(pattern: str) -> re.Pattern:
+    """Translates a wildmatch pattern with ``**`` support (as used by includeIf) to a regular expression"""
+    regex = []
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            regex.append("(?:.*/)?")
+            index += 3
+        elif pattern.startswith("/**", index) and index + 3 == len(pattern):
+            regex.append("(?:/.*)?")
+            index += 3
+        elif pattern.startswith("**", index):
+            regex.append(".*")
+            index += 2
+        elif pattern[index] == "*":
+            regex.append("[^/]*")
+            index += 1
+        elif pattern[index] == "?":
+            regex.append("[^/]")
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 2 :]:
+            end = pattern.index("]", index + 2)
+            body = pattern[index + 1 : end]
+            regex.append("[" + ("^" + body[1:] if body.startswith("!") else body).replace("\\", "\\\\") + "]")
+            index = end + 1
+        else:
+            regex.append(re.escape(pattern[index]))
+            index += 1
+    return re.compile("".join(regex) + r"\Z")
+
+
+def match_gitdir(pattern: str, config_path: Path, git_dir: Path, ignore_case: bool) -> bool:
+    """Evaluates an ``includeIf "gitdir:<pattern>"`` condition the way git documents it"""
+    if pattern.startswith("~/"):
+        pattern = str(Path.home()) + pattern[1:]
+    elif pattern.startswith("./"):
+        pattern = str(config_path.parent) + pattern[1:]
+    pattern = pattern.replace("\\", "/")
+    if not (pattern.startswith("/") or re.match(r"^[A-Za-z]:/", pattern)):
+        pattern = "**/" + pattern
+    if pattern.endswith("/"):
+        pattern += "**"
+    regex = glob_to_regex(pattern.lower() if ignore_case else pattern)
+    for candidate in {str(git_dir), os.path.realpath(git_dir)}:
+        candidate = candidate.replace("\\", "/")
+        if regex.match(candidate.lower() if ignore_case else candidate):
+            return True
+    return False
+
+
+def read_branch(git_dir: Path) -> str | None:
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return head.removeprefix("ref: refs/heads/") if head.startswith("ref: refs/heads/") else None
+
+
+def include_condition_matches(condition: str, config_path: Path, git_dir: Path | None) -> bool:
+    """
+    Raises:
+        GitConfigError: For conditions that need the git CLI, such as ``hasconfig:``
+    """
+    kind, _, value = condition.partition(":")
+    if kind in ("gitdir", "gitdir/i"):
+        return git_dir is not None and match_gitdir(value, config_path, git_dir, ignore_case=kind == "gitdir/i")
+    if kind == "onbranch":
+        branch = read_branch(git_dir) if git_dir is not None else None
+        if branch is None:
+            return False
+        pattern = value + "**" if value.endswith("/") else value
+        return glob_to_regex(pattern).match(branch) is not None
+    raise GitConfigError(f"Unsupported includeIf condition: {condition}")
+
+
+def read_config_entries(
+    path: Path, git_dir: Path | None, files: list[Path], depth: int = 0
+) -> list[tuple[Path, ConfigEntry]]:
+    """
+    Reads the entries of a config file with ``include.path`` and matching ``includeIf.<condition>.path`` files
+    expanded in place, as git does.
+    """
+    if depth > MAX_INCLUDE_DEPTH:
+        raise GitConfigError(f"Too many nested includes in {path}")
+    if not path.is_file():
+        return []
+    config = git_config_cache.get(path, GitConfig.load)
+    files.append(path)
+    entries = []
+    for entry in config.entries:
+        entries.append((path, entry))
+        if entry.key != "path" or not entry.value:
+            continue
+        if entry.section == "include" and entry.subsection is None:
+            included = True
+        elif entry.section == "includeif" and entry.subsection is not None:
+            included = include_condition_matches(entry.subsection, path, git_dir)
+        else:
+            continue
+        if included:
+            include_path = Path(entry.value).expanduser()
+            if not include_path.is_absolute():
+                include_path = path.parent / include_path
+            entries.extend(read_config_entries(include_path, git_dir, files, depth + 1))
+    return entries
+
+
+def rewrite_url(url: str, entries: list[tuple[Path, ConfigEntry]]) -> str:
+    """Applies the longest matching ``url.<base>.insteadOf`` prefix"""
+    best = None
+    for _, entry in entries:
+        if entry.section == "url" and entry.key == "insteadof" and entry.subsection and entry.value:
+            if url.startswith(entry.value) and (best is None or len(entry.value) > len(best[1])):
+                best = (entry.subsection, entry.value)
+    if best is None:
+        return url
+    return best[0] + url[len(best[1]) :]
+
+
+def inspect_git_dir(work_tree: Path, git_dir: Path) -> RepositoryInfo:
+    """
+    Reads remotes and ``user.*`` from the layered system, global and repository config of a work tree.
+
+    Raises:
+        GitConfigError: If a config file or include condition needs the git CLI
+    """
+    common_dir = get_common_dir(git_dir)
+    info = RepositoryInfo(work_tree=work_tree, git_dir=git_dir, common_dir=common_dir)
+    entries = []
+    for path in [*get_global_config_paths(), common_dir / "config"]:
+        entries.extend(read_config_entries(path, git_dir, info.config_files))
+    if any(e.section == "extensions" and e.key == "worktreeconfig" and e.value != "false" for _, e in entries):
+        entries.extend(read_config_entries(git_dir / "config.worktree", git_dir, info.config_files))
+
+    for _, entry in entries:
+        if entry.section == "user" and entry.subsection is None and entry.key in ("name", "email"):
+            setattr(info, f"user_{entry.key}", entry.value)
+        elif entry.section == "remote" and entry.subsection and entry.key == "url" and entry.value:
+            # The first url of a remote is the one it fetches from
+            info.remotes.setdefault(entry.subsection, entry.value)
+    info.remotes = {name: rewrite_url(url, entries) for name, url in info.remotes.items()}
+    return info
+
+
+def inspect_repository(path: Path) -> RepositoryInfo | None:
+    """
+    Inspects the repository containing ``path`` without starting git.
+
+    Returns:
+        None if ``path`` is not inside a work tree
+
+    Raises:
+        GitConfigError: If the environment or a config file needs the git CLI; callers fall back to it
+    """
+    if uses_git_environment():
+        raise GitConfigError("Git environment overrides are set")
+    located = locate_repository(path)
+    if located is None:
+        return None
+    return inspect_git_dir(*located)
@@ -0,0 +1,117 @@
+import fnmatch
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from app.core.config import settings
+from app.models import ScannedRepository
+from app.utils.git_config import GitConfigError, read_gitdir_file
+from app.utils.repo_inspector import inspect_git_dir
+
+
+def describe_repository(path: str, dot_git: os.DirEntry) -> ScannedRepository:
+    """Describes the work tree at ``path`` from its ``.git`` directory or gitdir file"""
+    repository = ScannedRepository(path=path, name=os.path.basename(path), kind="repository", git_dir=dot_git.path)
+    try:
+        if dot_git.is_file(follow_symlinks=False):
+            git_dir = read_gitdir_file(Path(dot_git.path))
+            repository.git_dir = str(git_dir)
+            if (git_dir / "commondir").is_file():
+                repository.kind = "worktree"
+            elif "modules" in git_dir.parts:
+                repository.kind = "submodule"
+        info = inspect_git_dir(Path(path), Path(repository.git_dir))
+        repository.remotes = info.remotes
+        repository.user_name = info.user_name
+        repository.user_email = info.user_email
+    except (GitConfigError, OSError, UnicodeDecodeError) as e:
+        repository.error = str(e)
+    if repository.remotes:
+        repository.remote_name = "origin" if "origin" in repository.remotes else next(iter(repository.remotes))
+        repository.remote_url = repository.remotes[repository.remote_name]
+    return repository
+
+
+class RepositoryScanner:
+    """
+    Walks directory trees on a thread pool and yields the Git repositories found in them.
+
+    Every directory is listed once with ``os.scandir``; a repository is recognised by its ``.git`` directory or
+    gitdir file, and its remotes are read from its config files, so no git process is started.
+    """
+
+    def __init__(
+        self,
+        max_depth: int | None = None,
+        ignore: list[str] | None = None,
+        include_nested: bool = False,
+        max_workers: int | None = None,
+    ):
+        self.max_depth = settings.REPO_SCAN_MAX_DEPTH if max_depth is None else max_depth
+        self.ignore = settings.REPO_SCAN_IGNORE if ignore is None else ignore
+        self.include_nested = include_nested
+        self.max_workers = max_workers or settings.REPO_SCAN_MAX_WORKERS
+        self.directories = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def is_ignored(self, entry: os.DirEntry) -> bool:
+        return any(
+            fnmatch.fnmatch(entry.name, pattern) or fnmatch.fnmatch(entry.path, pattern) for pattern in self.ignore
+        )
+
+    def scan_directory(self, path: str) -> tuple[ScannedRepository | None, list[str]]:
+        """
+        Lists one directory.
+
+        Returns:
+            Tuple of (repository at ``path`` or None, subdirectories to descend into)
+        """
+        dot_git = None
+        subdirectories = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name == ".git":
+                    dot_git = entry
+                elif entry.is_dir(follow_symlinks=False) and not self.is_ignored(entry):
+                    subdirectories.append(entry.path)
+        if dot_git is None:
+            return None, subdirectories
+        repository = describe_repository(path, dot_git)
+        return repository, subdirectories if self.include_nested else []
+
+    def scan(self, roots: list[str]) -> Iterator[ScannedRepository]:
+        """Yields repositories under ``roots`` as they are found; overlapping roots are searched once"""
+        started = time.perf_counter()
+        roots = sorted({os.path.normpath(os.path.abspath(os.path.expanduser(root))) for root in roots})
+        roots = [
+            root for root in roots if not any(root != other and root.startswith(other + os.sep) for other in roots)
+        ]
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="repo-scan")
+        pending: dict[Future, int] = {}
+        try:
+            for root in roots:
+                pending[executor.submit(self.scan_directory, root)] = 0
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth = pending.pop(future)
+                    self.directories += 1
+                    try:
+                        repository, subdirectories = future.result()
+                    except OSError:
+                        # Unreadable directories (permissions, removed while scanning) are skipped
+                        self.errors += 1
+                        continue
+                    if repository is not None:
+                        if repository.error is not None:
+                            self.errors += 1
+                        yield repository
+                    if depth < self.max_depth:
+                        for subdirectory in subdirectories:
+                            pending[executor.submit(self.scan_directory, subdirectory)] = depth + 1
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.elapsed = time.perf_counter() - started
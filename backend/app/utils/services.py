@@ -1,10 +1,47 @@
+import asyncio
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-from sqlmodel import Session, select
-
-from app.models import Account, AccountType, Project
+from sqlmodel import Session, func, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.loading import ACCOUNT_PUBLIC, DIRECTORY_WITH_ACCOUNT
+from app.models import (
+    Account,
+    AccountBatchResult,
+    AccountBatchSummary,
+    AccountDirectory,
+    AccountPublic,
+    AccountType,
+    IdentityConfigSyncResult,
+    Project,
+    ProjectBatchResult,
+    ProjectBatchSummary,
+    ProjectPublic,
+    ProjectValidationResult,
+    SSHConfigAccount,
+    SSHConfigSyncDiff,
+    SSHConfigSyncResult,
+)
+from app.utils.async_git_manager import AsyncGitManager, TransientSSHError
+from app.utils.file_cache import get_file_stamp
 from app.utils.git_manager import GitManager
-from app.utils.ssh_manager import SSH_CONFIG_PATH, generate_ssh_key, read_public_key, update_ssh_config
+from app.utils.identity_config import write_identity_config
+from app.utils.ssh_config import SSHConfig
+from app.utils.ssh_manager import (
+    delete_ssh_keys,
+    generate_ssh_key,
+    read_public_key,
+    read_ssh_config,
+    update_ssh_config,
+    update_ssh_config_hosts,
+)
+from app.utils.ssh_validation import host_validation_cache
+
+# Inputs and result of the last SSH config sync, used to skip syncs when nothing changed
+last_ssh_config_sync: dict = {"fingerprint": None, "result": None}
 
 
 def get_or_create_account_type(session: Session, account_type_name: str) -> AccountType:
@@ -45,80 +82,284 @@ def create_git_account(account: Account, overwrite: bool = False) -> tuple[str,
     return ssh_key_path, public_key
 
 
-def list_accounts_ssh_config(session: Session) -> list[dict]:
-    accounts = []
-    current_host = None
-    account_type = None
-    current_email = None
-
-    with open(SSH_CONFIG_PATH) as file:
-        for line in file:
-            line = line.strip()
-            if line.startswith("Host "):
-                current_host = line.split()[1]
-                if current_host.startswith("github-"):
-                    current_host = current_host[7:]  # Remove "github-" prefix
-                if "-" in current_host:
-                    account_type = current_host.split("-")[-1]
-                    current_host = "-".join(current_host.split("-")[:-1])
-                else:
-                    account_type = "personal"
-            elif line.startswith("IdentityFile ") and current_host:
-                identity_file = Path(line.split(None, 1)[1].strip()).expanduser()
-
-                try:
-                    public_key_content, current_email = read_public_key(identity_file)
-                except Exception:
-                    public_key_content, current_email = None, None
-
-                existing = session.exec(select(Account).where(Account.name == current_host)).first()
-
-                if not existing and current_email:
-                    # Get or create account type
-                    account_type_object = get_or_create_account_type(session, account_type)
-
-                    # Create account with user and account type
-                    new_account = Account(
-                        name=current_host,
-                        user_name=current_host,
-                        user_email=current_email,
-                        ssh_key_path=str(identity_file),
-                        public_key=public_key_content,
-                        account_type_id=account_type_object.id,
-                    )
-                    session.add(new_account)
-                    session.commit()
-                    session.refresh(new_account)
-
-                accounts.append(
-                    {
-                        "host": current_host,
-                        "identity_file": str(identity_file),
-                        "email": current_email,
-                        "type": account_type,
-                    }
-                )
-                current_host = None
-                current_email = None
-                account_type = None
+def generate_ssh_keys(
+    accounts: list[tuple[Account, str]], max_workers: int | None = None
+) -> Iterator[tuple[int, Path | None, Exception | None]]:
+    """
+    Generate the SSH keys of many accounts in parallel.
+
+    Every key is generated by its own ssh-keygen process, so a bounded thread pool that waits on them is enough
+    to generate keys on all cores.
+
+    Args:
+        accounts: Pairs of account and the name of its account type
+        max_workers: Number of ssh-keygen processes at once, capped by ``settings.ACCOUNT_BATCH_MAX_WORKERS``
+
+    Yields:
+        ``(index, key path, error)`` tuples in completion order, where ``error`` is None on success
+    """
+    limit = settings.ACCOUNT_BATCH_MAX_WORKERS
+    max_workers = min(max_workers or limit, limit)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ssh-keygen")
+    try:
+        futures = {
+            executor.submit(generate_ssh_key, account.name, account.user_email, account_type, False): index
+            for index, (account, account_type) in enumerate(accounts)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield index, future.result(), None
+            except Exception as error:
+                yield index, None, error
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def create_and_store_accounts(
+    accounts: list[tuple[Account, str]], max_workers: int | None = None
+) -> Iterator[AccountBatchResult | AccountBatchSummary]:
+    """
+    Create many accounts: generate their SSH keys in parallel, add all Host blocks to the SSH config in one
+    atomic write and store the accounts in a single transaction.
+
+    If the SSH config or the database cannot be updated, the keys generated here are deleted again.
+
+    Yields:
+        One ``AccountBatchResult`` per account in completion order, then an ``AccountBatchSummary``
+    """
+    key_paths: dict[int, Path] = {}
+    failed = 0
+    for index, key_path, error in generate_ssh_keys(accounts, max_workers):
+        if error is None:
+            key_paths[index] = key_path
+        else:
+            failed += 1
+        yield AccountBatchResult(
+            index=index,
+            name=accounts[index][0].name,
+            status="generated" if error is None else "failed",
+            ssh_key_path=str(key_path) if error is None else None,
+            error=None if error is None else str(error),
+        )
+
+    summary = AccountBatchSummary(status="completed", created=0, failed=failed)
+    if not key_paths:
+        yield summary
+        return
+    created = [accounts[index][0] for index in sorted(key_paths)]
+    try:
+        for index in sorted(key_paths):
+            account = accounts[index][0]
+            account.ssh_key_path = str(key_paths[index])
+            account.public_key, _ = read_public_key(key_paths[index])
+        update_ssh_config_hosts(
+            [(accounts[index][0].name, accounts[index][1], key_paths[index]) for index in sorted(key_paths)]
+        )
+        names = [account.name for account in created]
+        with Session(engine) as session:
+            session.add_all(created)
+            session.commit()
+            # Reload with the account types in one query, instead of refreshing every expired account
+            statement = select(Account).where(Account.name.in_(names))
+            stored = session.exec(statement.options(*ACCOUNT_PUBLIC).order_by(Account.id)).all()
+            summary.accounts = [AccountPublic.model_validate(account) for account in stored]
+        summary.created = len(created)
+    except Exception as e:
+        # Leave no keys or Host blocks behind that no account refers to
+        delete_ssh_keys(list(key_paths.values()))
+        summary.status = "failed"
+        summary.error = str(e)
+    yield summary
+
+
+def parse_host_alias(host: str) -> tuple[str, str]:
+    """
+    Split a Host alias into account name and account type.
 
+    Examples:
+        >>> parse_host_alias("github-john-work")
+        ('john', 'work')
+        >>> parse_host_alias("john")
+        ('john', 'personal')
+    """
+    host = host.removeprefix("github-")
+    if "-" in host:
+        return "-".join(host.split("-")[:-1]), host.split("-")[-1]
+    return host, "personal"
+
+
+def get_ssh_config_sync_fingerprint(session: Session, config: SSHConfig) -> tuple:
+    """
+    Cheap fingerprint of everything an SSH config sync reads.
+
+    Combines the stamps of the SSH config, its includes and every referenced public key with the state of
+    the account table, without reading any file contents.
+    """
+    files = [config.path, *config.include_paths]
+    files += [
+        Path(f"{Path(block.get('IdentityFile')).expanduser()}.pub")
+        for block in config.hosts()
+        if block.get("IdentityFile")
+    ]
+    account_state = session.exec(
+        select(func.count(Account.id), func.max(Account.id), func.max(Account.updated_at))
+    ).one()
+    return tuple(get_file_stamp(file) for file in files), tuple(account_state)
+
+
+def read_ssh_config_accounts(config: SSHConfig) -> list[SSHConfigAccount]:
+    """Collect one entry per Host block that has an IdentityFile, with the key's content and email."""
+    accounts = []
+    for block in config.hosts():
+        identity_file = block.get("IdentityFile")
+        # Skip blocks without a key and wildcard patterns such as "Host *"
+        if not identity_file or not block.aliases or any(char in block.aliases[0] for char in "*?"):
+            continue
+        host, account_type = parse_host_alias(block.aliases[0])
+        identity_file = Path(identity_file).expanduser()
+
+        try:
+            public_key_content, email = read_public_key(identity_file)
+        except Exception:
+            public_key_content, email = None, None
+
+        accounts.append(
+            SSHConfigAccount(
+                host=host,
+                identity_file=str(identity_file),
+                email=email,
+                type=account_type,
+                public_key=public_key_content,
+            )
+        )
     return accounts
 
 
+def sync_ssh_config(session: Session) -> SSHConfigSyncResult:
+    """
+    Synchronize accounts in the database with the Host blocks of the SSH config.
+
+    All host blocks are parsed first, existing accounts and account types are loaded with one query each, and
+    the differences are computed as sets and applied in a single transaction:
+
+    - inserted: hosts with a readable key that have no account yet
+    - updated: accounts whose key path or public key changed in the SSH config
+    - orphaned: accounts without a host block (reported only, never deleted)
+    - skipped: hosts without a readable public key, or duplicates of an earlier host
+    """
+    config = read_ssh_config()
+    fingerprint = get_ssh_config_sync_fingerprint(session, config)
+    previous = last_ssh_config_sync["result"]
+    if previous is not None and fingerprint == last_ssh_config_sync["fingerprint"]:
+        # Nothing changed since the last sync
+        return SSHConfigSyncResult(
+            changed=False,
+            accounts=previous.accounts,
+            diff=SSHConfigSyncDiff(
+                unchanged=sorted(previous.diff.inserted + previous.diff.updated + previous.diff.unchanged),
+                orphaned=previous.diff.orphaned,
+                skipped=previous.diff.skipped,
+            ),
+        )
+
+    config_accounts = read_ssh_config_accounts(config)
+    existing = {account.name: account for account in session.exec(select(Account)).all()}
+    account_types = {account_type.name: account_type for account_type in session.exec(select(AccountType)).all()}
+
+    desired: dict[str, SSHConfigAccount] = {}
+    skipped = []
+    for config_account in config_accounts:
+        if config_account.host in desired or (not config_account.email and config_account.host not in existing):
+            skipped.append(config_account.host)
+        else:
+            desired[config_account.host] = config_account
+
+    inserted = desired.keys() - existing.keys()
+    orphaned = existing.keys() - desired.keys()
+    updated = {
+        name
+        for name in desired.keys() & existing.keys()
+        if desired[name].public_key is not None
+        and (existing[name].ssh_key_path, existing[name].public_key)
+        != (desired[name].identity_file, desired[name].public_key)
+    }
+
+    for name in inserted:
+        config_account = desired[name]
+        account_type = account_types.get(config_account.type)
+        if account_type is None:
+            account_type = account_types[config_account.type] = AccountType(name=config_account.type)
+            session.add(account_type)
+        session.add(
+            Account(
+                name=name,
+                user_name=name,
+                user_email=config_account.email,
+                ssh_key_path=config_account.identity_file,
+                public_key=config_account.public_key,
+                account_type=account_type,
+            )
+        )
+    for name in updated:
+        existing[name].ssh_key_path = desired[name].identity_file
+        existing[name].public_key = desired[name].public_key
+        session.add(existing[name])
+
+    if inserted or updated:
+        session.commit()
+
+    result = SSHConfigSyncResult(
+        changed=bool(inserted or updated),
+        accounts=config_accounts,
+        diff=SSHConfigSyncDiff(
+            inserted=sorted(inserted),
+            updated=sorted(updated),
+            unchanged=sorted(desired.keys() & existing.keys() - updated),
+            orphaned=sorted(orphaned),
+            skipped=sorted(set(skipped)),
+        ),
+    )
+    last_ssh_config_sync["fingerprint"] = get_ssh_config_sync_fingerprint(session, config)
+    last_ssh_config_sync["result"] = result
+    return result
+
+
+def sync_identity_config(session: Session) -> IdentityConfigSyncResult:
+    """
+    Rewrites the account config fragments and the ``includeIf`` sections of the global git config from the
+    directories in the database, so that every repository below a directory uses its account.
+    """
+    directories = session.exec(select(AccountDirectory).options(*DIRECTORY_WITH_ACCOUNT)).all()
+    config_path, fragments, removed = write_identity_config(
+        [(directory.path, directory.account) for directory in directories]
+    )
+    return IdentityConfigSyncResult(
+        config_path=str(config_path),
+        directories=len(directories),
+        fragments=[str(path) for path in fragments],
+        removed=[str(path) for path in removed],
+    )
+
+
+def resolve_account_directory(session: Session, path: Path) -> AccountDirectory | None:
+    """Returns the innermost directory containing ``path``, whose account git uses for repositories there"""
+    candidates = [str(path), *(str(parent) for parent in path.parents)]
+    statement = select(AccountDirectory).where(AccountDirectory.path.in_(candidates))
+    directories = session.exec(statement.options(*DIRECTORY_WITH_ACCOUNT)).all()
+    return max(directories, key=lambda directory: len(directory.path), default=None)
+
+
 def validate_project_path(project_path: Path) -> None:
     """Validate the project path is a valid git repository."""
     if not GitManager.validate_git_repo(project_path):
         raise ValueError(f"Invalid Git repository: {project_path}")
 
 
-def get_remote_info(path: Path, project: Project) -> tuple[str, str]:
-    """Get or validate remote URL and name for a project."""
-    existing_remote = False
-    # Get current remote URL and name
-    remote_info = GitManager.get_remote_url(path)
+def resolve_remote_info(path: Path, project: Project, remote_info: tuple[str, str] | None) -> tuple[str, str]:
+    """Pick the repository's current remote, or the project's stored remote if the repository has none."""
     if remote_info:
         remote_url, remote_name = remote_info
-        existing_remote = True
     else:
         # If no remote URL is found, use the project remote URL and name
         remote_url = project.remote_url
@@ -127,10 +368,6 @@ def get_remote_info(path: Path, project: Project) -> tuple[str, str]:
     if not remote_url or not remote_name:
         raise ValueError(f"No remote URL or remote name found for project: {path}")
 
-    # Remove existing remote if it exists
-    if existing_remote:
-        GitManager.remove_remote(path, remote_name)
-
     return remote_url, remote_name
 
 
@@ -151,52 +388,169 @@ def validate_remote_url_and_path(remote_url: str) -> str:
     return repo_path
 
 
-def configure_project(project: Project, account: Account) -> Project:
-    """Configure a project to use specific git account."""
-    path = Path(project.path).expanduser()
-    validate_project_path(path)
-
-    remote_url, remote_name = get_remote_info(path, project)
-    repo_path = validate_remote_url_and_path(remote_url)
-    account_type = account.account_type.name
+def build_account_remote_url(account: Account, repo_path: str) -> str:
+    """Construct the SSH remote URL that routes through the account's SSH config host."""
+    return f"git@github-{account.name}-{account.account_type.name}:{repo_path}.git"
 
-    # Construct new SSH URL using SSH config host
-    new_remote_url = f"git@github-{account.name}-{account_type}:{repo_path}.git"
 
+def log_project_configuration(project: Project, account: Account, remote_url: str, new_remote_url: str) -> None:
     print(
         f"Configuring project {project.name},\n"
         f"with remote URL: {remote_url},\n"
         f"New remote URL: {new_remote_url},\n"
-        f"remote name: {remote_name},\n"
-        f"account: {account.name}, account type: {account_type},\n"
+        f"remote name: {project.remote_name},\n"
+        f"account: {account.name}, account type: {account.account_type.name},\n"
         f"email: {account.user_email}, name: {account.name},\n"
         f"SSH key path: {account.ssh_key_path},\n"
         f"public key: {account.public_key}"
     )
-    # Add remote URL
-    success = GitManager.add_remote(path, remote_name, new_remote_url)
-    if not success:
-        raise ValueError(f"Failed to update remote URL for project: {path}")
 
-    # Update project with new URL
-    project.remote_url = new_remote_url
+
+def prepare_project_configuration(
+    path: Path, project: Project, account: Account, remote_info: tuple[str, str] | None
+) -> tuple[str, str]:
+    """
+    The steps of configuring a project that need no I/O, shared by the sync and async variants: picks the remote,
+    validates it and builds the remote URL through the account's SSH config host.
+
+    Args:
+        path: Path of the repository
+        project: Project being configured, its remote name is updated
+        account: Account the project should use
+        remote_info: The repository's current (url, remote name), or None if it has no remote
+
+    Returns:
+        Tuple of (remote name, new remote URL)
+    """
+    remote_url, remote_name = resolve_remote_info(path, project, remote_info)
+    repo_path = validate_remote_url_and_path(remote_url)
+
+    # Construct new SSH URL using SSH config host
+    new_remote_url = build_account_remote_url(account, repo_path)
     project.remote_name = remote_name
+    log_project_configuration(project, account, remote_url, new_remote_url)
 
     # Check account name and email
     if not account.name or not account.user_email:
         raise ValueError("Account name and email must be set")
+    return remote_name, new_remote_url
 
-    # Set Git user config for the project
-    if not GitManager.set_user_config(path, account.name, account.user_email):
-        raise ValueError(f"Failed to set Git user config for project: {path}")
 
-    # Update project in database
+def mark_project_configured(project: Project, new_remote_url: str) -> Project:
+    """Record the new remote URL once the repository config was written."""
+    project.remote_url = new_remote_url
     project.configured = True
     return project
 
 
-def validate_project_configuration(project: Project) -> None:
-    """Validate the project configuration."""
+def configure_project(project: Project, account: Account) -> Project:
+    """Configure a project to use specific git account."""
+    path = Path(project.path).expanduser()
+    validate_project_path(path)
+
+    remote_info = GitManager.get_remote_url(path)
+    remote_name, new_remote_url = prepare_project_configuration(path, project, account, remote_info)
+
+    # Write remote URL and Git user config for the project in one config update
+    if not GitManager.configure_repository(path, remote_name, new_remote_url, account.name, account.user_email):
+        raise ValueError(f"Failed to update Git config for project: {path}")
+    return mark_project_configured(project, new_remote_url)
+
+
+async def validate_project_path_async(project_path: Path) -> None:
+    """Validate the project path is a valid git repository without blocking the event loop."""
+    if not await AsyncGitManager.validate_git_repo(project_path):
+        raise ValueError(f"Invalid Git repository: {project_path}")
+
+
+async def configure_project_async(project: Project, account: Account) -> Project:
+    """Configure a project to use specific git account without blocking the event loop."""
+    path = Path(project.path).expanduser()
+    await validate_project_path_async(path)
+
+    remote_info = await AsyncGitManager.get_remote_url(path)
+    remote_name, new_remote_url = prepare_project_configuration(path, project, account, remote_info)
+
+    if not await AsyncGitManager.configure_repository(
+        path, remote_name, new_remote_url, account.name, account.user_email
+    ):
+        raise ValueError(f"Failed to update Git config for project: {path}")
+    return mark_project_configured(project, new_remote_url)
+
+
+def configure_projects(
+    projects: list[tuple[Project, Account]], max_workers: int | None = None
+) -> Iterator[tuple[int, Project, Exception | None]]:
+    """
+    Configure many projects in parallel on a bounded thread pool.
+
+    Args:
+        projects: Pairs of project and the account it should be configured with
+        max_workers: Number of worker threads, capped by ``settings.PROJECT_BATCH_MAX_WORKERS``
+
+    Yields:
+        ``(index, project, error)`` tuples in completion order, where ``error`` is None on success
+    """
+    limit = settings.PROJECT_BATCH_MAX_WORKERS
+    max_workers = min(max_workers or limit, limit)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="configure-project")
+    try:
+        futures = {
+            executor.submit(configure_project, project, account): index
+            for index, (project, account) in enumerate(projects)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield index, future.result(), None
+            except Exception as error:
+                yield index, projects[index][0], error
+    finally:
+        # Drop queued work if the consumer stops early (e.g. the client disconnected)
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def configure_and_store_projects(
+    projects: list[tuple[Project, Account]], max_workers: int | None = None
+) -> Iterator[ProjectBatchResult | ProjectBatchSummary]:
+    """
+    Configure many projects in parallel and store the configured ones in a single transaction.
+
+    Yields:
+        One ``ProjectBatchResult`` per project in completion order, then a ``ProjectBatchSummary``
+    """
+    configured = []
+    failed = 0
+    for index, project_db, error in configure_projects(projects, max_workers):
+        if error is None:
+            configured.append(project_db)
+        else:
+            failed += 1
+        yield ProjectBatchResult(
+            index=index,
+            path=project_db.path,
+            status="configured" if error is None else "failed",
+            remote_url=project_db.remote_url if error is None else None,
+            error=None if error is None else str(error),
+        )
+
+    summary = ProjectBatchSummary(status="completed", configured=len(configured), failed=failed)
+    try:
+        # Runs outside of any request session, e.g. while a response is streamed or in a background job
+        with Session(engine) as session:
+            session.add_all(configured)
+            session.commit()
+            for project_db in configured:
+                session.refresh(project_db)
+            summary.projects = [ProjectPublic.model_validate(project_db) for project_db in configured]
+    except Exception as e:
+        summary.status = "failed"
+        summary.error = str(e)
+    yield summary
+
+
+def get_validation_target(project: Project) -> tuple[Path, str]:
+    """Check the project is ready for validation and return its path and SSH host."""
     if not project.configured:
         raise ValueError("Project is not configured")
     if not project.remote_url:
@@ -208,6 +562,83 @@ def validate_project_configuration(project: Project) -> None:
 
     path = Path(project.path).expanduser()
     host = project.remote_url.split(":")[0]
+    return path, host
+
+
+def validate_project_configuration(project: Project) -> None:
+    """Validate the project configuration."""
+    path, host = get_validation_target(project)
 
     if not GitManager.validate_ssh_connection(path=path, host=host):
         raise ValueError(f"SSH connection to {host} failed")
+
+
+async def validate_project_configuration_async(project: Project) -> None:
+    """Validate the project configuration without blocking the event loop."""
+    path, host = get_validation_target(project)
+
+    if not await AsyncGitManager.validate_ssh_connection(path=path, host=host):
+        raise ValueError(f"SSH connection to {host} failed")
+
+
+async def validate_projects_async(
+    projects: list[Project],
+    refresh: bool = False,
+    on_result: Callable[[ProjectValidationResult], None] | None = None,
+    max_concurrency: int | None = None,
+) -> list[ProjectValidationResult]:
+    """
+    Validate many projects with one SSH handshake per distinct host.
+
+    Projects are grouped by the SSH host of their remote URL, each host is validated once (concurrently and
+    through the per-host result cache) and the outcome is fanned out to every project using that host.
+
+    Args:
+        projects: Projects to validate
+        refresh: Ignore cached host results and handshake again
+        on_result: Called with every result as soon as it is known
+        max_concurrency: Handshakes running at once, defaults to ``settings.SSH_VALIDATION_MAX_CONCURRENCY``
+    """
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    results: dict[int, ProjectValidationResult] = {}
+    hosts: dict[str, list[Project]] = {}
+    for project in projects:
+        try:
+            _, host = get_validation_target(project)
+        except ValueError as e:
+            results[project.id] = ProjectValidationResult(
+                project_id=project.id, name=project.name, valid=False, error=str(e)
+            )
+            if on_result is not None:
+                on_result(results[project.id])
+            continue
+        hosts.setdefault(host, []).append(project)
+
+    async def validate_host(host: str) -> tuple[str, tuple[bool, bool] | Exception]:
+        try:
+            return host, await host_validation_cache.validate(host, refresh=refresh, semaphore=semaphore)
+        except Exception as e:
+            return host, e
+
+    for completed in asyncio.as_completed([validate_host(host) for host in hosts]):
+        host, outcome = await completed
+        retryable = isinstance(outcome, TransientSSHError)
+        if isinstance(outcome, Exception):
+            valid, cached, error = False, False, str(outcome)
+        else:
+            valid, cached = outcome
+            error = None if valid else f"SSH connection to {host} failed"
+        for project in hosts[host]:
+            results[project.id] = ProjectValidationResult(
+                project_id=project.id,
+                name=project.name,
+                host=host,
+                valid=valid,
+                cached=cached,
+                retryable=retryable,
+                error=error,
+            )
+            if on_result is not None:
+                on_result(results[project.id])
+
+    return [results[project.id] for project in projects]
@@ -0,0 +1,343 @@
+import glob
+import os
+import re
+import shlex
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.utils.metrics import config_io_seconds
+
+DEFAULT_INDENT = "    "
+# Keyword, then arguments separated by whitespace and/or a single "="
+LINE_PATTERN = re.compile(r"^\s*([^\s=#][^\s=]*)(?:\s*=\s*|\s+|$)(.*?)\s*$")
+TRAILING_COMMENT_PATTERN = re.compile(r"\s+#.*$")
+
+
+def split_line(line: str) -> tuple[str, str] | None:
+    """
+    Splits an ssh_config line into its lowercase keyword and raw argument string.
+
+    Returns:
+        None for blank and comment lines
+
+    Examples:
+        >>> split_line("    IdentityFile ~/.ssh/id_work")
+        ('identityfile', '~/.ssh/id_work')
+        >>> split_line("Port=2222")
+        ('port', '2222')
+    """
+    match = LINE_PATTERN.match(line)
+    if match is None:
+        return None
+    return match.group(1).lower(), match.group(2)
+
+
+def split_arguments(arguments: str) -> list[str]:
+    """Splits an argument string, honouring double quotes and trailing comments like ssh does"""
+    if "#" in arguments:
+        arguments = TRAILING_COMMENT_PATTERN.sub("", arguments)
+    if '"' not in arguments and "'" not in arguments and "\\" not in arguments:
+        return arguments.split()
+    try:
+        return shlex.split(arguments, comments=False, posix=True)
+    except ValueError:
+        return arguments.split()
+
+
+def normalize_identity_file(path: str) -> str:
+    return os.path.normpath(os.path.expanduser(path))
+
+
+@dataclass
+class HostBlock:
+    """
+    A ``Host`` or ``Match`` block, kept as its original lines.
+
+    Only lines of options that are changed get rewritten, so comments and formatting survive a round trip.
+    """
+
+    keyword: str
+    patterns: list[str]
+    lines: list[str]
+    source: Path | None = None
+    deleted: bool = False
+
+    @property
+    def aliases(self) -> list[str]:
+        """Host patterns that name a concrete alias (no negations), empty for Match blocks"""
+        if self.keyword != "host":
+            return []
+        return [pattern for pattern in self.patterns if not pattern.startswith("!")]
+
+    def options(self) -> list[tuple[int, str, str]]:
+        """Returns ``(line index, lowercase keyword, raw arguments)`` for every option line"""
+        parsed = []
+        for index, line in enumerate(self.lines[1:], start=1):
+            split = split_line(line)
+            if split is not None:
+                parsed.append((index, *split))
+        return parsed
+
+    def get(self, keyword: str) -> str | None:
+        """Returns the first value of an option, which is the one ssh uses"""
+        for _, option, arguments in self.options():
+            if option == keyword.lower():
+                values = split_arguments(arguments)
+                return " ".join(values) if values else ""
+        return None
+
+    def get_all(self, keyword: str) -> list[str]:
+        return [
+            " ".join(split_arguments(arguments)) for _, option, arguments in self.options() if option == keyword.lower()
+        ]
+
+    def _indent(self) -> str:
+        for index, _, _ in self.options():
+            line = self.lines[index]
+            return line[: len(line) - len(line.lstrip())] or DEFAULT_INDENT
+        return DEFAULT_INDENT
+
+    def _content_end(self) -> int:
+        """Index after the last non-blank, non-comment line, so new options stay above trailing gaps"""
+        options = self.options()
+        return options[-1][0] + 1 if options else 1
+
+    def set(self, keyword: str, value: str) -> bool:
+        """
+        Sets an option to a single value, replacing its first occurrence and dropping duplicates.
+
+        Returns:
+            Whether the block changed
+        """
+        matches = [index for index, option, _ in self.options() if option == keyword.lower()]
+        line = f"{self._indent()}{keyword} {value}\n"
+        if matches:
+            first, *rest = matches
+            changed = bool(rest) or self.get(keyword) != " ".join(split_arguments(value))
+            if not changed:
+                return False
+            self.lines[first] = line
+            for index in reversed(rest):
+                del self.lines[index]
+            return True
+        self.lines.insert(self._content_end(), line)
+        return True
+
+    def remove(self, keyword: str) -> bool:
+        """
+        Removes every occurrence of an option.
+
+        Returns:
+            Whether the block changed
+        """
+        matches = [index for index, option, _ in self.options() if option == keyword.lower()]
+        for index in reversed(matches):
+            del self.lines[index]
+        return bool(matches)
+
+
+@dataclass
+class SSHConfig:
+    """
+    Structured, round-trip preserving model of an ssh_config file.
+
+    Blocks are indexed by host alias and by IdentityFile for constant time lookups. Blocks from files pulled
+    in with ``Include`` are indexed for reading but never written back.
+    """
+
+    path: Path | None = None
+    preamble: list[str] = field(default_factory=list)
+    blocks: list[HostBlock] = field(default_factory=list)
+    included: list[HostBlock] = field(default_factory=list)
+    # Included files and the directories their patterns glob, for change detection by caches
+    include_paths: list[Path] = field(default_factory=list)
+    by_host: dict[str, HostBlock] = field(default_factory=dict)
+    by_identity_file: dict[str, list[HostBlock]] = field(default_factory=dict)
+
+    @classmethod
+    def parse(cls, text: str, path: Path | None = None, follow_includes: bool = True) -> "SSHConfig":
+        config = cls(path=path)
+        config.preamble, config.blocks = parse_blocks(text, path)
+        if follow_includes:
+            config.included = config._load_includes(
+                path, seen={path.resolve()} if path else set(), dependencies=config.include_paths
+            )
+        config.reindex()
+        return config
+
+    @classmethod
+    def load(cls, path: Path, follow_includes: bool = True) -> "SSHConfig":
+        """Loads a config file; a missing file yields an empty config that :meth:`save` will create"""
+        with config_io_seconds.time(config="ssh", operation="read"):
+            text = path.read_text(encoding="utf-8") if path.exists() else ""
+            return cls.parse(text, path, follow_includes)
+
+    def _load_includes(self, path: Path | None, seen: set[Path], dependencies: list[Path]) -> list[HostBlock]:
+        base = path.parent if path else Path.home() / ".ssh"
+        blocks = []
+        lines = self.preamble + [line for block in self.blocks for line in block.lines]
+        for line in lines:
+            split = split_line(line)
+            if split is None or split[0] != "include":
+                continue
+            for pattern in split_arguments(split[1]):
+                pattern = os.path.expanduser(pattern)
+                if not os.path.isabs(pattern):
+                    pattern = str(base / pattern)
+                dependencies.append(Path(pattern).parent)
+                for include_path in sorted(glob.glob(pattern)):
+                    include_path = Path(include_path)
+                    resolved = include_path.resolve()
+                    if resolved in seen or not include_path.is_file():
+                        continue
+                    seen.add(resolved)
+                    dependencies.append(include_path)
+                    included = SSHConfig(path=include_path)
+                    try:
+                        text = include_path.read_text(encoding="utf-8")
+                    except OSError:
+                        continue
+                    included.preamble, included.blocks = parse_blocks(text, include_path)
+                    blocks.extend(included.blocks)
+                    blocks.extend(included._load_includes(path, seen, dependencies))
+        return blocks
+
+    def reindex(self) -> None:
+        self.by_host = {}
+        self.by_identity_file = {}
+        for block in self.blocks + self.included:
+            self._index(block)
+
+    def _index(self, block: HostBlock) -> None:
+        if block.deleted:
+            return
+        for alias in block.aliases:
+            # ssh uses the first matching block, so earlier definitions win
+            self.by_host.setdefault(alias, block)
+        for identity_file in block.get_all("IdentityFile"):
+            self.by_identity_file.setdefault(normalize_identity_file(identity_file), []).append(block)
+
+    def _unindex(self, block: HostBlock) -> None:
+        for alias in block.aliases:
+            if self.by_host.get(alias) is block:
+                del self.by_host[alias]
+        for identity_file in block.get_all("IdentityFile"):
+            key = normalize_identity_file(identity_file)
+            remaining = [other for other in self.by_identity_file.get(key, []) if other is not block]
+            if remaining:
+                self.by_identity_file[key] = remaining
+            else:
+                self.by_identity_file.pop(key, None)
+
+    def hosts(self) -> list[HostBlock]:
+        """All live Host blocks, including those from included files, in file order"""
+        return [block for block in self.blocks + self.included if block.keyword == "host" and not block.deleted]
+
+    def get(self, host: str) -> HostBlock | None:
+        return self.by_host.get(host)
+
+    def find_by_identity_file(self, identity_file: str | Path) -> list[HostBlock]:
+        return list(self.by_identity_file.get(normalize_identity_file(str(identity_file)), []))
+
+    def upsert(self, host: str, options: dict[str, str]) -> HostBlock:
+        """
+        Creates a ``Host`` block or updates the options of the existing one.
+
+        Options not mentioned in ``options`` are left untouched on existing blocks.
+        """
+        block = self.by_host.get(host)
+        if block is None or block.source != self.path:
+            block = HostBlock("host", [host], [f"Host {host}\n"], source=self.path)
+            self._append(block)
+        else:
+            self._unindex(block)
+        for keyword, value in options.items():
+            block.set(keyword, value)
+        self._index(block)
+        # A block in this file takes precedence over one only defined in an included file
+        self.by_host[host] = block
+        return block
+
+    def remove_options(self, host: str, keywords: tuple[str, ...]) -> bool:
+        block = self.by_host.get(host)
+        if block is None or block.source != self.path:
+            return False
+        self._unindex(block)
+        changed = False
+        for keyword in keywords:
+            changed = block.remove(keyword) or changed
+        self._index(block)
+        return changed
+
+    def delete(self, host: str) -> bool:
+        """
+        Deletes the block defining ``host`` from this file.
+
+        Returns:
+            Whether a block was deleted
+        """
+        block = self.by_host.get(host)
+        if block is None or block.source != self.path:
+            return False
+        self._unindex(block)
+        # Tombstone instead of list removal, serialization skips deleted blocks
+        block.deleted = True
+        return True
+
+    def _append(self, block: HostBlock) -> None:
+        last_lines = self.blocks[-1].lines if self.blocks else self.preamble
+        if last_lines:
+            if not last_lines[-1].endswith("\n"):
+                last_lines[-1] += "\n"
+            if last_lines[-1].strip():
+                # Keep a blank line between blocks
+                last_lines.append("\n")
+        self.blocks.append(block)
+
+    def to_string(self) -> str:
+        lines = list(self.preamble)
+        for block in self.blocks:
+            if not block.deleted:
+                lines.extend(block.lines)
+        return "".join(lines)
+
+    def save(self, path: Path | None = None) -> None:
+        """
+        Atomically writes the config through a temporary file and rename.
+
+        Symlinked configs (e.g. managed by a dotfiles repository) are written through to their target.
+        """
+        with config_io_seconds.time(config="ssh", operation="write"):
+            self._save((path or self.path).resolve())
+
+    def _save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        mode = path.stat().st_mode & 0o777 if path.exists() else 0o600
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+                file.write(self.to_string())
+                file.flush()
+                os.fsync(file.fileno())
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+
+def parse_blocks(text: str, path: Path | None = None) -> tuple[list[str], list[HostBlock]]:
+    """Splits ssh_config text into the lines before the first block and the Host/Match blocks"""
+    preamble: list[str] = []
+    blocks: list[HostBlock] = []
+    for line in text.splitlines(keepends=True):
+        split = split_line(line)
+        if split is not None and split[0] in ("host", "match"):
+            keyword, arguments = split
+            blocks.append(HostBlock(keyword, split_arguments(arguments), [line], source=path))
+        elif blocks:
+            blocks[-1].lines.append(line)
+        else:
+            preamble.append(line)
+    return preamble, blocks
@@ -1,7 +1,27 @@
-import subprocess
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
+from app.core.config import APP_DATA_DIR, settings
+from app.utils.file_cache import public_key_cache, ssh_config_cache
+from app.utils.metrics import run_command
+from app.utils.ssh_config import SSHConfig
+
 SSH_CONFIG_PATH = Path.home() / ".ssh" / "config"
+# Created exclusively while the SSH config is changed, so the server and CLI runs do not overwrite each other
+SSH_CONFIG_LOCK_PATH = SSH_CONFIG_PATH.with_name("config.lock")
+LOCK_POLL_INTERVAL = 0.05
+MANAGED_HOST_PREFIX = "github-"
+MULTIPLEXING_OPTIONS = ("ControlMaster", "ControlPath", "ControlPersist")
+# Choices made through the API that outlive the process, e.g. the SSH multiplexing mode
+PREFERENCES_PATH = APP_DATA_DIR / "preferences.json"
+
+# Serializes changes of the SSH config within this process, the lock file does the same across processes
+ssh_config_lock = threading.Lock()
 
 
 def generate_ssh_key(account_name: str, email: str, account_type: str, overwrite: bool) -> Path:
@@ -17,30 +37,129 @@ def generate_ssh_key(account_name: str, email: str, account_type: str, overwrite
         public_key_path = Path(f"{key_path}.pub")
         public_key_path.unlink(missing_ok=True)
 
-    command = f"ssh-keygen -t ed25519 -C {email} -f {key_path} -N '' -q"
-    command = command.split()
+    # Passed as a list so the passphrase is really empty (splitting a string would pass the two characters '')
+    command = ["ssh-keygen", "-t", "ed25519", "-C", email, "-f", str(key_path), "-N", "", "-q"]
 
-    subprocess.run(command, check=True)
+    run_command(command, check=True)
     return key_path
 
 
+def get_host_alias(account_name: str, account_type: str) -> str:
+    return f"{MANAGED_HOST_PREFIX}{account_name}-{account_type}"
+
+
+def get_multiplexing_options() -> dict[str, str]:
+    """SSH options that let connections to a managed host share one persistent master connection"""
+    return {
+        "ControlMaster": "auto",
+        "ControlPath": settings.SSH_CONTROL_PATH,
+        "ControlPersist": settings.SSH_CONTROL_PERSIST,
+    }
+
+
+def read_preferences() -> dict:
+    try:
+        return json.loads(PREFERENCES_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def get_ssh_multiplexing() -> bool:
+    """The multiplexing mode last chosen through the API, ``settings.SSH_MULTIPLEXING`` until one was chosen"""
+    return bool(read_preferences().get("ssh_multiplexing", settings.SSH_MULTIPLEXING))
+
+
+def store_ssh_multiplexing(enabled: bool) -> None:
+    preferences = {**read_preferences(), "ssh_multiplexing": enabled}
+    temp_path = PREFERENCES_PATH.with_name(PREFERENCES_PATH.name + ".tmp")
+    temp_path.write_text(json.dumps(preferences, indent=2), encoding="utf-8")
+    temp_path.replace(PREFERENCES_PATH)
+
+
+def get_host_options(key_path: Path) -> dict[str, str]:
+    """Options of the managed Host block for a key"""
+    options = {
+        "HostName": "github.com",
+        "User": "git",
+        # Convert absolute path to ~/.ssh/ format for better portability
+        "IdentityFile": f"~/.ssh/{key_path.name}",
+    }
+    if get_ssh_multiplexing():
+        options.update(get_multiplexing_options())
+    return options
+
+
+def load_ssh_config() -> SSHConfig:
+    """Parse a fresh, writable copy of the SSH config"""
+    return SSHConfig.load(SSH_CONFIG_PATH)
+
+
+@contextmanager
+def hold_lock_file(lock_path: Path, timeout: float) -> Iterator[None]:
+    """
+    Holds ``lock_path``, created exclusively, for the ``with`` block; waits while another process holds it.
+
+    Raises:
+        TimeoutError: If the lock file still exists after ``timeout`` seconds
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            break
+        except FileExistsError:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Lock file is held by another process: {lock_path}. "
+                    "Remove it if no git-manager process is running."
+                )
+            time.sleep(LOCK_POLL_INTERVAL)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        lock_path.unlink(missing_ok=True)
+
+
+@contextmanager
+def locked_ssh_config() -> Iterator[SSHConfig]:
+    """
+    Loads a writable copy of the SSH config and holds the SSH config locks until the ``with`` block ends, so
+    concurrent load → change → save sequences never drop each other's changes.
+
+    Raises:
+        TimeoutError: If another process held the lock for longer than ``settings.SSH_CONFIG_LOCK_TIMEOUT``
+    """
+    with ssh_config_lock, hold_lock_file(SSH_CONFIG_LOCK_PATH, settings.SSH_CONFIG_LOCK_TIMEOUT):
+        yield load_ssh_config()
+
+
+def read_ssh_config() -> SSHConfig:
+    """Return the parsed SSH config from the file cache; the result is shared and must not be modified"""
+    return ssh_config_cache.get(SSH_CONFIG_PATH, SSHConfig.load, dependencies=lambda config: config.include_paths)
+
+
 def update_ssh_config(account_name: str, account_type: str, key_path: Path):
-    # Convert absolute path to ~/.ssh/ format for better portability
-    relative_path = f"~/.ssh/{key_path.name}"
+    """Create or update the account's Host block, so re-running never duplicates entries"""
+    update_ssh_config_hosts([(account_name, account_type, key_path)])
 
-    config_entry = f"""
-Host github-{account_name}-{account_type}
-    HostName github.com
-    User git
-    IdentityFile {relative_path}
-"""
-    with open(SSH_CONFIG_PATH, "a") as file:
-        file.write(config_entry)
+
+def update_ssh_config_hosts(accounts: list[tuple[str, str, Path]]):
+    """Create or update the Host blocks of many ``(account name, account type, key path)`` in one atomic write"""
+    with locked_ssh_config() as config:
+        for account_name, account_type, key_path in accounts:
+            config.upsert(get_host_alias(account_name, account_type), get_host_options(key_path))
+        config.save()
 
 
 def read_public_key(key_path: Path) -> tuple[str, str]:
-    """Read public key and extract email from it"""
-    public_key_path = Path(f"{key_path}.pub")
+    """Read public key and extract email from it, served from the file cache while the file is unchanged"""
+    return public_key_cache.get(Path(f"{key_path}.pub"), load_public_key)
+
+
+def load_public_key(public_key_path: Path) -> tuple[str, str]:
     with open(public_key_path) as file:
         content = file.read().strip()
         try:
@@ -56,52 +175,90 @@ def delete_ssh_key(key_path: str):
     Args:
         key_path: Path to the SSH private key file
 
+    Raises:
+        OSError: If there are issues with file operations
+    """
+    delete_ssh_keys([key_path])
+
+
+def delete_ssh_keys(key_paths: list[str | Path]):
+    """Delete SSH key pairs and remove their entries from the SSH config in one write
+
     Raises:
         OSError: If there are issues with file operations
     """
     try:
-        key_path = Path(key_path)
+        key_paths = [Path(key_path) for key_path in key_paths]
 
         # Delete private and public keys
-        key_path.unlink(missing_ok=True)
-        public_key_path = Path(f"{key_path}.pub")
-        public_key_path.unlink(missing_ok=True)
+        for key_path in key_paths:
+            key_path.unlink(missing_ok=True)
+            public_key_path = Path(f"{key_path}.pub")
+            public_key_path.unlink(missing_ok=True)
 
         # Skip SSH config cleanup if file doesn't exist
         if not SSH_CONFIG_PATH.exists():
             return
 
-        # Read and process SSH config
-        with open(SSH_CONFIG_PATH) as file:
-            lines = file.readlines()
-
-        # Extract account info from key name
-        # Assuming format: id_accountname_type or id_account_name_with_underscores_type
-        key_parts = key_path.name.split("_")
-        if len(key_parts) < 3:
-            return  # Invalid key name format
-
-        # The type is the last part, account name is everything in between
-        account_type = key_parts[-1]
-        account_name = "_".join(key_parts[1:-1])
-        expected_host = f"github-{account_name}-{account_type}"
-
-        # Find and remove the config entry
-        new_lines = []
-        skip = False
-        for line in lines:
-            if f"IdentityFile ~/.ssh/{key_path.name}" in line:
-                skip = False
-                continue
-            if line.startswith(f"Host {expected_host}"):
-                skip = True
-                continue
-            if not skip:
-                new_lines.append(line)
+        with locked_ssh_config() as config:
+            hosts = set()
 
-        # Write back cleaned config
-        with open(SSH_CONFIG_PATH, "w") as file:
-            file.writelines(new_lines)
+            for key_path in key_paths:
+                # Managed blocks that use this key
+                for block in config.find_by_identity_file(key_path) + config.find_by_identity_file(
+                    f"~/.ssh/{key_path.name}"
+                ):
+                    hosts.update(alias for alias in block.aliases if alias.startswith(MANAGED_HOST_PREFIX))
+
+                # Extract account info from key name
+                # Assuming format: id_accountname_type or id_account_name_with_underscores_type
+                key_parts = key_path.name.split("_")
+                if len(key_parts) >= 3:
+                    # The type is the last part, account name is everything in between
+                    account_type = key_parts[-1]
+                    account_name = "_".join(key_parts[1:-1])
+                    hosts.add(get_host_alias(account_name, account_type))
+
+            deleted = [config.delete(host) for host in sorted(hosts)]
+            if any(deleted):
+                config.save()
 
     except OSError as e:
         raise OSError(f"Failed to delete SSH key or update config: {e}") from e
+
+
+def list_managed_hosts() -> list[str]:
+    """List the ``Host github-*`` aliases managed by this application"""
+    config = read_ssh_config()
+    return [host for host in config.by_host if host.startswith(MANAGED_HOST_PREFIX)]
+
+
+def set_ssh_multiplexing(enabled: bool) -> list[str]:
+    """Add or remove the managed connection multiplexing options on every ``Host github-*`` block
+
+    The mode is stored, so Host blocks of accounts created later get the same options.
+
+    Args:
+        enabled: Whether the managed blocks should reuse persistent master connections
+
+    Returns:
+        The host aliases that were updated
+    """
+    with locked_ssh_config() as config:
+        # Stored under the lock, so an account created meanwhile gets its block written in the same mode
+        store_ssh_multiplexing(enabled)
+        if not SSH_CONFIG_PATH.exists():
+            return []
+
+        updated = []
+        for host, block in list(config.by_host.items()):
+            if not host.startswith(MANAGED_HOST_PREFIX) or block.source != config.path:
+                continue
+            if enabled:
+                config.upsert(host, get_multiplexing_options())
+            else:
+                config.remove_options(host, MULTIPLEXING_OPTIONS)
+            updated.append(host)
+
+        config.save()
+    return updated
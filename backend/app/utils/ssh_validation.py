@@ -0,0 +1,100 @@
+import asyncio
+import time
+from weakref import WeakKeyDictionary
+
+from app.core.config import settings
+from app.utils.async_git_manager import AsyncGitManager
+
+
+class HostValidationCache:
+    """
+    Caches SSH handshake results per host for a limited time.
+
+    Concurrent lookups of the same host share a single in-flight handshake, which keeps running when one of
+    its callers is cancelled, and the number of handshakes running at once is bounded. Hosts that could not be
+    reached (``TransientSSHError``) are not cached.
+    """
+
+    def __init__(self, ttl: float, max_concurrency: int):
+        self.ttl = ttl
+        self.max_concurrency = max_concurrency
+        self._results: dict[str, tuple[float, bool]] = {}
+        # In-flight handshakes and semaphores per event loop, as tasks and semaphores only work on their own loop
+        self._pending: WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Task[bool]]] = WeakKeyDictionary()
+        self._semaphores: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+
+    def get(self, host: str) -> bool | None:
+        """Returns the cached result for a host, or None if it is missing or expired"""
+        cached = self._results.get(host)
+        if cached is None:
+            return None
+        checked_at, valid = cached
+        if time.monotonic() - checked_at > self.ttl:
+            del self._results[host]
+            return None
+        return valid
+
+    async def validate(
+        self, host: str, refresh: bool = False, semaphore: asyncio.Semaphore | None = None
+    ) -> tuple[bool, bool]:
+        """
+        Validates the SSH connection to a host, reusing a cached or in-flight result when possible.
+
+        Args:
+            host: SSH host to connect to
+            refresh: Ignore a cached result and handshake again
+            semaphore: Bounds the handshakes instead of the cache's own ``max_concurrency`` limit
+
+        Returns:
+            Tuple of (valid, cached)
+        """
+        if not refresh:
+            valid = self.get(host)
+            if valid is not None:
+                return valid, True
+        pending = self._get_pending()
+        task = pending.get(host)
+        if task is not None:
+            return await asyncio.shield(task), True
+
+        task = asyncio.create_task(self._handshake(host, semaphore or self._get_semaphore()))
+        pending[host] = task
+        task.add_done_callback(lambda _: self._finish(pending, host, task))
+        # Cancelling this caller leaves the handshake running for the others waiting on it
+        return await asyncio.shield(task), False
+
+    async def _handshake(self, host: str, semaphore: asyncio.Semaphore) -> bool:
+        async with semaphore:
+            valid = await AsyncGitManager.validate_ssh_connection(path=None, host=host)
+        self._results[host] = (time.monotonic(), valid)
+        return valid
+
+    @staticmethod
+    def _finish(pending: dict[str, "asyncio.Task[bool]"], host: str, task: "asyncio.Task[bool]") -> None:
+        if pending.get(host) is task:
+            del pending[host]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller was cancelled before it was raised
+            task.exception()
+
+    def _get_pending(self) -> dict[str, "asyncio.Task[bool]"]:
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(loop)
+        if pending is None:
+            pending = self._pending[loop] = {}
+        return pending
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def clear(self) -> None:
+        self._results.clear()
+
+
+host_validation_cache = HostValidationCache(
+    ttl=settings.SSH_VALIDATION_CACHE_TTL, max_concurrency=settings.SSH_VALIDATION_MAX_CONCURRENCY
+)
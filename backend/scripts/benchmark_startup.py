@@ -0,0 +1,77 @@
+"""
+Measures how long the server takes to import and to start, each in a fresh interpreter.
+
+Every run uses a temporary home directory, so the database under ~/.git-account-manager is never touched. The
+first start creates the database (cold); the following ones reuse it (warm).
+
+Usage:
+    python scripts/benchmark_startup.py [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT = """
+import time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+"""
+
+STARTUP = """
+import time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+with TestClient(app):
+    print(time.perf_counter() - start)
+"""
+
+
+def measure(code: str, home: str) -> float:
+    """Runs ``code`` in a new interpreter and returns the seconds it printed"""
+    env = {
+        **os.environ,
+        "HOME": home,
+        "USERPROFILE": home,
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "GIT_MANAGER_DRIFT_WATCH_ENABLED": "false",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def report(name: str, seconds: list[float]) -> None:
+    print(
+        f"{name:<16} median {statistics.median(seconds) * 1000:8.1f} ms  "
+        f"min {min(seconds) * 1000:8.1f} ms  max {max(seconds) * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Measurements per scenario")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        report("import", [measure(IMPORT, home) for _ in range(args.runs)])
+        cold = []
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as fresh_home:
+                cold.append(measure(STARTUP, fresh_home))
+        report("startup (cold)", cold)
+        measure(STARTUP, home)
+        report("startup (warm)", [measure(STARTUP, home) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Benchmark suite for the service layer, the git layer and the HTTP endpoints.
+
+Every benchmark runs its function for a few rounds and compares its fastest round with ``baselines.json``; the
+fastest round is the least affected by other load on the machine. Baselines are stored relative to a fixed
+calibration workload, so they carry over to faster or slower machines; a run fails when a benchmark exceeds its
+scaled baseline by more than the tolerance.
+
+Usage:
+    pytest tests/benchmarks                          # compare against the stored baselines
+    pytest tests/benchmarks --benchmark-save         # measure and store new baselines
+    pytest tests/benchmarks --benchmark-tolerance 2  # allow up to three times the baseline
+
+The suite runs in a temporary home directory, so the database, SSH config and git config of the user are never
+touched, and a stand-in ``ssh`` on PATH answers like GitHub without any network access.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# The temporary home directory set up by tests/conftest.py
+BENCHMARK_HOME = Path.home()
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+# Timings on shared CI runners easily vary by half, a regression has to at least double a benchmark
+DEFAULT_TOLERANCE = 1.0
+# Absolute slack on top of the tolerance, so sub-millisecond benchmarks do not fail on timer and scheduler noise
+MINIMUM_SLACK = 0.002
+
+# Answers every `ssh -T <host>` like GitHub does for a valid key, after a fixed handshake delay
+FAKE_SSH = """#!/bin/sh
+sleep {delay}
+echo "Hi bench! You've successfully authenticated, but GitHub does not provide shell access." >&2
+exit 1
+"""
+FAKE_SSH_DELAY = 0.05
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmarks")
+    group.addoption("--benchmark-save", action="store_true", help="Store the measured timings as new baselines")
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=float(os.environ.get("BENCHMARK_TOLERANCE", DEFAULT_TOLERANCE)),
+        help="Allowed slowdown against the baseline, as a fraction (default: 1.0)",
+    )
+
+
+def calibrate() -> float:
+    """Seconds a fixed CPU-bound workload takes on this machine, the best of a few runs"""
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        digest = b""
+        for index in range(20000):
+            digest = hashlib.sha256(digest + index.to_bytes(4, "little")).digest()
+        sorted(str(index) for index in range(50000))
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class BenchmarkSession:
+    def __init__(self, save: bool, tolerance: float):
+        self.save = save
+        self.tolerance = tolerance
+        self.calibration = calibrate()
+        stored = json.loads(BASELINES_PATH.read_text(encoding="utf-8")) if BASELINES_PATH.is_file() else {}
+        self.stored_calibration: float | None = stored.get("calibration")
+        self.baselines: dict[str, float] = stored.get("benchmarks", {})
+        self.results: dict[str, float] = {}
+
+    @property
+    def scale(self) -> float:
+        """How much slower this machine is than the one the baselines were stored on"""
+        if not self.stored_calibration:
+            return 1.0
+        return self.calibration / self.stored_calibration
+
+    def check(self, name: str, best: float) -> None:
+        self.results[name] = best
+        baseline = self.baselines.get(name)
+        if self.save or baseline is None:
+            return
+        limit = baseline * self.scale * (1 + self.tolerance) + MINIMUM_SLACK
+        if best > limit:
+            pytest.fail(
+                f"{name} regressed: {best * 1000:.1f} ms, "
+                f"baseline {baseline * self.scale * 1000:.1f} ms (limit {limit * 1000:.1f} ms)",
+                pytrace=False,
+            )
+
+    def store(self) -> None:
+        benchmarks = {**self.baselines, **self.results} if self.results else self.baselines
+        content = {"calibration": self.calibration, "benchmarks": dict(sorted(benchmarks.items()))}
+        BASELINES_PATH.write_text(json.dumps(content, indent=2) + "\n", encoding="utf-8")
+
+
+class Benchmark:
+    """Times a function over several rounds; ``setup`` runs before every round and is not timed"""
+
+    def __init__(self, session: BenchmarkSession, name: str):
+        self.session = session
+        self.name = name
+        self.timings: list[float] = []
+
+    def __call__(
+        self, function: Callable, *args: Any, rounds: int = 5, setup: Callable[[], Any] | None = None, **kwargs: Any
+    ) -> Any:
+        result = None
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            self.timings.append(time.perf_counter() - start)
+        self.session.check(self.name, min(self.timings))
+        return result
+
+
+@pytest.fixture(scope="session")
+def benchmark_session(request: pytest.FixtureRequest):
+    session = BenchmarkSession(
+        save=request.config.getoption("--benchmark-save"),
+        tolerance=request.config.getoption("--benchmark-tolerance"),
+    )
+    yield session
+    if session.save:
+        session.store()
+    for name, best in sorted(session.results.items()):
+        baseline = session.baselines.get(name)
+        compared = f"  baseline {baseline * session.scale * 1000:9.2f} ms" if baseline else ""
+        print(f"\n{name:<60} {best * 1000:9.2f} ms{compared}", end="", file=sys.stderr)
+
+
+@pytest.fixture
+def benchmark(benchmark_session: BenchmarkSession, request: pytest.FixtureRequest) -> Benchmark:
+    return Benchmark(benchmark_session, f"{request.node.module.__name__.rpartition('.')[2]}::{request.node.name}")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fake_ssh():
+    """Puts the stand-in ssh first on PATH for the whole session"""
+    if os.name == "nt":
+        pytest.skip("The ssh stand-in is a shell script")
+    bin_dir = BENCHMARK_HOME / "bin"
+    bin_dir.mkdir()
+    ssh = bin_dir / "ssh"
+    ssh.write_text(FAKE_SSH.format(delay=FAKE_SSH_DELAY), encoding="utf-8")
+    ssh.chmod(ssh.stat().st_mode | stat.S_IEXEC)
+    original_path = os.environ["PATH"]
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{original_path}"
+    yield ssh
+    os.environ["PATH"] = original_path
+
+
+@pytest.fixture(scope="session")
+def database():
+    from app.core.database import create_db_and_tables
+
+    create_db_and_tables()
+
+
+def git(*args: str, cwd: Path | None = None) -> None:
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture(scope="session")
+def make_repositories(tmp_path_factory: pytest.TempPathFactory) -> Callable[[int], list[Path]]:
+    """
+    Returns a function creating ``count`` bare repositories with one commit and a working clone of each, whose
+    origin is then pointed at a GitHub URL like a repository cloned from GitHub.
+    """
+    template = tmp_path_factory.mktemp("template")
+    git("init", "-q", str(template))
+    (template / "README.md").write_text("benchmark\n", encoding="utf-8")
+    git("add", "README.md", cwd=template)
+    git("-c", "user.name=bench", "-c", "user.email=bench@example.com", "commit", "-q", "-m", "init", cwd=template)
+
+    def make(count: int) -> list[Path]:
+        root = tmp_path_factory.mktemp(f"repositories-{count}")
+        repositories = []
+        for index in range(count):
+            bare = root / "bare" / f"repo-{index}.git"
+            work = root / "work" / f"repo-{index}"
+            git("clone", "-q", "--bare", str(template), str(bare))
+            git("clone", "-q", str(bare), str(work))
+            git("remote", "set-url", "origin", f"https://github.com/bench/repo-{index}.git", cwd=work)
+            repositories.append(work)
+        return repositories
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def write_ssh_config() -> Callable[[int], None]:
+    """Returns a function writing an SSH config with ``count`` managed Host blocks and their key pairs"""
+
+    def write(count: int) -> None:
+        ssh_dir = BENCHMARK_HOME / ".ssh"
+        blocks = []
+        for index in range(count):
+            name = f"id_user{index}_work"
+            (ssh_dir / name).write_text("private\n", encoding="utf-8")
+            public_key = f"ssh-ed25519 AAAA{index:08d} user{index}@example.com\n"
+            (ssh_dir / f"{name}.pub").write_text(public_key, encoding="utf-8")
+            blocks.append(
+                f"Host github-user{index}-work\n    HostName github.com\n    User git\n    IdentityFile ~/.ssh/{name}\n"
+            )
+        (ssh_dir / "config").write_text("\n".join(blocks), encoding="utf-8")
+
+    return write
+
+
+@pytest.fixture(scope="session")
+def seed_database(database) -> Callable[[int, int], None]:
+    """Returns a function replacing all accounts and projects with synthetic rows, inserted in bulk"""
+    from sqlmodel import Session, delete, select
+
+    from app.core.database import engine
+    from app.models import Account, AccountType, Project
+
+    def seed(accounts: int, projects_per_account: int) -> None:
+        with Session(engine) as session:
+            session.exec(delete(Project))
+            session.exec(delete(Account))
+            work = session.exec(select(AccountType).where(AccountType.name == "work")).one()
+            session.add_all(
+                Account(
+                    name=f"user{index}",
+                    user_name=f"User {index}",
+                    user_email=f"user{index}@example.com",
+                    account_type_id=work.id,
+                    ssh_key_path=str(BENCHMARK_HOME / ".ssh" / f"id_user{index}_work"),
+                    public_key=f"ssh-ed25519 AAAA{index:08d} user{index}@example.com",
+                )
+                for index in range(accounts)
+            )
+            session.commit()
+            session.add_all(
+                Project(
+                    name=f"repo-{account.name}-{index}",
+                    path=str(BENCHMARK_HOME / "work" / account.name / f"repo-{index}"),
+                    account_id=account.id,
+                    remote_url=f"git@github-{account.name}-work:bench/repo-{index}.git",
+                    remote_name="origin",
+                    configured=True,
+                )
+                for account in session.exec(select(Account)).all()
+                for index in range(projects_per_account)
+            )
+            session.commit()
+
+    return seed
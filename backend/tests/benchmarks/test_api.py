@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.caching import response_cache
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def client(database):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module", params=[100, 1000])
+def accounts(request, seed_database) -> int:
+    """Accounts in the database, with five projects each"""
+    seed_database(accounts=request.param, projects_per_account=5)
+    return request.param
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/accounts?limit=100",
+        "/api/accounts/with-projects?limit=100",
+        "/api/projects?limit=100",
+        "/api/projects/with-account?limit=100",
+        "/api/accounts?limit=100&fields=id,name",
+    ],
+)
+def test_list(benchmark, client, accounts, path):
+    def get():
+        response = client.get(path)
+        assert response.status_code == 200
+
+    # Rendered every round, the cached responses are measured in test_list_cached
+    benchmark(get, setup=response_cache.clear, rounds=10)
+
+
+@pytest.mark.parametrize("path", ["/api/accounts?limit=100", "/api/projects/with-account?limit=100"])
+def test_list_cached(benchmark, client, accounts, path):
+    etag = client.get(path).headers["etag"]
+
+    def revalidate():
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    benchmark(revalidate, rounds=20)
+
+
+def test_list_deep_page(benchmark, client, accounts):
+    response = client.get("/api/projects?limit=100&sort=-updated_at")
+    cursor = response.headers["x-next-cursor"]
+    path = f"/api/projects?limit=100&sort=-updated_at&cursor={cursor}"
+    benchmark(lambda: client.get(path), setup=response_cache.clear, rounds=10)
+
+
+def test_search(benchmark, client, accounts):
+    benchmark(lambda: client.get("/api/search", params={"q": "repo-3 user1"}), rounds=10)
+
+
+def test_validate_projects(benchmark, client, accounts):
+    def validate():
+        response = client.get("/api/projects/validate", params={"refresh": True})
+        assert response.status_code == 200
+
+    benchmark(validate, rounds=3)
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.core.loading import ACCOUNT_PUBLIC
+from app.core.search import search
+from app.models import Account, Project, SearchQuery
+from app.utils.file_cache import ssh_config_cache
+from app.utils.git_manager import GitManager
+from app.utils.repo_scanner import RepositoryScanner
+from app.utils.services import (
+    configure_project,
+    configure_projects,
+    last_ssh_config_sync,
+    read_ssh_config_accounts,
+    sync_ssh_config,
+    validate_projects_async,
+)
+from app.utils.ssh_manager import read_ssh_config
+from app.utils.ssh_validation import host_validation_cache
+
+
+@pytest.fixture(scope="module")
+def account(seed_database) -> Account:
+    seed_database(accounts=1, projects_per_account=0)
+    with Session(engine) as session:
+        return session.exec(select(Account).options(*ACCOUNT_PUBLIC)).one()
+
+
+@pytest.mark.parametrize("count", [10, 50])
+def test_configure_project(benchmark, make_repositories, account, count):
+    repositories = make_repositories(count)
+
+    def configure_all():
+        for path in repositories:
+            configure_project(Project(name=path.name, path=str(path)), account)
+
+    benchmark(configure_all, rounds=3)
+
+
+@pytest.mark.parametrize("count", [50])
+def test_configure_projects_parallel(benchmark, make_repositories, account, count):
+    repositories = make_repositories(count)
+    projects = [(Project(name=path.name, path=str(path)), account) for path in repositories]
+
+    def configure_all():
+        errors = [error for _, _, error in configure_projects(projects) if error is not None]
+        assert not errors
+
+    benchmark(configure_all, rounds=3)
+
+
+@pytest.mark.parametrize("count", [50])
+def test_get_remote_url(benchmark, make_repositories, count):
+    repositories = make_repositories(count)
+    benchmark(lambda: [GitManager.get_remote_url(path) for path in repositories])
+
+
+@pytest.mark.parametrize("count", [50])
+def test_scan_repositories(benchmark, make_repositories, count):
+    root = make_repositories(count)[0].parent.parent
+    found = benchmark(lambda: list(RepositoryScanner().scan([str(root)])))
+    # The working clones and the bare repositories are found, the bare ones as directories without a work tree
+    assert len(found) >= count
+
+
+@pytest.mark.parametrize("hosts", [10, 100, 1000])
+def test_read_ssh_config_accounts(benchmark, write_ssh_config, hosts):
+    write_ssh_config(hosts)
+    # Parse the file every round, instead of measuring the file cache
+    accounts = benchmark(lambda: read_ssh_config_accounts(read_ssh_config()), setup=ssh_config_cache.clear)
+    assert len(accounts) == hosts
+
+
+@pytest.mark.parametrize("hosts", [10, 100, 1000])
+def test_sync_ssh_config(benchmark, write_ssh_config, seed_database, hosts):
+    write_ssh_config(hosts)
+
+    def setup():
+        # Half of the hosts exist as accounts, the other half is inserted by the sync
+        seed_database(accounts=hosts // 2, projects_per_account=0)
+        last_ssh_config_sync.update(fingerprint=None, result=None)
+
+    def sync():
+        with Session(engine) as session:
+            return sync_ssh_config(session)
+
+    result = benchmark(sync, setup=setup, rounds=3)
+    assert len(result.diff.inserted) == hosts - hosts // 2
+
+
+@pytest.mark.parametrize(("projects", "hosts"), [(100, 10), (1000, 50)])
+def test_validate_projects(benchmark, seed_database, projects, hosts):
+    seed_database(accounts=hosts, projects_per_account=projects // hosts)
+    with Session(engine) as session:
+        rows = session.exec(select(Project)).all()
+
+    # One handshake per host through the ssh stand-in, bounded by SSH_VALIDATION_MAX_CONCURRENCY
+    results = benchmark(lambda: asyncio.run(validate_projects_async(rows)), setup=host_validation_cache.clear, rounds=3)
+    assert all(result.valid for result in results)
+
+
+@pytest.mark.parametrize("rows", [100, 1000, 10000])
+def test_search(benchmark, seed_database, rows):
+    seed_database(accounts=rows // 10, projects_per_account=9)
+    with Session(engine) as session:
+        results = benchmark(lambda: search(session, SearchQuery(q="repo-3 user1")))
+    assert results
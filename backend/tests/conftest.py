@@ -0,0 +1,34 @@
+"""
+Runs the tests in a temporary home directory, so the database, SSH config and git config of the user are never
+touched. The app resolves these locations from the home directory when it is imported, so it is set up here,
+before any test module imports the app.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+TEST_HOME = Path(tempfile.mkdtemp(prefix="git-manager-tests-"))
+(TEST_HOME / ".ssh").mkdir()
+os.environ["HOME"] = os.environ["USERPROFILE"] = str(TEST_HOME)
+os.environ["GIT_CONFIG_NOSYSTEM"] = "1"
+os.environ["GIT_MANAGER_DRIFT_WATCH_ENABLED"] = "false"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_home():
+    yield TEST_HOME
+    shutil.rmtree(TEST_HOME, ignore_errors=True)
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,71 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from app.core.database import sqlite_file_name
+
+
+@pytest.fixture
+def account_type(client):
+    """A temporary account type, deleted again after the test"""
+    response = client.post("/api/account-types", json={"name": "contractor"})
+    assert response.status_code == 201
+    yield response.json()
+    client.delete(f"/api/account-types/{response.json()['id']}")
+
+
+def revalidate(client, path: str, etag: str) -> int:
+    return client.get(path, headers={"If-None-Match": etag}).status_code
+
+
+def test_matching_etag_is_not_modified(client):
+    response = client.get("/api/account-types")
+    etag = response.headers["etag"]
+
+    not_modified = client.get("/api/account-types", headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    # A cached response has the same body and ETag as the first one
+    cached = client.get("/api/account-types")
+    assert (cached.headers["etag"], cached.content) == (etag, response.content)
+
+
+def test_write_changes_the_etag(client):
+    etag = client.get("/api/account-types").headers["etag"]
+
+    response = client.post("/api/account-types", json={"name": "freelance"})
+    try:
+        changed = client.get("/api/account-types", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert "freelance" in [item["name"] for item in changed.json()]
+    finally:
+        client.delete(f"/api/account-types/{response.json()['id']}")
+    assert revalidate(client, "/api/account-types", changed.headers["etag"]) == 200
+
+
+def test_row_etag_only_changes_with_its_row(client, account_type):
+    work = next(item for item in client.get("/api/account-types").json() if item["name"] == "work")
+    work_path, other_path = f"/api/account-types/{work['id']}", f"/api/account-types/{account_type['id']}"
+    work_etag, other_etag = client.get(work_path).headers["etag"], client.get(other_path).headers["etag"]
+
+    assert client.patch(other_path, json={"name": "contractors"}).status_code == 200
+
+    assert revalidate(client, work_path, work_etag) == 304
+    assert revalidate(client, other_path, other_etag) == 200
+    assert client.get(other_path).json()["name"] == "contractors"
+
+
+def test_writes_of_other_processes_change_the_etag(client, account_type):
+    path = f"/api/account-types/{account_type['id']}"
+    etag = client.get(path).headers["etag"]
+
+    # Like the command line interface, which writes to the database without the server's change events
+    with closing(sqlite3.connect(sqlite_file_name)) as connection, connection:
+        connection.execute("UPDATE account_type SET name = 'consultant' WHERE id = ?", (account_type["id"],))
+
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["name"] == "consultant"
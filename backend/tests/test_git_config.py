@@ -0,0 +1,123 @@
+import logging
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from app.utils.git_config import GitConfig, GitConfigError, get_common_dir, update_repository_config
+from app.utils.git_manager import GitManager
+
+
+def git(path: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=path, capture_output=True, text=True, check=True).stdout.removesuffix(
+        "\n"
+    )
+
+
+CONFIG = """\
+# Written by hand
+[core]
+\trepositoryformatversion = 0 ; trailing comment
+[remote "origin"]
+\turl = https://github.com/alice/repo.git
+\tfetch = +refs/heads/*:refs/remotes/origin/*
+[alias]
+\tlg = log --graph \\
+\t\t--oneline
+\tgreeting = "say \\"hi\\"\\tthere" # quoted
+[user]
+\tname = Old Name
+"""
+
+
+@pytest.fixture
+def repository(tmp_path) -> Path:
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q")
+    git(path, "remote", "add", "origin", "https://github.com/alice/repo.git")
+    return path
+
+
+def test_round_trip_keeps_comments_continuations_and_escapes():
+    config = GitConfig(CONFIG)
+    assert config.to_string() == CONFIG
+    assert config.get("alias.lg") == "log --graph \t\t--oneline"
+    assert config.get("alias.greeting") == 'say "hi"\tthere'
+    assert config.get("core.repositoryformatversion") == "0"
+
+    config.set("user.name", "New Name")
+    expected = CONFIG.replace("\tname = Old Name\n", "\tname = New Name\n")
+    assert config.to_string() == expected
+
+
+def test_written_values_read_back_by_git(tmp_path):
+    path = tmp_path / "config"
+    path.write_text(CONFIG, encoding="utf-8")
+    config = GitConfig.load(path)
+    config.set("user.name", ' Zoë "Z" ; # ')
+    config.set("remote.origin.url", "git@github-alice:alice/repo.git")
+    config.write(path)
+
+    def read(name: str) -> str:
+        return git(tmp_path, "config", "--file", str(path), name)
+
+    assert read("user.name") == ' Zoë "Z" ; # '
+    assert read("remote.origin.url") == "git@github-alice:alice/repo.git"
+    assert read("alias.greeting") == 'say "hi"\tthere'
+    assert not (tmp_path / "config.lock").exists()
+
+
+def test_set_refuses_to_overwrite_multiple_values():
+    config = GitConfig(CONFIG)
+    config.add("remote.origin.fetch", "+refs/tags/*:refs/tags/*")
+    with pytest.raises(GitConfigError):
+        config.set("remote.origin.fetch", "+refs/heads/main:refs/remotes/origin/main")
+    assert config.get_all("remote.origin.fetch") == ["+refs/heads/*:refs/remotes/origin/*", "+refs/tags/*:refs/tags/*"]
+
+
+def test_unsupported_syntax_raises():
+    with pytest.raises(GitConfigError):
+        GitConfig("[include]\n\tpath = other\nnot an entry\n")
+
+
+def test_update_removes_push_urls(repository):
+    git(repository, "remote", "set-url", "--push", "origin", "git@github.com:old/repo.git")
+    git(repository, "remote", "set-url", "--add", "--push", "origin", "git@gitlab.com:old/repo.git")
+
+    update_repository_config(repository, "origin", "git@github-alice:alice/repo.git", "Alice", "alice@example.com")
+
+    assert git(repository, "remote", "get-url", "--push", "origin") == "git@github-alice:alice/repo.git"
+    assert git(repository, "config", "--get-all", "remote.origin.url") == "git@github-alice:alice/repo.git"
+    assert git(repository, "config", "--get", "remote.origin.fetch") == "+refs/heads/*:refs/remotes/origin/*"
+    assert git(repository, "config", "user.email") == "alice@example.com"
+
+
+def test_load_rejects_invalid_utf8(tmp_path):
+    path = tmp_path / "config"
+    path.write_bytes(b"[user]\n\tname = \xff\n")
+    with pytest.raises(GitConfigError):
+        GitConfig.load(path)
+
+
+def test_get_common_dir_rejects_invalid_utf8(tmp_path):
+    (tmp_path / "commondir").write_bytes(b"\xff\n")
+    with pytest.raises(GitConfigError):
+        get_common_dir(tmp_path)
+
+
+def test_configure_falls_back_on_invalid_utf8(repository, capsys, caplog):
+    # Latin-1 is valid for git but not for the in-process engine, so the git CLI takes over
+    caplog.set_level(logging.INFO, logger="app.utils.git_manager")
+    git(repository, "config", "user.name", "placeholder")
+    config_path = repository / ".git" / "config"
+    config_path.write_bytes(config_path.read_bytes().replace(b"placeholder", "Zoë".encode("latin-1")))
+
+    assert GitManager.configure_repository(
+        repository, "origin", "git@github-alice:alice/repo.git", "Alice", "alice@example.com"
+    )
+    assert git(repository, "config", "user.name") == "Alice"
+    assert git(repository, "remote", "get-url", "origin") == "git@github-alice:alice/repo.git"
+    # Bulk runs hit the fallback for many repositories, so it is logged rather than printed
+    assert capsys.readouterr().out == ""
+    assert "Falling back to git CLI" in caplog.text
@@ -0,0 +1,98 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from app.models import Account
+from app.utils.git_config import GitConfig
+from app.utils.identity_config import FRAGMENTS_DIR, build_fragment, get_fragment_path, write_identity_config
+
+USER_CONFIG = """\
+# My settings
+[user]
+\tname = Me
+[includeIf "gitdir:~/oss/"]
+\tpath = ~/.gitconfig-oss
+"""
+
+
+def git(path: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=path, capture_output=True, text=True, check=True).stdout.strip()
+
+
+@pytest.fixture
+def global_config(tmp_path, monkeypatch) -> Path:
+    path = tmp_path / "gitconfig"
+    path.write_text(USER_CONFIG, encoding="utf-8")
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(path))
+    yield path
+    shutil.rmtree(FRAGMENTS_DIR, ignore_errors=True)
+
+
+def make_account(account_id: int, name: str, ssh_key_path: str | None = None) -> Account:
+    return Account(
+        id=account_id,
+        name=name,
+        user_name=name.title(),
+        user_email=f"{name}@example.com",
+        account_type_id=1,
+        ssh_key_path=ssh_key_path,
+    )
+
+
+def make_repository(path: Path) -> Path:
+    path.mkdir(parents=True)
+    git(path, "init", "-q")
+    return path
+
+
+def test_nested_directories_are_written_outermost_first(global_config, tmp_path):
+    work, client = make_account(1, "work"), make_account(2, "client")
+    work_dir, client_dir = tmp_path / "work", tmp_path / "work" / "clients" / "acme"
+
+    # Listed innermost first; the inner directory still has to come last to win
+    write_identity_config([(str(client_dir), client), (str(work_dir), work)])
+
+    config = GitConfig.load(global_config)
+    assert config.get_all(f"includeIf.gitdir:{work_dir}/.path") == [str(get_fragment_path(1))]
+    assert config.subsections("includeif")[-2:] == [f"gitdir:{work_dir}/", f"gitdir:{client_dir}/"]
+    assert git(make_repository(work_dir / "api"), "config", "user.email") == "work@example.com"
+    assert git(make_repository(client_dir / "web"), "config", "user.email") == "client@example.com"
+
+
+def test_user_sections_are_kept(global_config, tmp_path):
+    work, other = make_account(1, "work"), make_account(2, "other")
+    write_identity_config([(str(tmp_path / "work"), work), (str(tmp_path / "other"), other)])
+
+    # Routing fewer directories removes only the sections and fragments written for them
+    write_identity_config([(str(tmp_path / "work"), work)])
+
+    text = global_config.read_text(encoding="utf-8")
+    assert text.startswith(USER_CONFIG)
+    assert text.lower().count("[includeif") == 2
+    assert not get_fragment_path(2).exists()
+
+    write_identity_config([])
+    assert global_config.read_text(encoding="utf-8") == USER_CONFIG
+    assert not get_fragment_path(1).exists()
+
+
+def test_rewrite_without_changes_leaves_the_file_alone(global_config, tmp_path):
+    directories = [(str(tmp_path / "work"), make_account(1, "work"))]
+    write_identity_config(directories)
+    written = global_config.stat().st_mtime_ns
+
+    write_identity_config(directories)
+
+    assert global_config.stat().st_mtime_ns == written
+
+
+def test_fragment_sets_the_identity_without_rewriting_urls():
+    config = GitConfig(build_fragment(make_account(1, "work", ssh_key_path="~/.ssh/id_work")))
+    assert (config.get("user.name"), config.get("user.email")) == ("Work", "work@example.com")
+    key_path = (Path.home() / ".ssh" / "id_work").as_posix()
+    assert config.get("core.sshCommand") == f'ssh -i "{key_path}" -o IdentitiesOnly=yes'
+    assert config.subsections("url") == []
+
+    assert GitConfig(build_fragment(make_account(2, "nokey"))).get("core.sshCommand") is None
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+from sqlmodel import Session, delete
+
+from app.core.database import create_db_and_tables, engine
+from app.models import Job
+from app.utils.jobs import JobManager, RetryJob
+
+
+@pytest.fixture
+def manager() -> JobManager:
+    create_db_and_tables()
+    with Session(engine) as session:
+        session.exec(delete(Job))
+        session.commit()
+    return JobManager(max_workers=2, history=10, max_attempts=3, retry_backoff=0.01, retry_backoff_max=0.05)
+
+
+def get_job(job_id: int) -> Job:
+    with Session(engine) as session:
+        return session.get(Job, job_id)
+
+
+def run_until_finished(manager: JobManager, job_id: int, timeout: float = 10) -> Job:
+    async def main() -> Job:
+        manager.start()
+        try:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                job = get_job(job_id)
+                if job.status in ("succeeded", "failed"):
+                    return job
+                await asyncio.sleep(0.01)
+            raise TimeoutError(f"Job {job_id} did not finish")
+        finally:
+            await manager.shutdown(timeout=1)
+
+    return asyncio.run(main())
+
+
+def test_retried_job_fails_after_max_attempts(manager):
+    attempts = []
+
+    @manager.handler("unreachable")
+    def unreachable(context):
+        attempts.append(context.attempt)
+        raise RetryJob("Host unreachable")
+
+    job = run_until_finished(manager, manager.submit("unreachable", {"host": "github-alice"}).id)
+
+    assert attempts == [1, 2, 3]
+    assert (job.status, job.attempts, job.error) == ("failed", 3, "Host unreachable")
+    assert job.finished_at is not None
+
+
+def test_retried_job_can_succeed(manager):
+    @manager.handler("flaky")
+    async def flaky(context):
+        if context.attempt == 1:
+            raise RetryJob("Host unreachable")
+        return {"attempt": context.attempt}
+
+    job = run_until_finished(manager, manager.submit("flaky", {}).id)
+
+    assert (job.status, job.attempts, job.error, job.result) == ("succeeded", 2, None, {"attempt": 2})
+
+
+def test_other_errors_are_not_retried(manager):
+    @manager.handler("broken")
+    def broken(context):
+        raise ValueError("Invalid payload")
+
+    job = run_until_finished(manager, manager.submit("broken", {}).id)
+
+    assert (job.status, job.attempts, job.error) == ("failed", 1, "Invalid payload")
+
+
+def test_idempotency_key_returns_the_same_job(manager):
+    manager.handler("noop")(lambda context: None)
+
+    first = manager.submit("noop", {"path": "/src/api"}, idempotency_key="key-1")
+    second = manager.submit("noop", {"path": "/src/api"}, idempotency_key="key-1")
+    other = manager.submit("noop", {"path": "/src/api"}, idempotency_key="key-2")
+
+    assert second.id == first.id
+    assert other.id != first.id
+    assert manager.find("key-1", "noop", {"path": "/src/api"}).id == first.id
+    with pytest.raises(ValueError):
+        manager.submit("noop", {"path": "/src/web"}, idempotency_key="key-1")
+
+
+def test_interrupted_jobs_are_queued_again(manager):
+    manager.handler("noop")(lambda context: None)
+    with Session(engine) as session:
+        interrupted = Job(kind="noop", status="running", attempts=1, max_attempts=3)
+        exhausted = Job(kind="noop", status="running", attempts=3, max_attempts=3)
+        unknown = Job(kind="removed", status="pending")
+        session.add_all([interrupted, exhausted, unknown])
+        session.commit()
+        ids = interrupted.id, exhausted.id, unknown.id
+
+    manager.recover()
+
+    statuses = [(job.status, job.attempts) for job in map(get_job, ids)]
+    assert statuses == [("pending", 1), ("failed", 3), ("failed", 0)]
@@ -0,0 +1,100 @@
+import base64
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, delete, select
+
+from app.api.pagination import decode_cursor, encode_cursor
+from app.core.database import engine
+from app.models import Project
+
+# Several rows share a timestamp, so pages must break ties by id. SQLAlchemy writes timestamps with six
+# fractional digits, even zero ones, while rows stamped by CURRENT_TIMESTAMP have none
+TIMESTAMPS = [
+    datetime(2026, 1, 1, 12, 0, 0, tzinfo=UTC),
+    datetime(2026, 1, 1, 12, 0, 0, tzinfo=UTC),
+    datetime(2026, 1, 1, 12, 0, 0, 250000, tzinfo=UTC),
+    datetime(2026, 1, 1, 11, 59, 59, 999999, tzinfo=UTC),
+    datetime(2026, 1, 2, tzinfo=UTC),
+    # Stamped by the database
+    None,
+]
+
+
+@pytest.fixture
+def projects(client) -> list[Project]:
+    with Session(engine) as session:
+        session.exec(delete(Project))
+        session.add_all(
+            Project(name=f"repo-{index}", path=f"/src/repo-{index}", updated_at=TIMESTAMPS[index % len(TIMESTAMPS)])
+            for index in range(23)
+        )
+        session.commit()
+        rows = list(session.exec(select(Project)).all())
+    yield rows
+    with Session(engine) as session:
+        session.exec(delete(Project))
+        session.commit()
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("-updated_at", ["2026-01-01 12:00:00.250000", 42])
+    assert decode_cursor(cursor, "-updated_at") == ["2026-01-01 12:00:00.250000", 42]
+    assert decode_cursor(encode_cursor("id", [7]), "id") == [7]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"{}").decode(),
+        base64.urlsafe_b64encode(b'["-updated_at", 42, 1]').decode(),
+        encode_cursor("id", [7]),
+    ],
+    ids=["garbage", "not a list", "wrong type", "other sort"],
+)
+def test_decode_rejects_tampered_cursors(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "-updated_at")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("sort", ["id", "-id", "updated_at", "-updated_at"])
+def test_pages_have_no_duplicates_or_gaps(client, projects, sort):
+    key = sort.lstrip("-")
+    expected = [
+        project.id
+        for project in sorted(projects, key=lambda project: (getattr(project, key), project.id), reverse=sort[0] == "-")
+    ]
+
+    seen = []
+    cursor = None
+    for _ in range(len(projects)):
+        params = {"limit": 5, "sort": sort, "fields": "id"} | ({"cursor": cursor} if cursor else {})
+        response = client.get("/api/projects", params=params)
+        assert response.status_code == 200
+        seen.extend(row["id"] for row in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_tampered_cursor_is_rejected(client, projects):
+    cursor = client.get("/api/projects", params={"limit": 5}).headers["x-next-cursor"]
+    assert client.get("/api/projects", params={"limit": 5, "cursor": cursor[:-4]}).status_code == 400
+    assert client.get("/api/projects", params={"limit": 5, "sort": "-id", "cursor": cursor}).status_code == 400
+    assert client.get("/api/projects", params={"limit": 5, "cursor": cursor}).status_code == 200
+
+
+def test_cursor_skips_rows_after_a_timestamp_tie(client, projects):
+    # The second page starts inside a run of equal timestamps; rows before the cursor must not come back
+    first = client.get("/api/projects", params={"limit": 1, "sort": "updated_at"})
+    second = client.get(
+        "/api/projects", params={"limit": 1, "sort": "updated_at", "cursor": first.headers["x-next-cursor"]}
+    )
+    assert first.json()[0]["id"] != second.json()[0]["id"]
+    assert timedelta(0) <= datetime.fromisoformat(second.json()[0]["updated_at"]) - datetime.fromisoformat(
+        first.json()[0]["updated_at"]
+    )
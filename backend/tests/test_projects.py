@@ -0,0 +1,29 @@
+import json
+import subprocess
+
+from sqlmodel import Session, delete
+
+from app.core.database import engine
+from app.models import Project
+
+
+def test_scan_marks_registered_repositories_through_symlinks(client, tmp_path):
+    repository = tmp_path / "src" / "api"
+    repository.mkdir(parents=True)
+    subprocess.run(["git", "init", "-q", str(repository)], check=True)
+    (tmp_path / "link").symlink_to(tmp_path / "src")
+
+    # Registered by its path through the symlink, with a trailing separator
+    with Session(engine) as session:
+        session.add(Project(name="api", path=f"{tmp_path / 'link' / 'api'}/"))
+        session.commit()
+    try:
+        response = client.post("/api/projects/scan", json={"roots": [str(tmp_path / "src")]})
+    finally:
+        with Session(engine) as session:
+            session.exec(delete(Project))
+            session.commit()
+
+    assert response.status_code == 200
+    *repositories, _summary = (json.loads(line) for line in response.text.splitlines())
+    assert [(item["path"], item["registered"]) for item in repositories] == [(str(repository), True)]
@@ -0,0 +1,103 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from app.utils.git_config import GitConfigError
+from app.utils.repo_inspector import inspect_repository
+
+
+def git(path: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=path, capture_output=True, text=True, check=True).stdout.strip()
+
+
+@pytest.fixture
+def global_config(tmp_path, monkeypatch) -> Path:
+    path = tmp_path / "gitconfig"
+    path.write_text("", encoding="utf-8")
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(path))
+    return path
+
+
+@pytest.fixture
+def repository(tmp_path, global_config) -> Path:
+    path = tmp_path / "work" / "api"
+    path.mkdir(parents=True)
+    git(path, "init", "-q", "-b", "main")
+    git(path, "remote", "add", "origin", "https://github.com/acme/api.git")
+    git(path, "remote", "add", "upstream", "gh:upstream/api.git")
+    return path
+
+
+def test_matches_git_for_a_subdirectory(repository, global_config):
+    global_config.write_text(
+        '[user]\n\tname = Global\n\temail = global@example.com\n[url "https://github.com/"]\n\tinsteadOf = gh:\n',
+        encoding="utf-8",
+    )
+    git(repository, "config", "user.email", "local@example.com")
+    subdirectory = repository / "src" / "pkg"
+    subdirectory.mkdir(parents=True)
+
+    info = inspect_repository(subdirectory)
+
+    assert info.work_tree == repository
+    assert info.user_name == git(subdirectory, "config", "user.name") == "Global"
+    assert info.user_email == git(subdirectory, "config", "user.email") == "local@example.com"
+    assert info.remotes == {
+        "origin": git(subdirectory, "remote", "get-url", "origin"),
+        "upstream": git(subdirectory, "remote", "get-url", "upstream"),
+    }
+    assert info.remotes["upstream"] == "https://github.com/upstream/api.git"
+
+
+def test_follows_include_if_like_git(repository, global_config, tmp_path):
+    fragment = tmp_path / "work.gitconfig"
+    fragment.write_text("[user]\n\temail = work@example.com\n", encoding="utf-8")
+    other = tmp_path / "other.gitconfig"
+    other.write_text("[user]\n\temail = other@example.com\n", encoding="utf-8")
+    global_config.write_text(
+        f'[includeIf "gitdir:{tmp_path}/work/"]\n\tpath = {fragment}\n'
+        f'[includeIf "gitdir:{tmp_path}/elsewhere/"]\n\tpath = {other}\n'
+        f'[includeIf "onbranch:main"]\n\tpath = {tmp_path}/branch.gitconfig\n',
+        encoding="utf-8",
+    )
+    (tmp_path / "branch.gitconfig").write_text("[user]\n\tname = On Main\n", encoding="utf-8")
+
+    info = inspect_repository(repository)
+
+    assert info.user_email == git(repository, "config", "user.email") == "work@example.com"
+    assert info.user_name == git(repository, "config", "user.name") == "On Main"
+    assert fragment in info.config_files
+    assert other not in info.config_files
+
+
+def test_worktrees_share_the_main_config(repository, tmp_path):
+    git(
+        repository, "-c", "user.name=a", "-c", "user.email=a@example.com", "commit", "-q", "--allow-empty", "-m", "init"
+    )
+    worktree = tmp_path / "api-feature"
+    git(repository, "worktree", "add", "-q", str(worktree), "-b", "feature")
+
+    info = inspect_repository(worktree)
+
+    assert info.work_tree == worktree
+    assert info.common_dir == repository / ".git"
+    assert info.remotes["origin"] == git(worktree, "remote", "get-url", "origin")
+
+
+def test_outside_a_repository(tmp_path, global_config):
+    assert inspect_repository(tmp_path) is None
+
+
+def test_unsupported_conditions_need_git(repository, global_config):
+    global_config.write_text(
+        '[includeIf "hasconfig:remote.*.url:https://github.com/**"]\n\tpath = extra.gitconfig\n', encoding="utf-8"
+    )
+    with pytest.raises(GitConfigError):
+        inspect_repository(repository)
+
+
+def test_git_environment_overrides_need_git(repository, monkeypatch):
+    monkeypatch.setenv("GIT_DIR", str(repository / ".git"))
+    with pytest.raises(GitConfigError):
+        inspect_repository(repository)
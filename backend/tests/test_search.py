@@ -0,0 +1,76 @@
+import pytest
+from sqlmodel import Session, delete, select
+
+from app.core.database import engine
+from app.models import Account, AccountType, Project
+
+
+@pytest.fixture
+def session(client):
+    with Session(engine) as session:
+        yield session
+        session.rollback()
+        session.exec(delete(Project))
+        session.exec(delete(Account))
+        session.commit()
+
+
+def search(client, q: str, **params) -> list[tuple[str, str]]:
+    response = client.get("/api/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return [(result["kind"], result["name"]) for result in response.json()]
+
+
+def test_index_follows_project_changes(client, session):
+    project = Project(name="billing-api", path="/src/acme/billing-api", remote_url="git@github.com:acme/billing.git")
+    session.add(project)
+    session.commit()
+    assert search(client, "acme/bill") == [("project", "billing-api")]
+
+    project.name, project.path = "invoicing-api", "/src/acme/invoicing-api"
+    session.add(project)
+    session.commit()
+    assert search(client, "invoicing") == [("project", "invoicing-api")]
+    # The remote URL was not changed and still matches, the old path no longer does
+    assert search(client, "billing") == [("project", "invoicing-api")]
+    assert search(client, "billing-api") == []
+
+    session.delete(project)
+    session.commit()
+    assert search(client, "invoicing") == []
+
+
+def test_index_follows_account_changes(client, session):
+    work = session.exec(select(AccountType).where(AccountType.name == "work")).one()
+    account = Account(name="carol", user_name="Carol Jones", user_email="carol@acme.dev", account_type_id=work.id)
+    session.add(account)
+    session.commit()
+    assert search(client, "acme.dev") == [("account", "carol")]
+
+    account.user_email = "carol@example.org"
+    session.add(account)
+    session.commit()
+    assert search(client, "acme.dev") == []
+    assert search(client, "example.org carol") == [("account", "carol")]
+
+    session.delete(account)
+    session.commit()
+    assert search(client, "carol") == []
+
+
+def test_every_term_has_to_match(client, session):
+    work = session.exec(select(AccountType).where(AccountType.name == "work")).one()
+    session.add(Account(name="dave", user_name="Dave", user_email="dave@acme.dev", account_type_id=work.id))
+    session.add_all(
+        [
+            Project(name="acme-web", path="/src/acme-web"),
+            Project(name="acme-db", path="/src/acme-db"),
+        ]
+    )
+    session.commit()
+
+    assert sorted(search(client, "acme")) == [("account", "dave"), ("project", "acme-db"), ("project", "acme-web")]
+    assert search(client, "acme web") == [("project", "acme-web")]
+    # Shorter than a trigram, matched on the rows the other terms select
+    assert search(client, "acme db") == [("project", "acme-db")]
+    assert search(client, "acme", kind="account") == [("account", "dave")]
@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import pytest
+
+from app.utils.ssh_config import SSHConfig
+
+CONFIG = """\
+# Managed by hand, keep this comment
+Include config.d/*
+
+Host github-alice-work
+    HostName github.com
+    User git
+    IdentityFile ~/.ssh/id_alice_work  # the work key
+
+Host *.internal
+    ProxyJump bastion
+"""
+
+INCLUDED = """\
+Host github-bob-personal
+    HostName github.com
+    IdentityFile ~/.ssh/id_bob_personal
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path) -> Path:
+    path = tmp_path / "config"
+    path.write_text(CONFIG, encoding="utf-8")
+    (tmp_path / "config.d").mkdir()
+    (tmp_path / "config.d" / "bob").write_text(INCLUDED, encoding="utf-8")
+    return path
+
+
+def test_round_trip_is_unchanged(config_path):
+    config = SSHConfig.load(config_path)
+    assert config.to_string() == CONFIG
+    assert config.get("github-bob-personal").source == config_path.parent / "config.d" / "bob"
+    assert [block.aliases for block in config.hosts()] == [
+        ["github-alice-work"],
+        ["*.internal"],
+        ["github-bob-personal"],
+    ]
+
+
+def test_upsert_changes_only_its_block(config_path):
+    config = SSHConfig.load(config_path)
+    config.upsert("github-alice-work", {"IdentityFile": "~/.ssh/id_alice_new"})
+    config.upsert("github-carol-work", {"HostName": "github.com", "User": "git"})
+    config.save()
+
+    text = config_path.read_text(encoding="utf-8")
+    assert text == CONFIG.replace("~/.ssh/id_alice_work  # the work key", "~/.ssh/id_alice_new") + (
+        "\nHost github-carol-work\n    HostName github.com\n    User git\n"
+    )
+    reloaded = SSHConfig.load(config_path)
+    assert [block.patterns for block in reloaded.find_by_identity_file(Path.home() / ".ssh" / "id_alice_new")] == [
+        ["github-alice-work"]
+    ]
+    assert reloaded.find_by_identity_file("~/.ssh/id_alice_work") == []
+
+
+def test_included_files_are_never_written(config_path):
+    included_path = config_path.parent / "config.d" / "bob"
+    config = SSHConfig.load(config_path)
+
+    # Blocks of included files are shadowed by a new block in the main file, not edited in place
+    assert not config.delete("github-bob-personal")
+    block = config.upsert("github-bob-personal", {"IdentityFile": "~/.ssh/id_bob_new"})
+    assert block.source == config_path
+    assert config.get("github-bob-personal") is block
+    config.save()
+
+    assert included_path.read_text(encoding="utf-8") == INCLUDED
+    assert config_path.read_text(encoding="utf-8").endswith(
+        "\nHost github-bob-personal\n    IdentityFile ~/.ssh/id_bob_new\n"
+    )
+
+
+def test_delete_keeps_the_other_blocks(config_path):
+    config = SSHConfig.load(config_path)
+    assert config.delete("github-alice-work")
+    assert not config.delete("github-alice-work")
+    assert config.get("github-alice-work") is None
+    assert config.find_by_identity_file("~/.ssh/id_alice_work") == []
+    config.save()
+
+    text = config_path.read_text(encoding="utf-8")
+    assert text.startswith("# Managed by hand, keep this comment\nInclude config.d/*\n")
+    assert "github-alice-work" not in text
+    assert "Host *.internal\n    ProxyJump bastion\n" in text
+    assert list(SSHConfig.load(config_path).by_host) == ["*.internal", "github-bob-personal"]
+
+
+def test_save_writes_through_symlinks(config_path, tmp_path):
+    link = tmp_path / "link"
+    link.symlink_to(config_path)
+    config = SSHConfig.load(link)
+    config.upsert("github-carol-work", {"HostName": "github.com"})
+    config.save()
+
+    assert link.is_symlink()
+    assert "Host github-carol-work" in config_path.read_text(encoding="utf-8")
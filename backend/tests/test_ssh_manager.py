@@ -0,0 +1,80 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.utils.ssh_config import SSHConfig
+from app.utils.ssh_manager import (
+    PREFERENCES_PATH,
+    SSH_CONFIG_LOCK_PATH,
+    SSH_CONFIG_PATH,
+    get_host_alias,
+    set_ssh_multiplexing,
+    update_ssh_config,
+    update_ssh_config_hosts,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(autouse=True)
+def empty_ssh_config():
+    SSH_CONFIG_PATH.unlink(missing_ok=True)
+    yield
+    SSH_CONFIG_PATH.unlink(missing_ok=True)
+    PREFERENCES_PATH.unlink(missing_ok=True)
+
+
+def read_hosts() -> set[str]:
+    return set(SSHConfig.load(SSH_CONFIG_PATH).by_host)
+
+
+def run_threads(targets: list) -> None:
+    barrier = threading.Barrier(len(targets))
+
+    def run(target):
+        barrier.wait()
+        target()
+
+    threads = [threading.Thread(target=run, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_creates_keep_every_host():
+    # Single account creates, team batches and a multiplexing toggle all rewrite the config at once
+    singles = [
+        lambda index=index: update_ssh_config(f"user{index}", "work", Path(f"id_user{index}_work"))
+        for index in range(40)
+    ]
+    batches = [
+        lambda batch=batch: update_ssh_config_hosts(
+            [(f"team{batch}-{index}", "work", Path(f"id_team{batch}-{index}_work")) for index in range(5)]
+        )
+        for batch in range(4)
+    ]
+    run_threads([*singles, *batches, lambda: set_ssh_multiplexing(True)])
+
+    expected = {get_host_alias(f"user{index}", "work") for index in range(40)}
+    expected |= {get_host_alias(f"team{batch}-{index}", "work") for batch in range(4) for index in range(5)}
+    assert read_hosts() == expected
+    assert not SSH_CONFIG_LOCK_PATH.exists()
+
+
+def test_concurrent_processes_keep_every_host():
+    # Like CLI runs next to the server, each process only has the lock file in common with the others
+    script = (
+        "import sys\nfrom pathlib import Path\nfrom app.utils.ssh_manager import update_ssh_config\n"
+        "for index in range(5):\n"
+        "    update_ssh_config(f'process{sys.argv[1]}-{index}', 'work', Path('id_process_work'))\n"
+    )
+    processes = [subprocess.Popen([sys.executable, "-c", script, str(number)], cwd=BACKEND_DIR) for number in range(6)]
+    assert all(process.wait(timeout=60) == 0 for process in processes)
+
+    assert read_hosts() == {
+        get_host_alias(f"process{number}-{index}", "work") for number in range(6) for index in range(5)
+    }
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from app.utils.async_git_manager import AsyncGitManager
+from app.utils.ssh_validation import HostValidationCache
+
+
+@pytest.fixture
+def handshakes(monkeypatch) -> list[str]:
+    """Hosts handshaked with; each handshake takes a moment, so concurrent lookups overlap"""
+    hosts = []
+
+    async def validate_ssh_connection(path, host):
+        hosts.append(host)
+        await asyncio.sleep(0.05)
+        return True
+
+    monkeypatch.setattr(AsyncGitManager, "validate_ssh_connection", validate_ssh_connection)
+    return hosts
+
+
+def test_cancelled_caller_leaves_handshake_to_the_others(handshakes):
+    cache = HostValidationCache(ttl=60, max_concurrency=2)
+
+    async def main():
+        first = asyncio.create_task(cache.validate("github-alice"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.validate("github-alice"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == (True, True)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(main())
+    assert handshakes == ["github-alice"]
+    assert cache.get("github-alice") is True
+
+
+def test_handshakes_are_shared_per_loop(handshakes):
+    # Each asyncio.run has its own loop; an in-flight handshake of one loop must not be awaited from another
+    cache = HostValidationCache(ttl=60, max_concurrency=2)
+
+    async def main():
+        return await asyncio.gather(*(cache.validate("github-bob", refresh=True) for _ in range(3)))
+
+    assert asyncio.run(main()) == [(True, False), (True, True), (True, True)]
+    assert asyncio.run(main()) == [(True, False), (True, True), (True, True)]
+    assert handshakes == ["github-bob", "github-bob"]